@@ -0,0 +1,459 @@
+"""
+Cold-start benchmark of Clyjin with synthetic plugin farms.
+
+Generates farms of N `clyjin_*` packages with M modules and K args each, and
+measures calls of the `clyjin` command in fresh interpreters: wall time,
+peak memory and cost of each startup phase reported by the startup profiler.
+
+Each farm is measured in scenarios:
+- `cold_help`: top-level help with empty sysdir, i.e. no discovery index
+    and schema cache
+- `warm_help`: the same help with the index and cache filled
+- `warm_call`: call of a module of one plugin with the index filled
+- `warm_complete`: shell completion request `python -m clyjin --complete`
+    with the completion index written by `core.reindex`
+
+Usage:
+    python benchmarks/coldstart.py
+    python benchmarks/coldstart.py --scales 1 10 --check
+    python benchmarks/coldstart.py --save
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+BaselinesPath: Path = Path(Path(__file__).parent, "baselines.json")
+RepoDir: Path = Path(__file__).parent.parent
+
+# runs the clyjin command within the same interpreter and reports its peak
+# memory, since rusage of children can't be attributed to a single run
+DriverSource: str = """
+import json
+import resource
+import sys
+
+from clyjin.__main__ import main
+
+result_path = sys.argv.pop(1)
+try:
+    main()
+except SystemExit:
+    pass
+
+with open(result_path, "w") as f:
+    json.dump(
+        {"peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss},
+        f,
+    )
+"""
+
+ModuleSource: str = """
+class {class_name}Args(ModuleArgs):
+{arg_fields}
+
+
+class {class_name}(Module[{class_name}Args, Config]):
+    Name = "{module_name}"
+    Description = "synthetic module {module_name}"
+    Args = {class_name}Args(
+{arg_values}
+    )
+
+    async def execute(self) -> None:
+        pass
+"""
+
+PluginSource: str = """
+from clyjin.base import Config, Module, ModuleArg, ModuleArgs, Plugin
+
+{modules}
+
+
+class MainPlugin(Plugin):
+    Name = "{plugin_name}"
+    Version = "0.1.0"
+    ModuleClasses = [{module_classes}]
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class FarmScale:
+    """
+    Size of a synthetic plugin farm.
+    """
+    plugins: int
+    modules: int
+    args: int
+
+    def get_key(self) -> str:
+        return f"{self.plugins}x{self.modules}x{self.args}"
+
+
+@dataclass(frozen=True, slots=True)
+class Measurement:
+    """
+    Median results of repeated runs of a scenario.
+
+    Attributes:
+        wall_ms:
+            Wall time of the whole process, including interpreter startup.
+        peak_rss_mb:
+            Peak resident memory of the process.
+        phases_ms:
+            Durations of top-level startup phases.
+    """
+    wall_ms: float
+    peak_rss_mb: float
+    phases_ms: dict[str, float]
+
+
+@dataclass(frozen=True, slots=True)
+class Workspace:
+    """
+    Temporary directory of a benchmarked farm.
+
+    Attributes:
+        path:
+            Root of the workspace used as HOME and current dir of runs.
+        farm_path:
+            Directory with generated plugins added to PYTHONPATH.
+        driver_path:
+            Script running the clyjin command.
+    """
+    path: Path
+    farm_path: Path
+    driver_path: Path
+
+
+class PluginFarm:
+    """
+    Directory with generated synthetic plugins.
+    """
+    def __init__(self, path: Path, scale: FarmScale) -> None:
+        self._path: Path = path
+        self._scale: FarmScale = scale
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def generate(self) -> None:
+        for plugin_index in range(self._scale.plugins):
+            package_path: Path = Path(
+                self._path,
+                f"clyjin_bench{plugin_index}",
+            )
+            package_path.mkdir(parents=True)
+            Path(package_path, "__init__.py").write_text(
+                self._get_plugin_source(f"bench{plugin_index}"),
+            )
+
+    def _get_plugin_source(self, plugin_name: str) -> str:
+        class_names: list[str] = []
+        module_sources: list[str] = []
+        for module_index in range(self._scale.modules):
+            class_name: str = f"Module{module_index}"
+            class_names.append(class_name)
+            module_sources.append(ModuleSource.format(
+                class_name=class_name,
+                module_name=f"m{module_index}",
+                arg_fields="\n".join(
+                    f"    a{i}: ModuleArg[str]"
+                    for i in range(self._scale.args)
+                ) or "    pass",
+                arg_values="\n".join(
+                    f"        a{i}=ModuleArg[str](names=[\"--a{i}\"],"
+                    f" type=str, default=\"v{i}\", help=\"arg {i}\"),"
+                    for i in range(self._scale.args)
+                ),
+            ))
+
+        return PluginSource.format(
+            modules="\n".join(module_sources),
+            plugin_name=plugin_name,
+            module_classes=", ".join(class_names),
+        )
+
+
+class ColdStartBenchmark:
+    """
+    Measures scenarios of the `clyjin` command for a plugin farm.
+
+    Attributes:
+        repeat:
+            How many times each scenario is run, the median is reported.
+    """
+    def __init__(self, repeat: int) -> None:
+        self._repeat: int = repeat
+
+    def measure(self, scale: FarmScale) -> dict[str, Measurement]:
+        with tempfile.TemporaryDirectory(prefix="clyjin_bench_") as tmp:
+            workspace: Workspace = Workspace(
+                path=Path(tmp),
+                farm_path=Path(tmp, "site"),
+                driver_path=Path(tmp, "driver.py"),
+            )
+            PluginFarm(workspace.farm_path, scale).generate()
+            workspace.driver_path.write_text(DriverSource)
+
+            call_args: list[str] = ["bench0.m0"] + [
+                arg
+                for i in range(scale.args)
+                for arg in (f"--a{i}", "x")
+            ]
+            return {
+                "cold_help": self._measure_scenario(
+                    workspace,
+                    ["-h"],
+                    is_cold=True,
+                ),
+                "warm_help": self._measure_scenario(
+                    workspace,
+                    ["-h"],
+                    is_cold=False,
+                ),
+                "warm_call": self._measure_scenario(
+                    workspace,
+                    call_args,
+                    is_cold=False,
+                ),
+                "warm_complete": self._measure_completion(
+                    workspace,
+                    ["bench0.m"],
+                ),
+            }
+
+    def _measure_scenario(
+        self,
+        workspace: Workspace,
+        args: list[str],
+        *,
+        is_cold: bool,
+    ) -> Measurement:
+        runs: list[tuple[float, float, dict[str, float]]] = []
+        sysdir: Path = Path(workspace.path, "sysdir")
+        # warm scenarios fill the sysdir with a run which is not counted
+        if not is_cold:
+            self._run(workspace, sysdir, args)
+
+        for run_index in range(self._repeat):
+            if is_cold:
+                sysdir = Path(workspace.path, f"cold_sysdir_{run_index}")
+            runs.append(self._run(workspace, sysdir, args))
+
+        phase_names: set[str] = {name for run in runs for name in run[2]}
+        return Measurement(
+            wall_ms=round(statistics.median(run[0] for run in runs), 1),
+            peak_rss_mb=round(statistics.median(run[1] for run in runs), 1),
+            phases_ms={
+                name: round(
+                    statistics.median(run[2].get(name, 0) for run in runs),
+                    2,
+                )
+                for name in sorted(phase_names)
+            },
+        )
+
+    def _measure_completion(
+        self,
+        workspace: Workspace,
+        words: list[str],
+    ) -> Measurement:
+        sysdir: Path = Path(workspace.path, "sysdir")
+        self._run(workspace, sysdir, ["core.reindex"])
+
+        runs: list[tuple[float, float]] = [
+            self._run_completion(workspace, sysdir, words)
+            for _ in range(self._repeat)
+        ]
+        return Measurement(
+            wall_ms=round(statistics.median(run[0] for run in runs), 1),
+            peak_rss_mb=round(statistics.median(run[1] for run in runs), 1),
+            phases_ms={},
+        )
+
+    def _run_completion(
+        self,
+        workspace: Workspace,
+        sysdir: Path,
+        words: list[str],
+    ) -> tuple[float, float]:
+        """
+        Runs the completion request the way shells do, as the `clyjin`
+        command, so the whole request is measured, including the interpreter
+        startup.
+        """
+        args: list[str] = [
+            sys.executable,
+            "-m",
+            "clyjin",
+            "--complete",
+            "--sysdir",
+            str(sysdir),
+            *words,
+        ]
+        started: float = time.perf_counter()
+        # spawned directly, since only waiting for the pid gives rusage of
+        # this very child
+        pid: int = os.posix_spawn(
+            sys.executable,
+            args,
+            self._get_env(workspace),
+            file_actions=[
+                (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+                (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0),
+            ],
+        )
+        _, status, rusage = os.wait4(pid, 0)
+        wall_ms: float = (time.perf_counter() - started) * 1000
+
+        exit_code: int = os.waitstatus_to_exitcode(status)
+        if exit_code != 0:
+            raise subprocess.CalledProcessError(exit_code, args)
+        return wall_ms, rusage.ru_maxrss / 1024
+
+    def _run(
+        self,
+        workspace: Workspace,
+        sysdir: Path,
+        args: list[str],
+    ) -> tuple[float, float, dict[str, float]]:
+        result_path: Path = Path(workspace.path, "result.json")
+        profile_path: Path = Path(workspace.path, "profile.json")
+        env: dict[str, str] = {
+            **self._get_env(workspace),
+            "CLYJIN_PROFILE_STARTUP_JSON": str(profile_path),
+        }
+
+        started: float = time.perf_counter()
+        subprocess.run(
+            [  # noqa: S603
+                sys.executable,
+                str(workspace.driver_path),
+                str(result_path),
+                "--sysdir",
+                str(sysdir),
+                *args,
+            ],
+            env=env,
+            cwd=workspace.path,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        wall_ms: float = (time.perf_counter() - started) * 1000
+
+        peak_rss_mb: float = \
+            json.loads(result_path.read_text())["peak_rss_kb"] / 1024
+        profile: dict[str, Any] = json.loads(profile_path.read_text())
+        phases_ms: dict[str, float] = {
+            phase["path"]: phase["duration_ms"]
+            for phase in profile["phases"]
+            if phase["path"].count(" / ") <= 1
+        }
+        return wall_ms, peak_rss_mb, phases_ms
+
+    @staticmethod
+    def _get_env(workspace: Workspace) -> dict[str, str]:
+        return {
+            **os.environ,
+            "HOME": str(workspace.path),
+            "PYTHONPATH": os.pathsep.join(
+                [str(workspace.farm_path), str(RepoDir)],
+            ),
+            "CLYJIN_NO_SERVER": "1",
+        }
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Clyjin cold-start benchmark",
+    )
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=[1, 10, 50, 200],
+        help="amounts of plugins in farms",
+    )
+    parser.add_argument("--modules", type=int, default=5)
+    parser.add_argument("--args", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="save results as baselines",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="fail if wall time exceeds baselines by more than threshold",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed relative regression. Defaults to 0.25",
+    )
+    parser.add_argument(
+        "--phases",
+        action="store_true",
+        help="print startup phases of each scenario",
+    )
+    namespace: argparse.Namespace = parser.parse_args()
+
+    benchmark: ColdStartBenchmark = ColdStartBenchmark(namespace.repeat)
+    results: dict[str, dict[str, Any]] = {}
+    for plugins in namespace.scales:
+        scale: FarmScale = FarmScale(
+            plugins=plugins,
+            modules=namespace.modules,
+            args=namespace.args,
+        )
+        for scenario, measurement in benchmark.measure(scale).items():
+            key: str = f"{scale.get_key()}:{scenario}"
+            results[key] = asdict(measurement)
+            print(  # noqa: T201
+                f"{key:<24} {measurement.wall_ms:9.1f} ms"
+                f" {measurement.peak_rss_mb:8.1f} MB",
+            )
+            if namespace.phases:
+                for name, duration_ms in measurement.phases_ms.items():
+                    print(f"    {duration_ms:9.2f} ms  {name}")  # noqa: T201
+
+    if namespace.save:
+        BaselinesPath.write_text(json.dumps(results, indent=2) + "\n")
+    if namespace.check and not _check(results, namespace.threshold):
+        sys.exit(1)
+
+
+def _check(results: dict[str, dict[str, Any]], threshold: float) -> bool:
+    baselines: dict[str, dict[str, Any]] = json.loads(
+        BaselinesPath.read_text(),
+    )
+    is_passed: bool = True
+    for key, result in results.items():
+        baseline: dict[str, Any] | None = baselines.get(key)
+        if baseline is None:
+            continue
+        limit_ms: float = baseline["wall_ms"] * (1 + threshold)
+        if result["wall_ms"] > limit_ms:
+            is_passed = False
+            print(  # noqa: T201
+                f"regression at {key}: {result['wall_ms']} ms >"
+                f" {limit_ms:.1f} ms allowed",
+                file=sys.stderr,
+            )
+    return is_passed
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,52 @@
-import importlib.metadata
+import os
+import sys
 
-__version__ = importlib.metadata.version("clyjin")
+_DistInfoPrefix: str = "clyjin-"
+_DistInfoSuffix: str = ".dist-info"
+
+
+def _get_version() -> str:
+    """
+    Finds version of installed Clyjin.
+
+    The version is taken from the name of the package's dist-info directory,
+    which avoids the costly import of `importlib.metadata` in most cases.
+    """
+    # a bundle has no dist-info, its version is kept in the bundle's manifest
+    bundle_manifest = sys.modules.get("_clyjin_bundle")
+    if bundle_manifest is not None:
+        return bundle_manifest.ClyjinVersion
+
+    for syspath_entry in sys.path:
+        version: str | None = _find_dist_info_version(syspath_entry or ".")
+        if version is not None:
+            return version
+
+    import importlib.metadata
+    return importlib.metadata.version("clyjin")
+
+
+def _find_dist_info_version(dirpath: str) -> str | None:
+    try:
+        with os.scandir(dirpath) as entries:
+            for entry in entries:
+                if (
+                    entry.name.startswith(_DistInfoPrefix)
+                    and entry.name.endswith(_DistInfoSuffix)
+                ):
+                    return entry.name[
+                        len(_DistInfoPrefix):-len(_DistInfoSuffix)
+                    ]
+    except OSError:
+        return None
+    return None
+
+
+def __getattr__(name: str) -> str:
+    # the version is resolved on first access, so importing of Clyjin's
+    # modules doesn't pay for it
+    if name == "__version__":
+        version: str = _get_version()
+        globals()["__version__"] = version
+        return version
+    raise AttributeError(name)
@@ -1,12 +1,76 @@
-import asyncio
+import os
+import sys
+from pathlib import Path
 
-from clyjin.core.boot import Boot
-from clyjin.log import Log
+from clyjin.core.cli.prescanner import CLIPrescanner, PrescannedArgs
+from clyjin.core.client import Client
+
+ServeModuleName: str = "core.serve"
+CompleteOption: str = "--complete"
 
 
-@Log.catch
 def main() -> None:
-    asyncio.run(Boot().start())
+    # only modules required to forward the call to a server are imported
+    # here, the rest is imported if the call is executed in this process
+    args: list[str] = sys.argv[1:]
+
+    if args[:1] == [CompleteOption]:
+        _complete(args[1:])
+        return
+
+    exit_code: int | None = _call_server(args)
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+    from clyjin.log import Log
+    Log.catch(_start)(args)
+
+
+def _start(args: list[str]) -> None:
+    import asyncio
+
+    from clyjin.core.boot import Boot
+
+    boot: Boot = Boot()
+    try:
+        asyncio.run(boot.start(args))
+    finally:
+        boot.close()
+
+
+def _complete(words: list[str]) -> None:
+    """
+    Prints shell completion candidates for the last word, one per line.
+    """
+    from clyjin.core.completion import Completer
+
+    candidates: list[str] = Completer.from_words(words).complete(words)
+    if candidates:
+        sys.stdout.write("\n".join(candidates) + "\n")
+
+
+def _call_server(args: list[str]) -> int | None:
+    """
+    Forwards the call to a running resident server.
+
+    Returns:
+        Exit code of the call, or None if the call should be executed within
+        this process.
+    """
+    if os.environ.get("CLYJIN_NO_SERVER"):
+        return None
+
+    prescanned_args: PrescannedArgs = CLIPrescanner().prescan(args)
+    # the server executes calls one by one, so a watching call, which never
+    # ends, would block calls of other clients
+    if prescanned_args.module == ServeModuleName or prescanned_args.watch:
+        return None
+
+    return Client.from_sysdir(
+        Path(os.environ["HOME"], ".clyjin")
+        if prescanned_args.sysdir is None
+        else prescanned_args.sysdir,
+    ).call(args)
 
 
 if __name__ == "__main__":
@@ -1,18 +1,29 @@
+from clyjin.base.changeset import ChangeSet
 from clyjin.base.config import Config
+from clyjin.base.filereader import FileReader
 from clyjin.base.model import Model
 from clyjin.base.module import Module
 from clyjin.base.moduleargs import ModuleArg, ModuleArgs
 from clyjin.base.moduledata import ModuleData
+from clyjin.base.output import OutputWriter
 from clyjin.base.plugin import Plugin
 from clyjin.base.plugininitializedata import PluginInitializeData
+from clyjin.base.processpool import ProcessPool
+from clyjin.base.store import Store, StoreTransaction
 
 __all__ = [
+    "ChangeSet",
     "Config",
+    "FileReader",
     "Module",
     "Model",
     "ModuleArg",
     "ModuleArgs",
     "ModuleData",
+    "OutputWriter",
     "Plugin",
     "PluginInitializeData",
+    "ProcessPool",
+    "Store",
+    "StoreTransaction",
 ]
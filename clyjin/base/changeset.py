@@ -0,0 +1,44 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True, slots=True)
+class ChangeSet:
+    """
+    Input files of an incremental Module changed since its last successful
+    execution, or watched files changed since the previous execution in the
+    watch mode.
+
+    Paths are relative to the rootdir.
+
+    Attributes:
+        added:
+            New input files. If the change set is full, all input files.
+        modified:
+            Input files with changed contents.
+        removed:
+            Input files, which no longer exist.
+        is_full:
+            Whether all inputs should be processed, e.g. on the first
+            execution, on change of args or config, or if outputs were
+            changed outside of the Module.
+    """
+    added: list[Path]
+    modified: list[Path]
+    removed: list[Path]
+    is_full: bool
+
+    @property
+    def changed(self) -> list[Path]:
+        """
+        Added and modified input files, i.e. files to process.
+        """
+        return [*self.added, *self.modified]
+
+    def is_empty(self) -> bool:
+        return (
+            not self.is_full
+            and not self.added
+            and not self.modified
+            and not self.removed
+        )
@@ -26,7 +26,7 @@ class ForeignModulePluginError(Exception):
     ) -> None:
         super().__init__(
             f"plugin <{PluginClass.get_name()}> does not have module"
-            f" <{ModuleClass.get_str()}>",
+            f" <{ModuleClass.cls_get_str()}>",
         )
 
 
@@ -40,6 +40,6 @@ class DuplicateRootModulePluginError(Exception):
         ModuleClass: type["Module"],
     ) -> None:
         super().__init__(
-            f"cannot add root module <{ModuleClass.get_str()}>:"
+            f"cannot add root module <{ModuleClass.cls_get_str()}>:"
             f" plugin <{PluginClass.get_str()}> already has a root module",
         )
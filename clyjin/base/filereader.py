@@ -0,0 +1,258 @@
+import asyncio
+import codecs
+import contextlib
+import mmap
+import os
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from pathlib import Path
+from typing import BinaryIO, TypeVar
+
+from antievil import UnsupportedError
+
+R = TypeVar("R")
+
+
+class FileReader:
+    """
+    Reads large files without loading them into memory at once.
+
+    Files are either mapped to memory, so their contents are accessed as
+    a zero-copy view paged in by the OS on demand, or read in chunks of the
+    buffer size. Chunks are read in the default thread executor, so the
+    event loop isn't blocked by the disk.
+
+    Multiple files are read concurrently, up to the max concurrency at
+    once, which keeps the disk busy while bounding the memory taken by
+    files in flight.
+
+    Relative paths are resolved from the rootdir.
+
+    Attributes:
+        rootdir:
+            Directory relative paths are resolved from.
+        buffer_size(optional):
+            How many bytes are read at once. Defaults to 1 MiB.
+        max_concurrency(optional):
+            Maximum amount of files read at once. Defaults to 8.
+    """
+    DefaultBufferSize: int = 1024 * 1024
+    DefaultMaxConcurrency: int = 8
+
+    def __init__(
+        self,
+        rootdir: Path,
+        *,
+        buffer_size: int = DefaultBufferSize,
+        max_concurrency: int = DefaultMaxConcurrency,
+    ) -> None:
+        self._check_positive("file reader buffer size", buffer_size)
+        self._check_positive("file reader max concurrency", max_concurrency)
+        self._rootdir: Path = rootdir
+        self._buffer_size: int = buffer_size
+        self._max_concurrency: int = max_concurrency
+
+    @property
+    def buffer_size(self) -> int:
+        return self._buffer_size
+
+    @property
+    def max_concurrency(self) -> int:
+        return self._max_concurrency
+
+    @contextlib.contextmanager
+    def map(self, path: Path) -> Iterator[memoryview]:
+        """
+        Maps the file to memory and gives a read-only view of its contents.
+
+        Slices of the view don't copy the contents, but they should be
+        released or dropped before the context exits, since the mapping
+        cannot be closed while they exist.
+        """
+        with self._open(path) as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # empty files cannot be mapped
+                yield memoryview(b"")
+                return
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, "madvise"):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                view: memoryview = memoryview(mapped)
+                try:
+                    yield view
+                finally:
+                    view.release()
+
+    async def iter_chunks(
+        self,
+        path: Path,
+        *,
+        buffer_size: int | None = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Yields the file's contents in chunks of the buffer size, the last
+        chunk being possibly shorter.
+
+        Args:
+            path:
+                File to read.
+            buffer_size(optional):
+                How many bytes are read at once. Defaults to the reader's
+                buffer size.
+        """
+        size: int = self._get_buffer_size(buffer_size)
+        f: BinaryIO = await asyncio.to_thread(self._open, path)
+        try:
+            while True:
+                chunk: bytes = await asyncio.to_thread(f.read, size)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            f.close()
+
+    async def iter_lines(
+        self,
+        path: Path,
+        *,
+        buffer_size: int | None = None,
+        encoding: str = "utf-8",
+    ) -> AsyncIterator[str]:
+        """
+        Yields lines of the file with their line endings, like iterating
+        over a text file does, reading the file in chunks.
+
+        Chunks are decoded incrementally, so characters split between
+        chunks and encodings of multiple bytes per character, e.g. UTF-16,
+        are handled. A line longer than the buffer is accumulated as a list
+        of parts until its end is read, so the memory taken is bounded by the
+        longest line.
+
+        Args:
+            path:
+                File to read.
+            buffer_size(optional):
+                How many bytes are read at once. Defaults to the reader's
+                buffer size.
+            encoding(optional):
+                Encoding of the file. Defaults to `utf-8`.
+        """
+        decoder: codecs.IncrementalDecoder = \
+            codecs.getincrementaldecoder(encoding)()
+        pending: list[str] = []
+        async for chunk in self.iter_chunks(path, buffer_size=buffer_size):
+            for line in self._split_lines(decoder.decode(chunk), pending):
+                yield line
+        rest: str = decoder.decode(b"", final=True)
+        for line in self._split_lines(rest, pending):
+            yield line
+        if pending:
+            yield "".join(pending)
+
+    async def read_many(
+        self,
+        paths: Iterable[Path],
+    ) -> AsyncIterator[tuple[Path, bytes]]:
+        """
+        Reads whole files concurrently, up to the max concurrency at once,
+        and yields them with their paths in the order of completion.
+
+        Suits trees of many small files, large files should be processed
+        by `process_many()` instead.
+        """
+        async for path, contents in self._run_many(self._read, paths):
+            yield path, contents
+
+    async def process_many(
+        self,
+        function: Callable[[Path, memoryview], R],
+        paths: Iterable[Path],
+    ) -> AsyncIterator[tuple[Path, R]]:
+        """
+        Maps files to memory and calls the function with each file's path and
+        view in the default thread executor, up to the max concurrency at
+        once. Yields results with paths in the order of completion.
+
+        The view is valid only within the function call, so the function
+        should return results not referring to it, e.g. counts or copies of
+        small slices.
+        """
+        def process(path: Path) -> R:
+            with self.map(path) as view:
+                return function(path, view)
+
+        async for path, result in self._run_many(process, paths):
+            yield path, result
+
+    async def _run_many(
+        self,
+        function: Callable[[Path], R],
+        paths: Iterable[Path],
+    ) -> AsyncIterator[tuple[Path, R]]:
+        pending: dict[asyncio.Task[R], Path] = {}
+        path_iterator: Iterator[Path] = iter(paths)
+        try:
+            while True:
+                # paths are taken lazily, so a generator of paths isn't
+                # exhausted before files are read
+                for path in path_iterator:
+                    pending[asyncio.create_task(
+                        asyncio.to_thread(function, path),
+                    )] = path
+                    if len(pending) >= self._max_concurrency:
+                        break
+                if not pending:
+                    return
+
+                done, _ = await asyncio.wait(
+                    pending,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    yield pending.pop(task), task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    def _split_lines(text: str, pending: list[str]) -> Iterator[str]:
+        """
+        Yields lines ended within the text, joined with pending parts of the
+        first line. The unended rest of the text is left in pending parts.
+        """
+        start: int = 0
+        end: int = text.find("\n")
+        while end != -1:
+            pending.append(text[start:end + 1])
+            yield "".join(pending)
+            pending.clear()
+            start = end + 1
+            end = text.find("\n", start)
+        if start < len(text):
+            pending.append(text[start:])
+
+    def _read(self, path: Path) -> bytes:
+        with self._open(path) as f:
+            return f.read()
+
+    def _open(self, path: Path) -> BinaryIO:
+        # closed by callers
+        f: BinaryIO = Path(self._rootdir, path).open("rb")  # noqa: SIM115
+        if hasattr(os, "posix_fadvise"):
+            # lets the OS read ahead more aggressively
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return f
+
+    def _get_buffer_size(self, buffer_size: int | None) -> int:
+        if buffer_size is None:
+            return self._buffer_size
+        self._check_positive("file reader buffer size", buffer_size)
+        return buffer_size
+
+    @staticmethod
+    def _check_positive(title: str, value: int) -> None:
+        if value < 1:
+            raise UnsupportedError(
+                title=title,
+                value=value,
+            )
@@ -1,19 +1,26 @@
-from typing import TYPE_CHECKING, Generic, TypeVar
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
 
 from antievil import (
     CannotBeNoneError,
+    NotFoundError,
     PleaseDefineError,
     TypeExpectError,
 )
 
 from clyjin.base.config import ConfigType
+from clyjin.base.filereader import FileReader
 from clyjin.base.moduleargs import ModuleArgsType
 
 if TYPE_CHECKING:
     from pathlib import Path
 
+    from clyjin.base.changeset import ChangeSet
     from clyjin.base.moduledata import ModuleData
+    from clyjin.base.output import OutputWriter
     from clyjin.base.plugin import Plugin
+    from clyjin.base.processpool import ProcessPool
+    from clyjin.base.store import Store
 
 ModuleType = TypeVar("ModuleType", bound="Module")
 class Module(Generic[ModuleArgsType, ConfigType]):
@@ -30,14 +37,13 @@ class Module(Generic[ModuleArgsType, ConfigType]):
     A custom-defined Config can be attached to every Module, which is parsed by
     Clyjin from the user's configuration file, AKA `clyjin.yml`.
 
-    In the configuration file, a field with the name, corresponding to the
-    Module's name is used to store any configuration data. For example, for a
-    Module named `DonutShopModule`, the according field will be named
-    `DonutShop`.
+    In the configuration file, a Plugin's section under the Plugin's name
+    maps names of Modules to their configuration data. For example, for a
+    Module named `build` of a Plugin named `donutshop`, the according field
+    is `donutshop.build`, and for a root Module it is `donutshop.$root`.
 
-    To attach a config, class-attribute `Model.CONFIG` is used. For further
-    details of Config making, see according documentation at
-    [Config]($(ref.orwynn.core.config.Config)).
+    To attach a config, class-attribute `Module.CONFIG_CLASS` is used. A
+    Module missing in the configuration file gets the Config class' defaults.
 
     Class-Attributes:
         Name:
@@ -54,6 +60,19 @@ class Module(Generic[ModuleArgsType, ConfigType]):
         CONFIG_CLASS(optional):
             Config class attached to the Module. No config is attached by
             default.
+        UseProcessPool(optional):
+            Whether the Module offloads CPU-bound work to the core's process
+            pool, available as `self.process_pool`. Defaults to False.
+        UseCache(optional):
+            Whether results of the Module's executions are cached, so an
+            execution with the same args, config and contents of input paths
+            restores the cached output instead of calling `execute()`.
+            Should be set only for Modules, which results depend on nothing
+            else. Defaults to False.
+        UseIncremental(optional):
+            Whether the Module processes only input files changed since its
+            last successful execution, available as `self.changes`. The
+            execution is skipped if nothing has changed. Defaults to False.
 
     Attributes:
         module_data:
@@ -65,6 +84,9 @@ class Module(Generic[ModuleArgsType, ConfigType]):
     Description: str | None = None
     Args: ModuleArgsType | None = None
     CONFIG_CLASS: type[ConfigType] | None = None
+    UseProcessPool: bool = False
+    UseCache: bool = False
+    UseIncremental: bool = False
 
     def __init__(
         self,
@@ -77,8 +99,17 @@ class Module(Generic[ModuleArgsType, ConfigType]):
         self._plugin_common_sysdir: Path = module_data.plugin_common_sysdir
         self._module_sysdir: Path = module_data.module_sysdir
         self._rootdir: Path = module_data.rootdir
+        self._sysdir: Path = module_data.sysdir
         self._verbosity_level: int = module_data.verbosity_level
         self._ParentPlugin: type["Plugin"] = module_data.ParentPlugin
+        self._dependency_plugins: dict[str, type["Plugin"]] = \
+            module_data.dependency_plugins
+        self._process_pool: "ProcessPool | None" = module_data.process_pool
+        self._output: "OutputWriter | None" = module_data.output
+        self._store: "Store | None" = module_data.store
+        self._common_store: "Store | None" = module_data.common_store
+        self._changes: "ChangeSet | None" = None
+        self._file_reader: FileReader | None = None
 
     def __str__(self) -> str:
         return \
@@ -114,5 +145,152 @@ class Module(Generic[ModuleArgsType, ConfigType]):
             )
         return self._args
 
+    @property
+    def config(self) -> ConfigType:
+        if self._config is None:
+            raise CannotBeNoneError(
+                title=f"in order to retrieve, Module <{self}> config",
+            )
+        return self._config
+
+    @property
+    def process_pool(self) -> "ProcessPool":
+        if self._process_pool is None:
+            raise PleaseDefineError(
+                cannot_do=f"process pool usage by Module <{self}>",
+                please_define="attribute UseProcessPool",
+            )
+        return self._process_pool
+
+    def get_dependency_plugin(self, name: str) -> type["Plugin"]:
+        """
+        Returns initialized Plugin, which the parent Plugin depends on.
+
+        Raises:
+            NotFoundError:
+                Parent Plugin doesn't depend on such Plugin.
+        """
+        try:
+            return self._dependency_plugins[name]
+        except KeyError as error:
+            raise NotFoundError(
+                title=f"dependency plugin of Module <{self}>",
+                value=name,
+            ) from error
+
+    @property
+    def output(self) -> "OutputWriter":
+        """
+        Channel to write Module's records to, streamed in the format
+        requested by the caller.
+        """
+        if self._output is None:
+            raise CannotBeNoneError(
+                title=f"in order to retrieve, Module <{self}> output",
+            )
+        return self._output
+
+    @property
+    def store(self) -> "Store":
+        """
+        Persistent key-value store of the Module kept in `module_sysdir`.
+        """
+        if self._store is None:
+            raise CannotBeNoneError(
+                title=f"in order to retrieve, Module <{self}> store",
+            )
+        return self._store
+
+    @property
+    def common_store(self) -> "Store":
+        """
+        Persistent key-value store shared by all Modules of the parent
+        Plugin, kept in `plugin_common_sysdir`.
+        """
+        if self._common_store is None:
+            raise CannotBeNoneError(
+                title=f"in order to retrieve, Module <{self}> common store",
+            )
+        return self._common_store
+
+    @property
+    def file_reader(self) -> FileReader:
+        """
+        Reader of large files under the rootdir, which maps them to memory or
+        reads them in chunks instead of loading them at once.
+        """
+        if self._file_reader is None:
+            self._file_reader = FileReader(self._rootdir)
+        return self._file_reader
+
+    def get_cache_input_paths(self) -> list["Path"]:
+        """
+        Returns files and directories the Module's results depend on, used
+        if `UseCache` is set. Relative paths are resolved from the rootdir.
+        """
+        return []
+
+    def get_cache_output_paths(self) -> list["Path"]:
+        """
+        Returns files and directories written by the Module, which are
+        cached and restored with the Module's output, used if `UseCache` is
+        set. Relative paths are resolved from the rootdir.
+        """
+        return []
+
+    def get_input_patterns(self) -> list[str]:
+        """
+        Returns glob patterns of input files relative to the rootdir, used
+        if `UseIncremental` is set. A matched directory stands for all files
+        within it.
+        """
+        return []
+
+    def get_output_patterns(self) -> list[str]:
+        """
+        Returns glob patterns of files written by the Module relative to the
+        rootdir, used if `UseIncremental` is set. If outputs are changed
+        outside of the Module, all inputs are processed again.
+        """
+        return []
+
+    @property
+    def changes(self) -> "ChangeSet":
+        """
+        Input files changed since the last successful execution, set by the
+        core for Modules with `UseIncremental`.
+
+        In the watch mode, other Modules get watched files changed since the
+        previous execution, starting from the second execution.
+        """
+        if self._changes is None:
+            raise PleaseDefineError(
+                cannot_do=f"changes retrieval by Module <{self}>",
+                please_define="attribute UseIncremental",
+            )
+        return self._changes
+
+    @changes.setter
+    def changes(self, changes: "ChangeSet") -> None:
+        self._changes = changes
+
+    async def stream(self, items: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """
+        Executes the Module as a stage of a pipeline, consuming items of the
+        previous stage and yielding items to the next one.
+
+        By default, the Module is executed ignoring the items and yields
+        nothing.
+
+        Args:
+            items:
+                Items yielded by the previous stage, empty for the first
+                stage.
+        """
+        await self.execute()
+        return
+        # makes the method an async generator
+        yield
+
     async def execute(self) -> None:
         raise NotImplementedError
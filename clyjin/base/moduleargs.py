@@ -16,6 +16,36 @@ class ModuleArgs(Model):
 
     @abstract
     """
+    def get_values(self) -> dict[str, Any]:
+        """
+        Returns values by names of args, with None for args without values.
+        """
+        return {
+            name: getattr(self, name)._value  # noqa: SLF001
+            for name in type(self).model_fields
+        }
+
+    def with_values(
+        self: ModuleArgsType,
+        values: dict[str, Any],
+    ) -> ModuleArgsType:
+        """
+        Returns a copy of args with given values attached.
+
+        Only the args object and the args with values are copied, and only
+        shallowly, so populating args for a call stays cheap for any amount
+        of args.
+
+        Args:
+            values:
+                Values by names of args.
+        """
+        populated_args: ModuleArgsType = self.model_copy()
+        for name, value in values.items():
+            module_arg: ModuleArg = getattr(self, name).model_copy()
+            module_arg.value = value
+            setattr(populated_args, name, module_arg)
+        return populated_args
 
 
 class ModuleArg(GenericModel, Generic[T]):
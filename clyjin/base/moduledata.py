@@ -1,17 +1,24 @@
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Generic
 
-from pydantic.generics import GenericModel
-
-# we should import Config and ModuleArgs since otherwise Pydantic will give
-# an undefined error for our generic usage
-from clyjin.base.config import Config, ConfigType  # noqa: F401
-from clyjin.base.moduleargs import ModuleArgs, ModuleArgsType  # noqa: F401
+from clyjin.base.config import ConfigType
+from clyjin.base.moduleargs import ModuleArgsType
+from clyjin.base.output import OutputWriter
 from clyjin.base.plugin import Plugin
+from clyjin.base.processpool import ProcessPool
+from clyjin.base.store import Store
 
 
-class ModuleData(GenericModel, Generic[ModuleArgsType, ConfigType]):
+@dataclass(frozen=True, slots=True)
+class ModuleData(Generic[ModuleArgsType, ConfigType]):
     """
+    Data the core creates a Module with.
+
+    It's a plain slotted dataclass rather than a pydantic model, since its
+    values are created by the core, and user's data, i.e. args and config,
+    is already validated by their own models.
+
     Attributes:
         name:
             Module's name either taken from the `Name` attribute or by
@@ -27,6 +34,9 @@ class ModuleData(GenericModel, Generic[ModuleArgsType, ConfigType]):
             Parsed instance of class defined in `CONFIG_CLASS` attribute.
         rootdir:
             From where the module was called from.
+        sysdir:
+            Root system directory of Clyjin. Mostly used by the core, plugins
+            should prefer `plugin_common_sysdir` and `module_sysdir`.
         plugin_common_sysdir:
             System directory for Plugin's common files used by all Plugin's
             modules.
@@ -35,6 +45,19 @@ class ModuleData(GenericModel, Generic[ModuleArgsType, ConfigType]):
             this directory for long-term file-storage needs.
         verbosity_level:
             How verbose module's messages should be.
+        process_pool(optional):
+            Process pool shared by the core, passed only to Modules with
+            `UseProcessPool` set. Defaults to None.
+        dependency_plugins(optional):
+            Initialized Plugins the parent Plugin depends on, directly or
+            indirectly, by their names. Defaults to empty dict.
+        output(optional):
+            Channel to write Module's records to. Defaults to None.
+        store(optional):
+            Key-value store kept in `module_sysdir`. Defaults to None.
+        common_store(optional):
+            Key-value store kept in `plugin_common_sysdir`, shared by all
+            Plugin's modules. Defaults to None.
     """
     name: str
     ParentPlugin: type[Plugin]
@@ -44,4 +67,10 @@ class ModuleData(GenericModel, Generic[ModuleArgsType, ConfigType]):
     plugin_common_sysdir: Path
     module_sysdir: Path
     rootdir: Path
+    sysdir: Path
     verbosity_level: int
+    process_pool: ProcessPool | None = None
+    dependency_plugins: dict[str, type[Plugin]] = field(default_factory=dict)
+    output: OutputWriter | None = None
+    store: Store | None = None
+    common_store: Store | None = None
@@ -0,0 +1,193 @@
+import csv
+import dataclasses
+import io
+import json
+import sys
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any, TextIO
+
+from antievil import UnsupportedError
+from pydantic import BaseModel
+
+
+class OutputWriter:
+    """
+    Output channel of a Module streaming records in the format requested by
+    the `--output-format` option to stdout, or to the file given by the
+    `--output` option.
+
+    Records are formatted as soon as they're written and are kept only in
+    a buffer of limited size, so a Module can emit any amount of records
+    without accumulating them in memory. Interactive stdout is flushed after
+    each record.
+
+    Pickled writer is detached: it cannot be written to within a worker
+    process, since records of workers would be interleaved with the
+    Module's ones.
+
+    Records can be mappings, pydantic models, dataclasses, sequences or any
+    other objects:
+    - `text`: mappings and sequences are written as tab-separated values,
+        other objects as their string representation
+    - `ndjson`: each record is written as a JSON object on a separate line
+    - `csv`: the header is taken from fields of the first mapping record
+
+    Attributes:
+        format(optional):
+            One of `text`, `ndjson` or `csv`. Defaults to `text`.
+        path(optional):
+            File to write to, which is created on first flush. Defaults to
+            None, i.e. stdout is used.
+        buffer_size(optional):
+            How many characters are kept before they're written at once.
+            Defaults to 64 KiB.
+    """
+    Formats: list[str] = ["text", "ndjson", "csv"]
+    DefaultBufferSize: int = 64 * 1024
+
+    def __init__(
+        self,
+        format: str = "text",
+        path: Path | None = None,
+        *,
+        buffer_size: int = DefaultBufferSize,
+    ) -> None:
+        if format not in self.Formats:
+            raise UnsupportedError(
+                title="output format",
+                value=format,
+            )
+        self._format: str = format
+        self._path: Path | None = path
+        self._buffer_size: int = buffer_size
+        self._is_detached: bool = False
+        self._reset()
+
+    @property
+    def format(self) -> str:
+        return self._format
+
+    @property
+    def path(self) -> Path | None:
+        return self._path
+
+    @property
+    def records_count(self) -> int:
+        return self._records_count
+
+    def write(self, record: Any) -> None:
+        if self._is_detached:
+            raise UnsupportedError(
+                title="output usage within a worker process",
+                value=self,
+            )
+        chunk: str = self._format_record(record)
+        self._chunks.append(chunk)
+        self._buffered_size += len(chunk)
+        self._records_count += 1
+
+        if self._is_line_buffered is None:
+            self._is_line_buffered = \
+                self._path is None and sys.stdout.isatty()
+        if self._is_line_buffered or self._buffered_size >= self._buffer_size:
+            self.flush()
+
+    def write_many(self, records: Iterable[Any]) -> None:
+        for record in records:
+            self.write(record)
+
+    def flush(self) -> None:
+        if not self._chunks:
+            return
+        stream: TextIO = self._get_stream()
+        stream.write("".join(self._chunks))
+        stream.flush()
+        self._chunks.clear()
+        self._buffered_size = 0
+
+    def close(self) -> None:
+        """
+        Flushes buffered records and closes the file, if any.
+
+        Records written after closing start a new output, e.g. on the next
+        execution in the watch mode: the file is written anew and the CSV
+        header is written again.
+        """
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._csv_fieldnames = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {
+            "_format": self._format,
+            "_path": self._path,
+            "_buffer_size": self._buffer_size,
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self._format = state["_format"]
+        self._path = state["_path"]
+        self._buffer_size = state["_buffer_size"]
+        self._is_detached = True
+        self._reset()
+
+    def _reset(self) -> None:
+        self._chunks: list[str] = []
+        self._buffered_size: int = 0
+        self._records_count: int = 0
+        self._file: TextIO | None = None
+        self._is_line_buffered: bool | None = None
+
+        self._csv_buffer: io.StringIO = io.StringIO()
+        self._csv_writer: Any = csv.writer(self._csv_buffer)
+        self._csv_fieldnames: list[str] | None = None
+
+    def _get_stream(self) -> TextIO:
+        if self._path is None:
+            return sys.stdout
+        if self._file is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            # csv module handles line endings by itself
+            self._file = self._path.open("w", newline="")
+        return self._file
+
+    def _format_record(self, record: Any) -> str:
+        data: Any = self._get_data(record)
+        if self._format == "ndjson":
+            return json.dumps(data, ensure_ascii=False, default=str) + "\n"
+        elif self._format == "csv":
+            return self._format_csv_row(data)
+
+        if isinstance(data, Mapping):
+            return "\t".join(str(v) for v in data.values()) + "\n"
+        elif isinstance(data, list | tuple):
+            return "\t".join(str(v) for v in data) + "\n"
+        return f"{record}\n"
+
+    def _format_csv_row(self, data: Any) -> str:
+        if isinstance(data, Mapping):
+            if self._csv_fieldnames is None:
+                self._csv_fieldnames = [str(k) for k in data]
+                self._csv_writer.writerow(self._csv_fieldnames)
+            self._csv_writer.writerow(
+                [data.get(k) for k in self._csv_fieldnames],
+            )
+        elif isinstance(data, list | tuple):
+            self._csv_writer.writerow(data)
+        else:
+            self._csv_writer.writerow([data])
+
+        row: str = self._csv_buffer.getvalue()
+        self._csv_buffer.seek(0)
+        self._csv_buffer.truncate()
+        return row
+
+    def _get_data(self, record: Any) -> Any:
+        if isinstance(record, BaseModel):
+            return record.model_dump(mode="json")
+        elif dataclasses.is_dataclass(record) and not isinstance(record, type):
+            return dataclasses.asdict(record)
+        return record
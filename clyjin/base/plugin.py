@@ -26,14 +26,21 @@ class Plugin:
             List of Module classes registered by this plugin.
         Version(optional):
             Version of the Plugin. Defaults to NONE.
+        Dependencies(optional):
+            Names of Plugins, which should be initialized before this
+            Plugin. Plugins without dependencies between each other are
+            initialized concurrently. Defaults to None, i.e. no
+            dependencies.
 
     @abstract
     """
     Name: str | None = None
     ModuleClasses: list[type["Module"]] | None = None
     Version: str | None = None
+    Dependencies: list[str] | None = None
 
     _RootModule: type["Module"] | None = None
+    _ModuleClassesByName: dict[str, type["Module"]] | None = None
 
     def __init__(self) -> None:
         raise NotImplementedError
@@ -105,6 +112,20 @@ class Plugin:
 
         return cls.Version
 
+    @classmethod
+    def get_dependencies(cls) -> list[str]:
+        if cls.Dependencies is None:
+            return []
+        elif not isinstance(cls.Dependencies, list):
+            raise TypeExpectError(
+                obj=cls.Dependencies,
+                ExpectedType=list,
+                expected_inheritance="instance",
+                ActualType=type(cls.Dependencies),
+            )
+
+        return [name.strip().lower() for name in cls.Dependencies]
+
     @classmethod
     def get_namespaced_module_name(cls, ModuleClass: type["Module"]) -> str:
         """
@@ -120,20 +141,26 @@ class Plugin:
 
     @classmethod
     def get_module_class(cls, name: str) -> type["Module"]:
-        # TODO(ryzhovalex): cache search results for better performance
-        # 0
-
-        for ModuleClass in cls.get_module_classes():
-            if ModuleClass.cls_get_name() == name:
-                return ModuleClass
-
-        raise NotFoundError(
-            title="module class with namespaced name",
-            value=name,
-            options={
-                "plugin_class": cls.get_str(),
-            },
-        )
+        # map is kept in the class's own dict, so subclasses don't share it
+        ModuleClassesByName: dict[str, type["Module"]] | None = \
+            cls.__dict__.get("_ModuleClassesByName")
+        if ModuleClassesByName is None:
+            ModuleClassesByName = {
+                ModuleClass.cls_get_name(): ModuleClass
+                for ModuleClass in cls.get_module_classes()
+            }
+            cls._ModuleClassesByName = ModuleClassesByName
+
+        try:
+            return ModuleClassesByName[name]
+        except KeyError as error:
+            raise NotFoundError(
+                title="module class with namespaced name",
+                value=name,
+                options={
+                    "plugin_class": cls.get_str(),
+                },
+            ) from error
 
     @classmethod
     def _check_has_module(cls, ModuleClass: type["Module"]) -> None:
@@ -1,18 +1,33 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from pathlib import Path  # noqa: TCH003
 
-from clyjin.base.model import Model
 from clyjin.base.module import Module  # noqa: TCH001
 
 
-class PluginInitializeData(Model):
+@dataclass(frozen=True, slots=True)
+class PluginInitializeData:
+    """
+    Data the core initializes Plugins with.
+
+    Attributes:
+        root_dir:
+            From where the module was called from.
+        config_path:
+            Path to the config file, which might not exist.
+        called_module:
+            Instance of the called Module.
+        called_plugin_sysdir:
+            System directory of the called Module's Plugin.
+        called_plugin_common_sysdir:
+            System directory for Plugin's common files.
+        called_module_sysdir:
+            System directory of the called Module.
+    """
     root_dir: Path
     config_path: Path
     called_module: Module
     called_plugin_sysdir: Path
     called_plugin_common_sysdir: Path
     called_module_sysdir: Path
-
-    class Config:
-        arbitrary_types_allowed = True
@@ -0,0 +1,154 @@
+import asyncio
+import functools
+import itertools
+import math
+import multiprocessing
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, TypeVar
+
+from antievil import UnsupportedError
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _call_chunk(function: Callable[[T], R], chunk: list[T]) -> list[R]:
+    return [function(item) for item in chunk]
+
+
+class ProcessPool:
+    """
+    Pool of worker processes shared by Modules for CPU-bound work.
+
+    The pool is owned by the core: worker processes are started on first
+    use and are shut down once Clyjin stops, so they're reused by all
+    Modules executed by the same process, e.g. by the resident server.
+
+    Functions and their arguments are sent to workers by pickling, so
+    functions should be defined at a module's top level.
+
+    Workers are started by a fork server, or spawned where it's unavailable,
+    rather than forked from Clyjin's process, since forking a process
+    running threads, e.g. the event loop's executor, may copy locks held by
+    them and deadlock the worker.
+
+    Pickled pool is detached: it cannot be used within a worker, which
+    prevents workers from starting pools of their own.
+
+    Attributes:
+        max_workers(optional):
+            Maximum amount of worker processes. Defaults to amount of CPUs.
+    """
+    StartMethods: list[str] = ["forkserver", "spawn"]
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self._max_workers: int = \
+            (os.cpu_count() or 1) if max_workers is None else max_workers
+        self._executor: ProcessPoolExecutor | None = None
+        self._is_detached: bool = False
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    @property
+    def is_started(self) -> bool:
+        return self._executor is not None
+
+    async def submit(
+        self,
+        function: Callable[..., R],
+        *args: Any,
+        **kwargs: Any,
+    ) -> R:
+        """
+        Executes the function with given arguments in a worker process.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._get_executor(),
+            functools.partial(function, *args, **kwargs),
+        )
+
+    async def map(
+        self,
+        function: Callable[[T], R],
+        items: Iterable[T],
+        *,
+        chunksize: int | None = None,
+    ) -> list[R]:
+        """
+        Applies the function to each item in worker processes.
+
+        Items are sent to workers in chunks to reduce the cost of inter-process
+        communication for small items.
+
+        Args:
+            function:
+                Function to apply.
+            items:
+                Items to apply the function to.
+            chunksize(optional):
+                How many items are sent to a worker at once. By default
+                items are split to four chunks per worker.
+
+        Returns:
+            Results in the order of items.
+        """
+        item_list: list[T] = list(items)
+        if not item_list:
+            return []
+
+        if chunksize is None:
+            chunksize = math.ceil(len(item_list) / (self._max_workers * 4))
+        elif chunksize < 1:
+            raise UnsupportedError(
+                title="process pool map chunksize",
+                value=chunksize,
+            )
+
+        chunk_results: list[list[R]] = await asyncio.gather(*(
+            self.submit(_call_chunk, function, item_list[i:i + chunksize])
+            for i in range(0, len(item_list), chunksize)
+        ))
+        return list(itertools.chain.from_iterable(chunk_results))
+
+    def shutdown(self) -> None:
+        """
+        Stops worker processes, cancelling not started work. The pool can be
+        used again after the shutdown, new workers are started on demand.
+        """
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._is_detached:
+            raise UnsupportedError(
+                title="process pool usage within a worker process",
+                value=self,
+            )
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                self._max_workers,
+                mp_context=self._get_mp_context(),
+            )
+        return self._executor
+
+    @classmethod
+    def _get_mp_context(cls) -> multiprocessing.context.BaseContext:
+        available_methods: list[str] = multiprocessing.get_all_start_methods()
+        return multiprocessing.get_context(next(
+            method for method in cls.StartMethods
+            if method in available_methods
+        ))
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"_max_workers": self._max_workers}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self._max_workers = state["_max_workers"]
+        self._executor = None
+        self._is_detached = True
@@ -0,0 +1,336 @@
+import asyncio
+import contextlib
+import functools
+import json
+import sqlite3
+import sys
+from collections.abc import (
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+)
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, TypeVar
+
+from antievil import UnsupportedError
+
+R = TypeVar("R")
+
+_Missing: object = object()
+_SurrogatesStart: int = 0xD800
+_SurrogatesEnd: int = 0xE000
+
+
+class StoreTransaction:
+    """
+    Writes collected to be applied to a Store atomically.
+
+    Created by `Store.transaction()`, collected writes are applied at once
+    on exit from the transaction's context, or dropped if an error is
+    raised within it.
+    """
+    def __init__(self) -> None:
+        self._writes: list[tuple[str, str | None]] = []
+
+    @property
+    def writes(self) -> list[tuple[str, str | None]]:
+        """
+        Keys with encoded values, or with None for deleted keys, in order
+        of their writing.
+        """
+        return self._writes
+
+    def set(self, key: str, value: Any) -> None:
+        self._writes.append((key, json.dumps(value)))
+
+    def set_many(self, items: Mapping[str, Any]) -> None:
+        for key, value in items.items():
+            self.set(key, value)
+
+    def delete(self, key: str) -> None:
+        self._writes.append((key, None))
+
+
+class Store:
+    """
+    Persistent async key-value store of JSON-serializable values.
+
+    Entries are kept in an SQLite database in WAL mode, so the store can be
+    read while being written, including by other processes. Database is
+    opened on first use, and all operations of the store are executed one
+    by one in a dedicated thread, so concurrently running Modules can share
+    the store without blocking the event loop.
+
+    Each write is committed at once; to write many entries in one commit,
+    use `set_many()` or `transaction()`.
+
+    Pickled store is detached: it cannot be used within a worker process,
+    since the worker's connection to the database would never be closed.
+
+    Attributes:
+        path:
+            Path to the database file.
+        busy_timeout(optional):
+            How many seconds to wait for a lock held by another process.
+            Defaults to 30.
+    """
+    FileName: str = "store.sqlite3"
+
+    def __init__(self, path: Path, *, busy_timeout: float = 30) -> None:
+        self._path: Path = path
+        self._busy_timeout: float = busy_timeout
+        self._executor: ThreadPoolExecutor | None = None
+        self._connection: sqlite3.Connection | None = None
+        self._is_detached: bool = False
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def is_opened(self) -> bool:
+        return self._executor is not None
+
+    @classmethod
+    def from_dir(cls, directory: Path) -> "Store":
+        return cls(Path(directory, cls.FileName))
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        rows: list[tuple[str, str]] = await self._run(
+            self._select,
+            "SELECT key, value FROM entries WHERE key = ?",
+            (key,),
+        )
+        if not rows:
+            return default
+        return json.loads(rows[0][1])
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """
+        Returns values of existing keys among the given ones.
+        """
+        return dict(await self._run(self._select_many, list(keys)))
+
+    async def has(self, key: str) -> bool:
+        return await self.get(key, _Missing) is not _Missing
+
+    async def scan(
+        self,
+        prefix: str = "",
+        *,
+        limit: int | None = None,
+    ) -> list[tuple[str, Any]]:
+        """
+        Returns entries which keys start with the prefix, ordered by keys.
+
+        Args:
+            prefix(optional):
+                Prefix of keys to return. All entries are returned by
+                default.
+            limit(optional):
+                Maximum amount of entries to return. Not limited by default.
+        """
+        if limit is not None and limit < 0:
+            raise UnsupportedError(
+                title="store scan limit",
+                value=limit,
+            )
+
+        # prefix is matched by the key range to use the primary key index
+        query: str = "SELECT key, value FROM entries WHERE key >= ?"
+        params: list[Any] = [prefix]
+        upper_bound: str | None = self._get_prefix_upper_bound(prefix)
+        if upper_bound is not None:
+            query += " AND key < ?"
+            params.append(upper_bound)
+        query += " ORDER BY key"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        rows: list[tuple[str, str]] = await self._run(
+            self._select,
+            query,
+            tuple(params),
+        )
+        return [(key, json.loads(value)) for key, value in rows]
+
+    async def set(self, key: str, value: Any) -> None:
+        await self._run(self._write, [(key, json.dumps(value))])
+
+    async def set_many(self, items: Mapping[str, Any]) -> None:
+        """
+        Writes all items in one commit.
+        """
+        await self._run(self._write, [
+            (key, json.dumps(value)) for key, value in items.items()
+        ])
+
+    async def delete(self, key: str) -> None:
+        await self._run(self._write, [(key, None)])
+
+    async def delete_prefix(self, prefix: str) -> None:
+        """
+        Deletes all entries which keys start with the prefix.
+        """
+        await self._run(
+            self._delete_range,
+            prefix,
+            self._get_prefix_upper_bound(prefix),
+        )
+
+    @contextlib.asynccontextmanager
+    async def transaction(self) -> AsyncIterator[StoreTransaction]:
+        """
+        Collects writes to apply them in one commit on exit.
+
+        Reads within the transaction see the store's state without the
+        collected writes.
+        """
+        transaction: StoreTransaction = StoreTransaction()
+        yield transaction
+        if transaction.writes:
+            await self._run(self._write, transaction.writes)
+
+    def close(self) -> None:
+        """
+        Waits for started operations and closes the database. The store is
+        reopened on the next use.
+        """
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def _run(self, function: Callable[..., R], *args: Any) -> R:
+        if self._is_detached:
+            raise UnsupportedError(
+                title="store usage within a worker process",
+                value=self,
+            )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="clyjin_store",
+            )
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            functools.partial(function, *args),
+        )
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"_path": self._path, "_busy_timeout": self._busy_timeout}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self._path = state["_path"]
+        self._busy_timeout = state["_busy_timeout"]
+        self._executor = None
+        self._connection = None
+        self._is_detached = True
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is not None:
+            return self._connection
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        # transactions are managed explicitly
+        connection: sqlite3.Connection = sqlite3.connect(
+            self._path,
+            timeout=self._busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries"
+            " (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID",
+        )
+        self._connection = connection
+        return connection
+
+    def _select(
+        self,
+        query: str,
+        params: tuple[Any, ...],
+    ) -> list[tuple[str, str]]:
+        return self._get_connection().execute(query, params).fetchall()
+
+    def _select_many(self, keys: list[str]) -> list[tuple[str, Any]]:
+        connection: sqlite3.Connection = self._get_connection()
+        rows: list[tuple[str, Any]] = []
+        # keeps params within SQLite's default limit of host parameters
+        chunk_size: int = 500
+        for i in range(0, len(keys), chunk_size):
+            chunk: list[str] = keys[i:i + chunk_size]
+            rows.extend(
+                (key, json.loads(value))
+                # only placeholders are formatted into the query
+                for key, value in connection.execute(
+                    "SELECT key, value FROM entries WHERE key IN"  # noqa: S608
+                    f" ({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+            )
+        return rows
+
+    def _write(self, writes: list[tuple[str, str | None]]) -> None:
+        with self._begin() as connection:
+            for key, value in writes:
+                if value is None:
+                    connection.execute(
+                        "DELETE FROM entries WHERE key = ?",
+                        (key,),
+                    )
+                else:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO entries (key, value)"
+                        " VALUES (?, ?)",
+                        (key, value),
+                    )
+
+    def _delete_range(self, prefix: str, upper_bound: str | None) -> None:
+        with self._begin() as connection:
+            if upper_bound is None:
+                connection.execute(
+                    "DELETE FROM entries WHERE key >= ?",
+                    (prefix,),
+                )
+            else:
+                connection.execute(
+                    "DELETE FROM entries WHERE key >= ? AND key < ?",
+                    (prefix, upper_bound),
+                )
+
+    @contextlib.contextmanager
+    def _begin(self) -> Iterator[sqlite3.Connection]:
+        connection: sqlite3.Connection = self._get_connection()
+        # the write lock is taken at once, so concurrent writers wait for
+        # the busy timeout instead of failing on lock upgrade
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _get_prefix_upper_bound(self, prefix: str) -> str | None:
+        """
+        Returns the smallest string greater than all strings starting with
+        the prefix, or None if there is no such string.
+        """
+        stripped_prefix: str = prefix.rstrip(chr(sys.maxunicode))
+        if not stripped_prefix:
+            return None
+        next_code: int = ord(stripped_prefix[-1]) + 1
+        # surrogates cannot be encoded to UTF-8 stored by SQLite
+        if _SurrogatesStart <= next_code < _SurrogatesEnd:
+            next_code = _SurrogatesEnd
+        return stripped_prefix[:-1] + chr(next_code)
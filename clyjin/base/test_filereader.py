@@ -0,0 +1,123 @@
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from antievil import UnsupportedError
+
+from clyjin.base.filereader import FileReader
+
+
+def count_lines(_: Path, view: memoryview) -> int:
+    return view.tobytes().count(b"\n")
+
+
+def test_map(tmp_path: Path):
+    Path(tmp_path, "data.bin").write_bytes(b"hello world")
+    Path(tmp_path, "empty.bin").write_bytes(b"")
+    reader: FileReader = FileReader(tmp_path)
+
+    with reader.map(Path("data.bin")) as view:
+        assert view.readonly
+        assert view[6:].tobytes() == b"world"
+    with reader.map(Path("empty.bin")) as view:
+        assert len(view) == 0
+
+
+@pytest.mark.asyncio
+async def test_iter_chunks(tmp_path: Path):
+    Path(tmp_path, "data.bin").write_bytes(bytes(range(10)))
+    reader: FileReader = FileReader(tmp_path, buffer_size=4)
+
+    chunks: list[bytes] = [
+        c async for c in reader.iter_chunks(Path("data.bin"))
+    ]
+    assert chunks == [bytes(range(4)), bytes(range(4, 8)), bytes(range(8, 10))]
+
+    with pytest.raises(UnsupportedError):
+        [c async for c in reader.iter_chunks(Path("data.bin"), buffer_size=0)]
+
+
+@pytest.mark.asyncio
+async def test_iter_lines(tmp_path: Path):
+    text: str = "first\nsecond line is longer\n\nпоследняя"
+    reader: FileReader = FileReader(tmp_path)
+
+    for encoding in ["utf-8", "utf-16", "utf-32-le"]:
+        Path(tmp_path, "log.txt").write_text(text, encoding=encoding)
+        for buffer_size in [1, 3, 1024]:
+            lines: list[str] = [
+                line async for line in reader.iter_lines(
+                    Path("log.txt"),
+                    buffer_size=buffer_size,
+                    encoding=encoding,
+                )
+            ]
+            assert lines == text.splitlines(keepends=True)
+
+
+@pytest.mark.asyncio
+async def test_read_many_bounds_concurrency(tmp_path: Path):
+    paths: list[Path] = []
+    for i in range(10):
+        Path(tmp_path, f"{i}.txt").write_text(str(i))
+        paths.append(Path(f"{i}.txt"))
+    reader: FileReader = FileReader(tmp_path, max_concurrency=3)
+
+    lock: threading.Lock = threading.Lock()
+    active: list[int] = [0, 0]
+    read = reader._read  # noqa: SLF001
+
+    def tracked_read(path: Path) -> bytes:
+        with lock:
+            active[0] += 1
+            active[1] = max(active[0], active[1])
+        try:
+            threading.Event().wait(0.01)
+            return read(path)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    reader._read = tracked_read  # type: ignore  # noqa: SLF001
+    results: dict[Path, bytes] = {
+        path: contents async for path, contents in reader.read_many(paths)
+    }
+
+    assert results == {p: p.stem.encode() for p in paths}
+    assert 1 < active[1] <= 3  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_process_many(tmp_path: Path):
+    for i in range(5):
+        Path(tmp_path, f"{i}.log").write_text("line\n" * i)
+    reader: FileReader = FileReader(tmp_path, max_concurrency=2)
+
+    results: dict[Path, int] = {
+        path: count async for path, count in reader.process_many(
+            count_lines,
+            sorted(tmp_path.glob("*.log")),
+        )
+    }
+
+    assert results == {Path(tmp_path, f"{i}.log"): i for i in range(5)}
+
+
+@pytest.mark.asyncio
+async def test_read_many_takes_paths_lazily(tmp_path: Path):
+    for i in range(5):
+        Path(tmp_path, f"{i}.txt").write_text(str(i))
+    reader: FileReader = FileReader(tmp_path, max_concurrency=2)
+
+    taken: list[Path] = []
+
+    def get_paths() -> Iterator[Path]:
+        for i in range(5):
+            taken.append(Path(f"{i}.txt"))
+            yield taken[-1]
+
+    async for _ in reader.read_many(get_paths()):
+        break
+
+    assert len(taken) == 2  # noqa: PLR2004
@@ -0,0 +1,68 @@
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from pydantic import ConfigDict
+
+from clyjin.base.model import Model
+from clyjin.base.moduledata import ModuleData
+from clyjin.base.plugin import Plugin
+from clyjin.base.processpool import ProcessPool
+
+
+class _TestPlugin(Plugin):
+    Name = "test"
+
+
+class _ModuleDataModel(Model):
+    """
+    Pydantic model carrying the same fields as ModuleData.
+    """
+    name: str
+    ParentPlugin: type[Plugin]
+    description: str | None
+    args: Any
+    config: Any
+    plugin_common_sysdir: Path
+    module_sysdir: Path
+    rootdir: Path
+    sysdir: Path
+    verbosity_level: int
+    process_pool: ProcessPool | None = None
+    dependency_plugins: dict[str, type[Plugin]] = {}
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+def _measure_size(create: Callable[..., Any], count: int) -> int:
+    kwargs: dict[str, Any] = {
+        "name": "module",
+        "ParentPlugin": _TestPlugin,
+        "description": None,
+        "args": None,
+        "config": None,
+        "plugin_common_sysdir": Path("common"),
+        "module_sysdir": Path("module"),
+        "rootdir": Path("root"),
+        "sysdir": Path("sys"),
+        "verbosity_level": 0,
+    }
+
+    tracemalloc.start()
+    try:
+        instances: list[Any] = [create(**kwargs) for _ in range(count)]
+        size: int = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(instances) == count
+
+    return size
+
+
+def test_module_data_is_lighter_than_model():
+    # creation time isn't compared, since it's too close to be measured
+    # reliably on a loaded machine
+    count: int = 2000
+    assert _measure_size(ModuleData, count) \
+        < _measure_size(_ModuleDataModel, count)
@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from clyjin.base.model import Model
+from clyjin.base.output import OutputWriter
+
+
+@dataclass
+class Row:
+    name: str
+    size: int
+
+
+class RowModel(Model):
+    name: str
+    size: int
+
+
+def test_write_csv_to_file(tmp_path: Path):
+    path: Path = Path(tmp_path, "out", "rows.csv")
+    writer: OutputWriter = OutputWriter("csv", path, buffer_size=16)
+
+    writer.write({"name": "a", "size": 1})
+    writer.write_many([Row("b,c", 2), RowModel(name="d", size=3)])
+    # flushed once the buffer is exceeded, the rest is kept until closing
+    assert path.read_bytes().decode() == "name,size\r\na,1\r\n"
+
+    writer.close()
+    assert path.read_bytes().decode() == \
+        'name,size\r\na,1\r\n"b,c",2\r\nd,3\r\n'
+    assert writer.records_count == 3  # noqa: PLR2004
+
+
+def test_write_csv_after_close(tmp_path: Path):
+    path: Path = Path(tmp_path, "rows.csv")
+    writer: OutputWriter = OutputWriter("csv", path)
+
+    # e.g. executions in the watch mode
+    for size in [1, 2]:
+        writer.write({"name": "a", "size": size})
+        writer.close()
+        assert path.read_bytes().decode() == f"name,size\r\na,{size}\r\n"
+
+
+def test_write_to_stdout(capsys: pytest.CaptureFixture):
+    ndjson_writer: OutputWriter = OutputWriter("ndjson")
+    ndjson_writer.write(Row("a", 1))
+    ndjson_writer.write(Path("b"))
+    ndjson_writer.close()
+
+    text_writer: OutputWriter = OutputWriter()
+    text_writer.write({"name": "a", "size": 1})
+    text_writer.write(Path("b"))
+    text_writer.close()
+
+    assert capsys.readouterr().out == \
+        '{"name": "a", "size": 1}\n"b"\na\t1\nb\n'
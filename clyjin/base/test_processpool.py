@@ -0,0 +1,97 @@
+import os
+import pickle
+import threading
+from pathlib import Path
+
+import pytest
+from antievil import UnsupportedError
+
+from clyjin.base.moduledata import ModuleData
+from clyjin.base.output import OutputWriter
+from clyjin.base.processpool import ProcessPool
+from clyjin.base.store import Store
+from clyjin.core.plugin.plugin import CorePlugin
+
+HeldLock: threading.Lock = threading.Lock()
+
+
+def square_with_pid(x: int) -> tuple[int, int]:
+    return x * x, os.getpid()
+
+
+def acquire_held_lock() -> bool:
+    return HeldLock.acquire(timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_map():
+    pool: ProcessPool = ProcessPool(2)
+    try:
+        results: list[tuple[int, int]] = await pool.map(
+            square_with_pid,
+            range(10),
+            chunksize=3,
+        )
+    finally:
+        pool.shutdown()
+
+    assert [r[0] for r in results] == [x * x for x in range(10)]
+    assert os.getpid() not in {r[1] for r in results}
+    assert not pool.is_started
+
+
+@pytest.mark.asyncio
+async def test_workers_not_forked():
+    pool: ProcessPool = ProcessPool(1)
+    # a forked worker would get a copy of the lock held by this process
+    HeldLock.acquire()
+    try:
+        assert await pool.submit(acquire_held_lock)
+    finally:
+        HeldLock.release()
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_pickled_module_data_has_detached_pool(tmp_path: Path):
+    output: OutputWriter = OutputWriter("csv", Path(tmp_path, "out.csv"))
+    output.write({"a": 1})
+    store: Store = Store.from_dir(tmp_path)
+    # the store's thread and connection are started
+    await store.set("a", 1)
+    module_data: ModuleData = ModuleData(
+        name="schema",
+        ParentPlugin=CorePlugin,
+        description=None,
+        args=None,
+        config=None,
+        plugin_common_sysdir=tmp_path,
+        module_sysdir=tmp_path,
+        rootdir=tmp_path,
+        sysdir=tmp_path,
+        verbosity_level=0,
+        process_pool=ProcessPool(2),
+        output=output,
+        store=store,
+        common_store=store,
+    )
+
+    try:
+        unpickled: ModuleData = pickle.loads(  # noqa: S301
+            pickle.dumps(module_data),
+        )
+    finally:
+        output.close()
+        store.close()
+
+    assert unpickled.ParentPlugin is CorePlugin
+    assert unpickled.process_pool is not None
+    with pytest.raises(UnsupportedError):
+        await unpickled.process_pool.submit(square_with_pid, 2)
+    assert unpickled.output is not None
+    assert unpickled.output.path == Path(tmp_path, "out.csv")
+    with pytest.raises(UnsupportedError):
+        unpickled.output.write({"a": 2})
+    assert unpickled.store is not None
+    with pytest.raises(UnsupportedError):
+        await unpickled.store.get("a")
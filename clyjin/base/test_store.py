@@ -0,0 +1,53 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from clyjin.base.store import Store
+
+
+@pytest.mark.asyncio
+async def test_store(tmp_path: Path):
+    store: Store = Store.from_dir(tmp_path)
+    assert not store.is_opened
+    try:
+        await store.set("a", {"value": 1})
+        await store.set_many({f"item.{i:03}": i for i in range(100)})
+        await asyncio.gather(*(
+            store.set(f"item.{i:03}", -i) for i in range(10)
+        ))
+
+        assert await store.get("a") == {"value": 1}
+        assert await store.get("missing", 0) == 0
+        assert await store.has("a")
+        assert await store.get_many(["a", "missing"]) == {"a": {"value": 1}}
+
+        scanned: list[tuple[str, int]] = await store.scan("item.", limit=11)
+        assert scanned == [
+            *((f"item.{i:03}", -i) for i in range(10)),
+            ("item.010", 10),
+        ]
+
+        with pytest.raises(ValueError):
+            async with store.transaction() as transaction:
+                transaction.set("a", 2)
+                raise ValueError
+        assert await store.get("a") == {"value": 1}
+
+        async with store.transaction() as transaction:
+            transaction.set("a", 2)
+            transaction.delete("item.000")
+        assert await store.get("a") == 2  # noqa: PLR2004
+        assert not await store.has("item.000")
+
+        await store.delete_prefix("item.")
+        assert await store.scan() == [("a", 2)]
+    finally:
+        store.close()
+
+    # entries persist once the store is reopened
+    reopened_store: Store = Store.from_dir(tmp_path)
+    try:
+        assert await reopened_store.get("a") == 2  # noqa: PLR2004
+    finally:
+        reopened_store.close()
@@ -0,0 +1,168 @@
+import asyncio
+import io
+import shlex
+import sys
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from antievil import UnsupportedError
+
+from clyjin.core.stdio import Stdio, StdioRouter
+from clyjin.log import Log
+
+
+@dataclass(frozen=True, slots=True)
+class BatchCall:
+    """
+    Module call read from a batch.
+
+    Attributes:
+        line_number:
+            Number of the batch line the call is read from.
+        args:
+            Args of the call, including the common args of the batch.
+    """
+    line_number: int
+    args: list[str]
+
+
+@dataclass(frozen=True, slots=True)
+class BatchCallResult:
+    """
+    Outcome of an executed batch call with its captured output.
+    """
+    call: BatchCall
+    exit_code: int
+    stdout: str
+    stderr: str
+
+
+class Batch:
+    """
+    Set of Module calls executed within one process.
+
+    Each line of a batch source is a call written as for the command line,
+    e.g. `someplugin.somemodule --value 1`. Empty lines and lines starting
+    with `#` are skipped.
+
+    Attributes:
+        calls:
+            Calls of the batch in the input order.
+    """
+    def __init__(self, calls: list[BatchCall]) -> None:
+        self._calls: list[BatchCall] = calls
+
+    @property
+    def calls(self) -> list[BatchCall]:
+        return self._calls
+
+    @classmethod
+    def read(cls, source: str, common_args: list[str]) -> "Batch":
+        """
+        Reads batch calls from the file, or from stdin if the source is `-`.
+
+        Args:
+            source:
+                Path to the file or `-`.
+            common_args:
+                Args to prepend to each call, e.g. `--sysdir`.
+        """
+        if source == "-":
+            return cls.parse(sys.stdin, common_args)
+        with Path(source).open("r") as f:
+            return cls.parse(f, common_args)
+
+    @classmethod
+    def parse(cls, lines: Iterable[str], common_args: list[str]) -> "Batch":
+        calls: list[BatchCall] = []
+        for line_number, line in enumerate(lines, 1):
+            stripped_line: str = line.strip()
+            if not stripped_line or stripped_line.startswith("#"):
+                continue
+            calls.append(BatchCall(
+                line_number=line_number,
+                args=[*common_args, *shlex.split(stripped_line)],
+            ))
+        return cls(calls)
+
+    async def run(
+        self,
+        call: Callable[[list[str]], Awaitable[int]],
+        *,
+        jobs: int = 1,
+        is_as_completed: bool = False,
+    ) -> int:
+        """
+        Executes batch calls concurrently and writes their output.
+
+        Output of each call is captured and written at once after the call
+        is completed, so outputs of different calls never interleave.
+
+        Args:
+            call:
+                Function executing a call by args and returning its exit
+                code.
+            jobs(optional):
+                How many calls can be executed at the same time. Defaults to
+                1.
+            is_as_completed(optional):
+                Whether to write output of calls in order of their
+                completion. By default output is written in the input order.
+
+        Returns:
+            The highest exit code of executed calls.
+        """
+        if jobs < 1:
+            raise UnsupportedError(
+                title="batch jobs count",
+                value=jobs,
+            )
+
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(jobs)
+        tasks: list[asyncio.Task[BatchCallResult]] = [
+            asyncio.create_task(self._run_call(call, batch_call, semaphore))
+            for batch_call in self._calls
+        ]
+
+        exit_code: int = 0
+        for task in (
+            asyncio.as_completed(tasks) if is_as_completed else tasks
+        ):
+            result: BatchCallResult = await task
+            self._write_result(result)
+            exit_code = max(exit_code, result.exit_code)
+
+        return exit_code
+
+    async def _run_call(
+        self,
+        call: Callable[[list[str]], Awaitable[int]],
+        batch_call: BatchCall,
+        semaphore: asyncio.Semaphore,
+    ) -> BatchCallResult:
+        stdio: Stdio = Stdio(
+            stdout=io.StringIO(),
+            stderr=io.StringIO(),
+            stdin=io.StringIO(),
+        )
+        async with semaphore:
+            with StdioRouter.route(stdio):
+                exit_code: int = await call(batch_call.args)
+
+        return BatchCallResult(
+            call=batch_call,
+            exit_code=exit_code,
+            stdout=stdio.stdout.getvalue(),  # type: ignore
+            stderr=stdio.stderr.getvalue(),  # type: ignore
+        )
+
+    def _write_result(self, result: BatchCallResult) -> None:
+        sys.stdout.write(result.stdout)
+        sys.stderr.write(result.stderr)
+        if result.exit_code != 0:
+            Log.error(
+                "[core.batch] call at line <{}> failed: exit_code=<{}>",
+                result.call.line_number,
+                result.exit_code,
+            )
@@ -1,180 +1,582 @@
-import importlib.util
+import asyncio
+import functools
+import importlib
 import os
-import pkgutil
+import sys
+import typing
+from collections.abc import Awaitable
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING
 
-from antievil import NotFoundError, TypeExpectError
+from antievil import UnsupportedError
 
 from clyjin.base.moduledata import ModuleData
-from clyjin.base.plugin import Plugin
+from clyjin.base.output import OutputWriter
 from clyjin.base.plugininitializedata import PluginInitializeData
+from clyjin.base.processpool import ProcessPool
+from clyjin.base.store import Store
+from clyjin.core.batch import Batch
+from clyjin.core.cache import ExecutionCache
 from clyjin.core.cli.cliargs import CLIArgs
 from clyjin.core.cli.parser import CLIParser
+from clyjin.core.cli.prescanner import CLIPrescanner, PrescannedArgs
+from clyjin.core.config import ConfigLoader
+from clyjin.core.incremental import IncrementalState, IncrementalTracker
+from clyjin.core.initializer import PluginInitializer
+from clyjin.core.loader import PluginLoader
+from clyjin.core.logsetup import LogSetup
+from clyjin.core.modulecall import ModuleCall, ModuleCallPaths
+from clyjin.core.pipeline import Pipeline
 from clyjin.core.plugin.plugin import CorePlugin
+from clyjin.core.profiler import StartupProfiler
+from clyjin.core.stdio import RoutedStream
+from clyjin.core.watcher import FileWatcher
 from clyjin.log import Log
 
 if TYPE_CHECKING:
-    from types import ModuleType as PyModuleType
-
+    from clyjin.base.changeset import ChangeSet
+    from clyjin.base.config import Config
     from clyjin.base.module import Module
+    from clyjin.base.plugin import Plugin
+    from clyjin.core.cli.schema import PluginSpec
 
 
 class Boot:
     """
     Central entry unit of application execution.
+
+    A Boot instance can execute several Module calls: plugins are loaded
+    once per sysdir and each Plugin is initialized only once per Boot.
+
+    The Boot owns the process pool and stores shared by Modules, so `close()`
+    should be called once the Boot is no longer needed.
     """
     def __init__(self, *, rootdir: Path = Path.cwd()) -> None:
-        self._RegisteredPlugins: list[type[Plugin]] = []
-        self._config_path: Path
-        self._sysdir: Path
-        self._called_plugin_sysdir: Path
-        self._called_plugin_common_sysdir: Path
-        self._called_module_sysdir: Path
-
         self._root_dir: Path = rootdir
+        self._process_pool: ProcessPool = ProcessPool()
+        self._loaders: dict[Path, PluginLoader] = {}
+        self._config_loaders: dict[Path, ConfigLoader] = {}
+        # stores are opened on first use, so they're cheap to create for
+        # each call
+        self._stores: dict[Path, Store] = {}
+        self._caches: dict[Path, ExecutionCache] = {}
+        self._trackers: dict[Path, IncrementalTracker] = {}
+        self._initializer: PluginInitializer = PluginInitializer()
 
         self._DefaultSysDir: Path = Path(
             os.environ["HOME"],
             ".clyjin",
         )
-        self._DefaultConfigPath: Path = Path(
-            self._root_dir,
-            "clyjin.yml",
-        )
 
     async def start(
         self,
         args: list[str] | None = None,
+        *,
+        rootdir: Path | None = None,
+    ) -> None:
+        """
+        Parses args and executes the called Module, all calls of the batch
+        if `--batch` option is given, or all calls of the pipeline if calls
+        are separated by `|`.
+
+        Args:
+            args(optional):
+                List of string args to parse. System args are parsed by
+                default.
+            rootdir(optional):
+                Directory the Module is called from. Defaults to Boot's
+                rootdir.
+
+        Raises:
+            SystemExit:
+                Some batch calls have failed.
+        """
+        input_args: list[str] = sys.argv[1:] if args is None else args
+        rootdir = self._root_dir if rootdir is None else rootdir
+        prescanned_args: PrescannedArgs = CLIPrescanner().prescan(input_args)
+        self._setup_log(prescanned_args)
+
+        profiler: StartupProfiler | None = self._get_profiler(prescanned_args)
+        try:
+            if profiler is None:
+                await self._start_input(input_args, prescanned_args, rootdir)
+                return
+
+            try:
+                with profiler.activate():
+                    await self._start_input(
+                        input_args,
+                        prescanned_args,
+                        rootdir,
+                    )
+            finally:
+                self._report_profile(profiler, prescanned_args)
+        finally:
+            # enqueued records are written before the call is finished
+            await Log.complete()
+
+    def close(self) -> None:
+        """
+        Releases resources shared by executed Modules.
+        """
+        self._process_pool.shutdown()
+        for store in self._stores.values():
+            store.close()
+        for cache in self._caches.values():
+            cache.close()
+        for tracker in self._trackers.values():
+            tracker.close()
+
+    async def call(
+        self,
+        args: list[str],
+        *,
+        rootdir: Path | None = None,
+    ) -> int:
+        """
+        Executes the call same as `start()`, but returns its exit code
+        instead of exiting or raising an error.
+        """
+        return await self._get_exit_code(self.start(args, rootdir=rootdir))
+
+    async def _start_input(
+        self,
+        input_args: list[str],
+        prescanned_args: PrescannedArgs,
+        rootdir: Path,
+    ) -> None:
+        if prescanned_args.watch and not prescanned_args.is_help:
+            await self._start_watch(input_args, prescanned_args, rootdir)
+            return
+        if prescanned_args.batch is not None and not prescanned_args.is_help:
+            exit_code: int = await self._start_batch(prescanned_args, rootdir)
+            if exit_code != 0:
+                sys.exit(exit_code)
+            return
+
+        await self._start_args(input_args, prescanned_args, rootdir)
+
+    async def _start_args(
+        self,
+        input_args: list[str],
+        prescanned_args: PrescannedArgs,
+        rootdir: Path,
+    ) -> None:
+        if Pipeline.is_pipeline(input_args) and not prescanned_args.is_help:
+            await self._start_pipeline(input_args, prescanned_args, rootdir)
+            return
+        await self._start_call(input_args, prescanned_args, rootdir)
+
+    def _setup_log(self, prescanned_args: PrescannedArgs) -> None:
+        LogSetup(
+            prescanned_args.verbosity_level,
+            # an unsupported format is reported by the parser
+            prescanned_args.log_format
+            if prescanned_args.log_format in LogSetup.Formats
+            else "text",
+            # the background thread doesn't see stderr routed to a batch call
+            # or to a server's client, so their records aren't enqueued
+            is_enqueued=prescanned_args.is_log_enqueued
+            and prescanned_args.batch is None
+            and not isinstance(sys.stderr, RoutedStream),
+        ).apply()
+
+    def _get_profiler(
+        self,
+        prescanned_args: PrescannedArgs,
+    ) -> StartupProfiler | None:
+        if (
+            prescanned_args.is_profile_startup
+            or prescanned_args.profile_json is not None
+            or os.environ.get(StartupProfiler.EnvVar)
+            or os.environ.get(StartupProfiler.JsonEnvVar)
+        ):
+            return StartupProfiler()
+        return None
+
+    def _report_profile(
+        self,
+        profiler: StartupProfiler,
+        prescanned_args: PrescannedArgs,
+    ) -> None:
+        json_path: Path | None = prescanned_args.profile_json
+        if json_path is None and os.environ.get(StartupProfiler.JsonEnvVar):
+            json_path = Path(os.environ[StartupProfiler.JsonEnvVar])
+
+        if json_path is not None:
+            profiler.dump_json(json_path)
+        if (
+            prescanned_args.is_profile_startup
+            or os.environ.get(StartupProfiler.EnvVar)
+        ):
+            profiler.write_summary()
+
+    async def _start_batch(
+        self,
+        prescanned_args: PrescannedArgs,
+        rootdir: Path,
+    ) -> int:
+        batch: Batch = Batch.read(
+            typing.cast(str, prescanned_args.batch),
+            prescanned_args.common_args,
+        )
+        Log.info(
+            "[core] executing batch of <{}> calls with <{}> jobs",
+            len(batch.calls),
+            prescanned_args.jobs,
+        )
+        return await batch.run(
+            functools.partial(self._call_batch_line, rootdir=rootdir),
+            jobs=prescanned_args.jobs,
+            is_as_completed=prescanned_args.is_as_completed,
+        )
+
+    async def _call_batch_line(self, args: list[str], *, rootdir: Path) -> int:
+        prescanned_args: PrescannedArgs = CLIPrescanner().prescan(args)
+        if prescanned_args.batch is not None:
+            print(  # noqa: T201
+                "batch calls cannot contain another batch",
+                file=sys.stderr,
+            )
+            return 2
+        if prescanned_args.watch:
+            print(  # noqa: T201
+                "batch calls cannot be watched",
+                file=sys.stderr,
+            )
+            return 2
+        return await self._get_exit_code(
+            self._start_args(args, prescanned_args, rootdir),
+        )
+
+    async def _start_call(
+        self,
+        input_args: list[str],
+        prescanned_args: PrescannedArgs,
+        rootdir: Path,
+    ) -> None:
+        with StartupProfiler.measure("preparation"):
+            module_call: ModuleCall = self._prepare(
+                input_args,
+                prescanned_args,
+                rootdir,
+            )
+        await self._initialize_plugins(module_call)
+        try:
+            await self._execute(module_call)
+        finally:
+            module_call.module.output.close()
+
+    async def _start_pipeline(
+        self,
+        input_args: list[str],
+        prescanned_args: PrescannedArgs,
+        rootdir: Path,
+    ) -> None:
+        calls: list[ModuleCall] = []
+        for index, args in enumerate(Pipeline.split(input_args)):
+            call_args: list[str] = \
+                args if index == 0 else [*prescanned_args.common_args, *args]
+            with StartupProfiler.measure("preparation"):
+                calls.append(self._prepare(
+                    call_args,
+                    CLIPrescanner().prescan(call_args),
+                    rootdir,
+                ))
+        await asyncio.gather(*(
+            self._initialize_plugins(call) for call in calls
+        ))
+
+        Log.info("[core] executing pipeline of <{}> calls", len(calls))
+        try:
+            await Pipeline(calls).run()
+        finally:
+            for call in calls:
+                call.module.output.close()
+
+    async def _start_watch(
+        self,
+        input_args: list[str],
+        prescanned_args: PrescannedArgs,
+        rootdir: Path,
     ) -> None:
-        await self._collect_registered_plugins()
-        cli_args: CLIArgs = CLIParser(self._RegisteredPlugins).parse(args)
-        self._initialize_paths(cli_args)
+        """
+        Executes the Module, and then executes it again on each change of
+        watched files, until the process is interrupted.
+
+        The Module is prepared and its Plugins are initialized only once, so
+        each execution costs only the execution itself. Modules without
+        `UseIncremental` get files changed since the previous execution as
+        `changes`.
+        """
+        if (
+            prescanned_args.batch is not None
+            or Pipeline.is_pipeline(input_args)
+        ):
+            raise UnsupportedError(
+                title="watch mode for batch or pipeline calls",
+                value=input_args,
+            )
+
+        with StartupProfiler.measure("preparation"):
+            module_call: ModuleCall = self._prepare(
+                input_args,
+                prescanned_args,
+                rootdir,
+            )
+        await self._initialize_plugins(module_call)
+
+        watcher: FileWatcher = FileWatcher(
+            rootdir,
+            prescanned_args.watch,
+            ignore=[*FileWatcher.DefaultIgnore, *prescanned_args.watch_ignore],
+        )
+        watcher.start()
+        try:
+            while True:
+                # errors are reported, but don't stop the watching
+                await self._get_exit_code(self._execute(module_call))
+                module_call.module.output.close()
+
+                print(  # noqa: T201
+                    "watching "
+                    + ", ".join(str(p) for p in prescanned_args.watch)
+                    + " for changes",
+                    file=sys.stderr,
+                )
+                changes: ChangeSet = await watcher.wait()
+                Log.info("[core] watched files changed: <{}>", changes)
+                if not module_call.module.UseIncremental:
+                    module_call.module.changes = changes
+        finally:
+            watcher.close()
+
+    async def _get_exit_code(self, coroutine: Awaitable[None]) -> int:
+        try:
+            await coroutine
+        except SystemExit as error:
+            if error.code is None:
+                return 0
+            elif isinstance(error.code, int):
+                return error.code
+            print(error.code, file=sys.stderr)  # noqa: T201
+            return 1
+        except Exception:  # noqa: BLE001
+            Log.exception("[core] call failed")
+            return 1
+        return 0
+
+    def _prepare(
+        self,
+        input_args: list[str],
+        prescanned_args: PrescannedArgs,
+        rootdir: Path,
+    ) -> ModuleCall:
+        with StartupProfiler.measure("loader creation"):
+            loader: PluginLoader = self._get_loader(
+                self._DefaultSysDir
+                if prescanned_args.sysdir is None
+                else prescanned_args.sysdir,
+            )
+        with StartupProfiler.measure("plugins loading"):
+            loader.load(prescanned_args)
+        with StartupProfiler.measure("schema compilation"):
+            plugin_specs: list[PluginSpec] = loader.get_plugin_specs()
+        # save before parsing, since the parser exits on help
+        with StartupProfiler.measure("index saving"):
+            loader.save()
+
+        with StartupProfiler.measure("parser generation"):
+            parser: CLIParser = CLIParser(
+                loader.registry,
+                plugin_specs,
+            )
+        with StartupProfiler.measure("parsing"):
+            cli_args: CLIArgs = parser.parse(input_args)
+        with StartupProfiler.measure("dependencies resolution"):
+            RequiredPluginClasses: list[type[Plugin]] = \
+                PluginInitializer.resolve(cli_args.PluginClass, loader.require)
+            # dependencies might be imported
+            loader.save()
+        with StartupProfiler.measure("paths initialization"):
+            paths: ModuleCallPaths = self._initialize_paths(cli_args, rootdir)
+        with StartupProfiler.measure("config loading"):
+            config: Config | None = self._load_config(cli_args, paths)
 
         module: Module = cli_args.ModuleClass(ModuleData(
             name=cli_args.ModuleClass.cls_get_name(),
             ParentPlugin=cli_args.PluginClass,
             description=cli_args.ModuleClass.Description,
             args=cli_args.populated_module_args,
-            # TODO(ryzhovalex): implement configs
-            # 0
-            config=None,
-            rootdir=self._root_dir,
-            plugin_common_sysdir=self._called_plugin_common_sysdir,
-            module_sysdir=self._called_module_sysdir,
+            config=config,
+            rootdir=rootdir,
+            sysdir=paths.sysdir,
+            plugin_common_sysdir=paths.plugin_common_sysdir,
+            module_sysdir=paths.module_sysdir,
             verbosity_level=cli_args.verbosity_level,
+            process_pool=
+                self._process_pool
+                if cli_args.ModuleClass.UseProcessPool else None,
+            output=OutputWriter(
+                cli_args.output_format,
+                None
+                if cli_args.output_path is None
+                else Path(rootdir, cli_args.output_path),
+            ),
+            dependency_plugins={
+                DependencyPlugin.get_name(): DependencyPlugin
+                for DependencyPlugin in RequiredPluginClasses
+                if DependencyPlugin is not cli_args.PluginClass
+            },
+            store=self._get_store(paths.module_sysdir),
+            common_store=self._get_store(paths.plugin_common_sysdir),
         ))
 
-        Log.info(
-            f"[core] initializing plugin <{cli_args.PluginClass.get_str()}>",
-        )
-        await cli_args.PluginClass.initialize(PluginInitializeData(
-            root_dir=self._root_dir,
-            config_path=self._config_path,
-            called_module=module,
-            called_plugin_sysdir=self._called_plugin_sysdir,
-            called_plugin_common_sysdir=self._called_plugin_common_sysdir,
-            called_module_sysdir=self._called_module_sysdir,
-        ))
-        Log.info(
-            f"[core] initialized plugin <{cli_args.PluginClass.get_str()}>",
+        return ModuleCall(
+            PluginClass=cli_args.PluginClass,
+            module=module,
+            plugin_initialize_data=PluginInitializeData(
+                root_dir=rootdir,
+                config_path=paths.config_path,
+                called_module=module,
+                called_plugin_sysdir=paths.plugin_sysdir,
+                called_plugin_common_sysdir=paths.plugin_common_sysdir,
+                called_module_sysdir=paths.module_sysdir,
+            ),
+            paths=paths,
+            RequiredPluginClasses=RequiredPluginClasses,
         )
 
-        Log.info(
-            f"[core] executing module <{module}>",
+    async def _initialize_plugins(self, module_call: ModuleCall) -> None:
+        await self._initializer.initialize(
+            module_call.RequiredPluginClasses,
+            module_call.plugin_initialize_data,
         )
-        await module.execute()
-        Log.info(
-            f"[core] executed module <{module}>",
+
+    async def _execute(self, module_call: ModuleCall) -> None:
+        module: Module = module_call.module
+        tracker: IncrementalTracker | None = None
+        incremental_state: IncrementalState | None = None
+        if module.UseIncremental:
+            tracker = self._get_tracker(module_call.paths.module_sysdir)
+            with StartupProfiler.measure("changes detection"):
+                incremental_state = await tracker.detect(module_call)
+            if incremental_state.changes.is_empty():
+                Log.info(
+                    "[core] skipped module <{}>: inputs are unchanged",
+                    module,
+                )
+                return
+            module.changes = incremental_state.changes
+
+        Log.info("[core] executing module <{}>", module)
+        with StartupProfiler.measure(
+            f"module <{module.cls_get_name()}> execution",
+        ):
+            if module.UseCache:
+                await self._get_cache(module_call.paths.sysdir).execute(
+                    module_call,
+                )
+            else:
+                await module.execute()
+        Log.info("[core] executed module <{}>", module)
+
+        if tracker is not None and incremental_state is not None:
+            await tracker.record(module_call, incremental_state)
+
+    def _get_loader(self, sysdir: Path) -> PluginLoader:
+        loader: PluginLoader | None = self._loaders.get(sysdir)
+        if loader is None or loader.is_outdated():
+            # directories of newly installed plugins might be cached by the
+            # import system
+            importlib.invalidate_caches()
+            loader = PluginLoader(sysdir, [CorePlugin])
+            self._loaders[sysdir] = loader
+        return loader
+
+    def _get_tracker(self, module_sysdir: Path) -> IncrementalTracker:
+        tracker: IncrementalTracker | None = self._trackers.get(module_sysdir)
+        if tracker is None:
+            tracker = IncrementalTracker.from_module_sysdir(module_sysdir)
+            self._trackers[module_sysdir] = tracker
+        return tracker
+
+    def _get_cache(self, sysdir: Path) -> ExecutionCache:
+        cache: ExecutionCache | None = self._caches.get(sysdir)
+        if cache is None:
+            cache = ExecutionCache.from_sysdir(sysdir)
+            self._caches[sysdir] = cache
+        return cache
+
+    def _get_store(self, directory: Path) -> Store:
+        store: Store | None = self._stores.get(directory)
+        if store is None:
+            store = Store.from_dir(directory)
+            self._stores[directory] = store
+        return store
+
+    def _load_config(
+        self,
+        cli_args: CLIArgs,
+        paths: ModuleCallPaths,
+    ) -> "Config | None":
+        config_loader: ConfigLoader | None = \
+            self._config_loaders.get(paths.sysdir)
+        if config_loader is None:
+            config_loader = ConfigLoader.from_sysdir(paths.sysdir)
+            self._config_loaders[paths.sysdir] = config_loader
+
+        config: Config | None = config_loader.get_config(
+            paths.config_path,
+            cli_args.PluginClass,
+            cli_args.ModuleClass,
         )
+        config_loader.save()
+        return config
 
-    def _initialize_paths(self, cli_args: CLIArgs) -> None:
-        self._sysdir = \
+    def _initialize_paths(
+        self,
+        cli_args: CLIArgs,
+        rootdir: Path,
+    ) -> ModuleCallPaths:
+        sysdir: Path = \
             self._DefaultSysDir \
             if cli_args.sysdir is None else cli_args.sysdir
 
-        self._called_plugin_sysdir = Path(
-            self._sysdir,
+        plugin_sysdir: Path = Path(
+            sysdir,
             "plugins",
             cli_args.PluginClass.get_name(),
         )
 
-        self._called_plugin_common_sysdir = Path(
-            self._called_plugin_sysdir,
+        plugin_common_sysdir: Path = Path(
+            plugin_sysdir,
             "common",
         )
 
-        self._called_module_sysdir = Path(
-            self._called_plugin_sysdir,
+        module_sysdir: Path = Path(
+            plugin_sysdir,
             cli_args.ModuleClass.cls_get_name(),
         )
 
-        self._sysdir.mkdir(parents=True, exist_ok=True)
-        self._called_plugin_sysdir.mkdir(parents=True, exist_ok=True)
-        self._called_plugin_common_sysdir.mkdir(parents=True, exist_ok=True)
-        self._called_module_sysdir.mkdir(parents=True, exist_ok=True)
+        sysdir.mkdir(parents=True, exist_ok=True)
+        plugin_sysdir.mkdir(parents=True, exist_ok=True)
+        plugin_common_sysdir.mkdir(parents=True, exist_ok=True)
+        module_sysdir.mkdir(parents=True, exist_ok=True)
 
-        self._config_path = \
-            self._DefaultConfigPath \
+        config_path: Path = \
+            Path(rootdir, "clyjin.yml") \
             if cli_args.config_path is None else cli_args.config_path
-        if not self._config_path.exists():
+        if not config_path.exists():
             Log.warning(
-                f"[core] config is not found at <{self._config_path}>:"
-                " use defaults",
+                "[core] config is not found at <{}>: use defaults",
+                config_path,
             )
 
-    async def _collect_registered_plugins(self) -> None:
-        # always add Core Plugin
-        self._RegisteredPlugins.append(CorePlugin)
-        Log.info(
-            f"[core] loaded core plugin <{CorePlugin.get_str()}>",
+        return ModuleCallPaths(
+            sysdir=sysdir,
+            config_path=config_path,
+            plugin_sysdir=plugin_sysdir,
+            plugin_common_sysdir=plugin_common_sysdir,
+            module_sysdir=module_sysdir,
         )
-
-        for finder, name, _ispkg in pkgutil.iter_modules():
-            if name.startswith("clyjin_"):
-                pathstr: str = self._get_finder_pathstr(finder)
-                Log.info(
-                    f"[core] found Python module <{name}> at <{pathstr}>",
-                )
-
-                try:
-                    LoadedPlugin: type[Plugin] = self._load_plugin(name)
-                except (NotFoundError, TypeExpectError) as error:
-                    Log.error(
-                        "[core] failed to load plugin"
-                        f" <{name}>: error=<{error}>",
-                    )
-                    continue
-
-                Log.info(
-                    f"[core] loaded plugin <{LoadedPlugin.get_str()}>",
-                )
-
-    def _get_finder_pathstr(self, finder: Any) -> str:
-        try:
-            return str(finder.path)
-        except AttributeError:
-            return "unattached path"
-
-    def _load_plugin(self, name: str) -> type[Plugin]:
-        imported_module: PyModuleType = importlib.import_module(name)
-        try:
-            # MainPlugin variable is searched by default, maybe later it might
-            # be configurable
-            ImportedMainPlugin: type[Module] = imported_module.MainPlugin
-        except AttributeError as error:
-            raise NotFoundError(
-                title="MainPlugin attribute of imported module",
-                value=imported_module,
-            ) from error
-
-        if not issubclass(ImportedMainPlugin, Plugin):
-            raise TypeExpectError(
-                obj=ImportedMainPlugin,
-                ExpectedType=Plugin,
-                expected_inheritance="instance",
-                ActualType=type(ImportedMainPlugin),
-            )
-
-        self._RegisteredPlugins.append(ImportedMainPlugin)
-        return ImportedMainPlugin
@@ -0,0 +1,177 @@
+import importlib.util
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from antievil import NotFoundError
+
+import clyjin
+from clyjin.log import Log
+
+if TYPE_CHECKING:
+    from importlib.machinery import ModuleSpec
+    from types import ModuleType
+
+_MainSource: str = """\
+# marks the process as bundled, so the core takes plugins from the manifest
+import _clyjin_bundle  # noqa: F401
+from clyjin.__main__ import main
+
+main()
+"""
+
+
+class Bundler:
+    """
+    Builds a single-file bundle of Clyjin and chosen plugins, runnable as
+    `python bundle.pyz ...` or as an executable.
+
+    The bundle is a zip application with sources and bytecode compiled by
+    the current interpreter, so modules aren't compiled on each run. The
+    bytecode is unchecked against sources, which is safe since the archive
+    isn't changed after the build. If the bundle is run by another Python
+    version, the sources are compiled as usual.
+
+    The bundle also has a manifest with Python modules of bundled plugins by
+    plugin names, so the loader imports a called plugin directly and never
+    scans `sys.path` for plugins.
+
+    Third-party dependencies of Clyjin and plugins, e.g. pydantic with its
+    compiled extensions, aren't bundled and should be installed for the
+    interpreter running the bundle.
+
+    Attributes:
+        python_module_names:
+            Python modules of plugins to bundle by plugin names.
+        interpreter(optional):
+            Interpreter for the bundle's shebang line. Defaults to
+            `/usr/bin/env python3`.
+    """
+    ManifestModuleName: str = "_clyjin_bundle"
+    DefaultInterpreter: str = "/usr/bin/env python3"
+
+    # sources needed only for development are not bundled
+    _SkippedFileNames: set[str] = {"conftest.py"}
+    _SkippedFilePrefix: str = "test_"
+
+    def __init__(
+        self,
+        python_module_names: dict[str, str],
+        interpreter: str = DefaultInterpreter,
+    ) -> None:
+        self._python_module_names: dict[str, str] = python_module_names
+        self._interpreter: str = interpreter
+
+    @classmethod
+    def get_bundled_module_names(cls) -> dict[str, str] | None:
+        """
+        Returns Python modules of bundled plugins by plugin names, or None if
+        the process isn't started from a bundle.
+        """
+        manifest: ModuleType | None = sys.modules.get(cls.ManifestModuleName)
+        if manifest is None:
+            return None
+        return manifest.PythonModuleNames
+
+    def build(self, path: Path) -> int:
+        """
+        Writes the bundle to the path, replacing an existing file.
+
+        Returns:
+            Amount of bundled files.
+
+        Raises:
+            NotFoundError:
+                Python module of some plugin is not found.
+        """
+        # imported here, since the loader imports the bundler only to check
+        # whether the process is bundled
+        import py_compile
+        import zipfile
+
+        files: dict[str, Path] = {}
+        for python_module_name in [
+            "clyjin",
+            *self._python_module_names.values(),
+        ]:
+            files.update(self._collect_files(python_module_name))
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path: Path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with (
+            tempfile.TemporaryDirectory() as tmp_dir,
+            tmp_path.open("wb") as f,
+        ):
+            f.write(f"#!{self._interpreter}\n".encode())
+            with zipfile.ZipFile(f, "w", zipfile.ZIP_DEFLATED) as archive:
+                pyc_path: Path = Path(tmp_dir, "module.pyc")
+                for arcname, source_path in sorted(files.items()):
+                    archive.write(source_path, arcname)
+                    if not arcname.endswith(".py"):
+                        continue
+                    py_compile.compile(
+                        str(source_path),
+                        cfile=str(pyc_path),
+                        # tracebacks show paths within the bundle
+                        dfile=str(Path(path, arcname)),
+                        doraise=True,
+                        invalidation_mode=
+                            py_compile.PycInvalidationMode.UNCHECKED_HASH,
+                    )
+                    archive.write(pyc_path, arcname + "c")
+
+                archive.writestr(
+                    f"{self.ManifestModuleName}.py",
+                    self._get_manifest_source(),
+                )
+                archive.writestr("__main__.py", _MainSource)
+        tmp_path.chmod(0o755)
+        tmp_path.replace(path)
+
+        Log.info(
+            "[core.bundle] bundled <{}> files of plugins <{}> to <{}>",
+            len(files),
+            list(self._python_module_names),
+            path,
+        )
+        return len(files)
+
+    def _collect_files(self, python_module_name: str) -> dict[str, Path]:
+        spec: ModuleSpec | None = \
+            importlib.util.find_spec(python_module_name)
+        if spec is None or spec.origin is None:
+            raise NotFoundError(
+                title="Python module",
+                value=python_module_name,
+            )
+
+        origin: Path = Path(spec.origin)
+        if spec.submodule_search_locations is None:
+            return {origin.name: origin}
+
+        files: dict[str, Path] = {}
+        root: Path = origin.parent
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d != "__pycache__")
+            for filename in filenames:
+                if (
+                    filename in self._SkippedFileNames
+                    or filename.startswith(self._SkippedFilePrefix)
+                    or filename.endswith(".pyc")
+                ):
+                    continue
+                file_path: Path = Path(dirpath, filename)
+                arcname: str = Path(
+                    python_module_name,
+                    file_path.relative_to(root),
+                ).as_posix()
+                files[arcname] = file_path
+        return files
+
+    def _get_manifest_source(self) -> str:
+        return (
+            f"ClyjinVersion = {clyjin.__version__!r}\n"
+            f"PythonModuleNames = {self._python_module_names!r}\n"
+        )
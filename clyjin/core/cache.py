@@ -0,0 +1,439 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import time
+import typing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from antievil import UnsupportedError
+
+from clyjin.base.store import Store
+from clyjin.core.modulecall import ModuleCall
+from clyjin.core.stdio import RoutedStream, Stdio, StdioRouter, TeeStream
+from clyjin.log import Log
+
+
+@dataclass(frozen=True, slots=True)
+class CacheStats:
+    """
+    Summary of cached executions.
+
+    Attributes:
+        entries:
+            Amount of cached executions.
+        size:
+            Total size of cached outputs and artifacts in bytes.
+        max_size:
+            Size above which least recently used executions are evicted.
+    """
+    entries: int
+    size: int
+    max_size: int
+
+
+class ExecutionCache:
+    """
+    Caches results of Module executions.
+
+    Only Modules with `UseCache` set are cached. An execution is identified
+    by the Module's namespaced name, Plugin's version, the call's rootdir,
+    populated args and config values, and hashes of contents of the
+    Module's input paths.
+
+    Cached are output written to stdout and stderr by the Module and copies
+    of the Module's output paths, which are restored on a repeated
+    execution instead of calling `Module.execute()`.
+
+    Once the total size of cached results exceeds the maximum size, least
+    recently used results are evicted, along with remembered hashes of input
+    files no longer used by the rest of the results.
+
+    Attributes:
+        directory:
+            Directory to keep cached results in.
+        max_size(optional):
+            Maximum size of cached results in bytes. Defaults to the
+            `CLYJIN_CACHE_MAX_SIZE` env var, or to 256 MiB.
+    """
+    DirName: str = "cache"
+    MaxSizeEnvVar: str = "CLYJIN_CACHE_MAX_SIZE"
+    DefaultMaxSize: int = 256 * 1024 * 1024
+    KeyVersion: int = 2
+
+    def __init__(self, directory: Path, max_size: int | None = None) -> None:
+        self._directory: Path = directory
+        self._max_size: int = \
+            self._get_default_max_size() if max_size is None else max_size
+        if self._max_size < 0:
+            raise UnsupportedError(
+                title="cache max size",
+                value=self._max_size,
+            )
+        self._index: Store = Store(Path(directory, "index.sqlite3"))
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @classmethod
+    def from_sysdir(
+        cls,
+        sysdir: Path,
+        max_size: int | None = None,
+    ) -> "ExecutionCache":
+        return cls(Path(sysdir, cls.DirName), max_size)
+
+    async def execute(self, module_call: ModuleCall) -> None:
+        """
+        Restores cached results of the call's execution, or executes the
+        call's Module and caches its results.
+        """
+        key: str = await self.get_key(module_call)
+        if await self._restore(key):
+            Log.info(
+                "[core.cache] restored cached execution of module <{}>:"
+                " key=<{}>",
+                module_call.module,
+                key,
+            )
+            return
+
+        stdout: io.StringIO = io.StringIO()
+        stderr: io.StringIO = io.StringIO()
+        StdioRouter.install()
+        # output is still written to the current streams, which might be
+        # routed by a batch or a server
+        stdio: Stdio = Stdio(
+            stdout=TeeStream(
+                typing.cast(RoutedStream, sys.stdout).get_target(),
+                stdout,
+            ),
+            stderr=TeeStream(
+                typing.cast(RoutedStream, sys.stderr).get_target(),
+                stderr,
+            ),
+            stdin=typing.cast(RoutedStream, sys.stdin).get_target(),
+        )
+        with StdioRouter.route(stdio):
+            await module_call.module.execute()
+            # buffered records are a part of the captured output
+            module_call.module.output.flush()
+
+        await self._save(
+            key,
+            module_call,
+            stdout.getvalue(),
+            stderr.getvalue(),
+        )
+
+    async def get_key(self, module_call: ModuleCall) -> str:
+        module_name: str = \
+            f"{module_call.PluginClass.get_name()}" \
+            f".{module_call.module.cls_get_name()}"
+        input_paths: list[Path] = self._resolve_paths(
+            module_call,
+            module_call.module.get_cache_input_paths(),
+        )
+        args_values: dict[str, Any] = \
+            module_call.module.args.get_values() \
+            if module_call.module.Args is not None else {}
+        config_values: dict[str, Any] | None = \
+            module_call.module.config.model_dump(mode="json") \
+            if module_call.module.CONFIG_CLASS is not None else None
+
+        data: dict[str, Any] = {
+            "version": self.KeyVersion,
+            "module": module_name,
+            "plugin_version": module_call.PluginClass.get_version(),
+            "rootdir": str(module_call.plugin_initialize_data.root_dir),
+            "args": args_values,
+            "config": config_values,
+            "output": [
+                module_call.module.output.format,
+                str(module_call.module.output.path),
+            ],
+            "inputs": [
+                [str(path), await self._get_content_hash(path)]
+                for path in input_paths
+            ],
+        }
+        return hashlib.sha256(
+            json.dumps(data, sort_keys=True, default=repr).encode(),
+        ).hexdigest()
+
+    async def get_stats(self) -> CacheStats:
+        entries: list[tuple[str, Any]] = await self._index.scan("entry.")
+        return CacheStats(
+            entries=len(entries),
+            size=sum(entry["size"] for _, entry in entries),
+            max_size=self._max_size,
+        )
+
+    async def prune(self, max_size: int | None = None) -> int:
+        """
+        Evicts least recently used results until their total size is not
+        greater than the maximum size.
+
+        Args:
+            max_size(optional):
+                Size to prune to. Defaults to the cache's maximum size.
+
+        Returns:
+            Amount of evicted results.
+        """
+        max_size = self._max_size if max_size is None else max_size
+        entries: list[tuple[str, Any]] = await self._index.scan("entry.")
+        size: int = sum(entry["size"] for _, entry in entries)
+        if size <= max_size:
+            return 0
+
+        evicted_keys: list[str] = []
+        for index_key, entry in sorted(
+            entries,
+            key=lambda item: item[1]["accessed"],
+        ):
+            if size <= max_size:
+                break
+            evicted_keys.append(index_key.removeprefix("entry."))
+            size -= entry["size"]
+
+        await self._delete(evicted_keys)
+        await self._delete_unused_hashes()
+        Log.info("[core.cache] evicted <{}> entries", len(evicted_keys))
+        return len(evicted_keys)
+
+    async def clear(self) -> int:
+        """
+        Deletes all cached results.
+
+        Returns:
+            Amount of deleted results.
+        """
+        entries: list[tuple[str, Any]] = await self._index.scan("entry.")
+        await self._delete([
+            index_key.removeprefix("entry.") for index_key, _ in entries
+        ])
+        await self._index.delete_prefix("hash.")
+        return len(entries)
+
+    def close(self) -> None:
+        self._index.close()
+
+    async def _restore(self, key: str) -> bool:
+        entry: dict[str, Any] | None = await self._index.get(f"entry.{key}")
+        entry_dir: Path = self._get_entry_dir(key)
+        if entry is None or not entry_dir.is_dir():
+            return False
+
+        await asyncio.to_thread(self._restore_artifacts, entry_dir, entry)
+        sys.stdout.write(Path(entry_dir, "stdout").read_text())
+        sys.stderr.write(Path(entry_dir, "stderr").read_text())
+
+        entry["accessed"] = time.time()
+        await self._index.set(f"entry.{key}", entry)
+        return True
+
+    async def _save(
+        self,
+        key: str,
+        module_call: ModuleCall,
+        stdout: str,
+        stderr: str,
+    ) -> None:
+        input_paths: list[Path] = self._resolve_paths(
+            module_call,
+            module_call.module.get_cache_input_paths(),
+        )
+        output_paths: list[Path] = self._resolve_paths(
+            module_call,
+            module_call.module.get_cache_output_paths(),
+        )
+        output_file_path: Path | None = module_call.module.output.path
+        if output_file_path is not None:
+            # records written to a file are restored as output paths are
+            module_call.module.output.close()
+            output_paths.extend(
+                self._resolve_paths(module_call, [output_file_path]),
+            )
+        size: int | None = await asyncio.to_thread(
+            self._write_entry,
+            key,
+            output_paths,
+            stdout,
+            stderr,
+        )
+        if size is None:
+            return
+
+        now: float = time.time()
+        await self._index.set(f"entry.{key}", {
+            "module": module_call.module.cls_get_name(),
+            "inputs": [str(path) for path in input_paths],
+            "outputs": [str(path) for path in output_paths],
+            "size": size,
+            "created": now,
+            "accessed": now,
+        })
+        await self.prune()
+
+    def _write_entry(
+        self,
+        key: str,
+        output_paths: list[Path],
+        stdout: str,
+        stderr: str,
+    ) -> int | None:
+        """
+        Writes results to the entry's directory and returns their size, or
+        None if the results are written by another process.
+        """
+        entry_dir: Path = self._get_entry_dir(key)
+        # results are written to a temporary directory and moved at once, so
+        # half-written results are never restored
+        tmp_dir: Path = entry_dir.with_name(f"{key}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        Path(tmp_dir, "artifacts").mkdir(parents=True)
+        Path(tmp_dir, "stdout").write_text(stdout)
+        Path(tmp_dir, "stderr").write_text(stderr)
+
+        for index, path in enumerate(output_paths):
+            artifact_path: Path = Path(tmp_dir, "artifacts", str(index))
+            if path.is_dir():
+                shutil.copytree(path, artifact_path, symlinks=True)
+            elif path.exists():
+                shutil.copy2(path, artifact_path)
+
+        size: int = self._get_size(tmp_dir)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        try:
+            tmp_dir.rename(entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return None
+        return size
+
+    def _restore_artifacts(
+        self,
+        entry_dir: Path,
+        entry: dict[str, Any],
+    ) -> None:
+        for index, pathstr in enumerate(entry["outputs"]):
+            path: Path = Path(pathstr)
+            artifact_path: Path = Path(entry_dir, "artifacts", str(index))
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path)
+            elif path.exists() or path.is_symlink():
+                path.unlink()
+
+            if artifact_path.is_dir():
+                shutil.copytree(artifact_path, path, symlinks=True)
+            elif artifact_path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(artifact_path, path)
+
+    async def _delete(self, keys: list[str]) -> None:
+        async with self._index.transaction() as transaction:
+            for key in keys:
+                transaction.delete(f"entry.{key}")
+        for key in keys:
+            await asyncio.to_thread(
+                shutil.rmtree,
+                self._get_entry_dir(key),
+                ignore_errors=True,
+            )
+
+    async def _delete_unused_hashes(self) -> None:
+        """
+        Deletes remembered hashes of files which are not input paths, or
+        within input directories, of any cached result.
+        """
+        entries: list[tuple[str, Any]] = await self._index.scan("entry.")
+        input_paths: set[Path] = {
+            Path(pathstr)
+            for _, entry in entries
+            for pathstr in entry.get("inputs", [])
+        }
+        hashes: list[tuple[str, Any]] = await self._index.scan("hash.")
+        async with self._index.transaction() as transaction:
+            for index_key, _ in hashes:
+                path: Path = Path(index_key.removeprefix("hash."))
+                if path not in input_paths and input_paths.isdisjoint(
+                    path.parents,
+                ):
+                    transaction.delete(index_key)
+
+    async def _get_content_hash(self, path: Path) -> str | None:
+        """
+        Returns hash of the file's contents, or of names and contents of all
+        files within the directory, or None if the path doesn't exist.
+
+        Hashes of files are remembered by their mtime and size, so unchanged
+        files are not read again.
+        """
+        if path.is_dir():
+            digest = hashlib.sha256()
+            for file_path in sorted(p for p in path.rglob("*") if p.is_file()):
+                digest.update(str(file_path.relative_to(path)).encode())
+                digest.update(
+                    (await self._get_file_hash(file_path) or "").encode(),
+                )
+            return digest.hexdigest()
+        return await self._get_file_hash(path)
+
+    async def _get_file_hash(self, path: Path) -> str | None:
+        try:
+            stat: os.stat_result = path.stat()
+        except FileNotFoundError:
+            return None
+        stamp: list[int] = [stat.st_mtime_ns, stat.st_size]
+
+        index_key: str = f"hash.{path}"
+        remembered: dict[str, Any] | None = await self._index.get(index_key)
+        if remembered is not None and remembered["stamp"] == stamp:
+            return remembered["hash"]
+
+        file_hash: str = await asyncio.to_thread(self._hash_file, path)
+        await self._index.set(index_key, {"stamp": stamp, "hash": file_hash})
+        return file_hash
+
+    def _hash_file(self, path: Path) -> str:
+        with path.open("rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+    def _resolve_paths(
+        self,
+        module_call: ModuleCall,
+        paths: list[Path],
+    ) -> list[Path]:
+        return [
+            Path(module_call.plugin_initialize_data.root_dir, path).absolute()
+            for path in paths
+        ]
+
+    def _get_entry_dir(self, key: str) -> Path:
+        return Path(self._directory, "entries", key)
+
+    def _get_size(self, directory: Path) -> int:
+        return sum(
+            path.lstat().st_size
+            for path in directory.rglob("*")
+            if not path.is_dir() or path.is_symlink()
+        )
+
+    def _get_default_max_size(self) -> int:
+        env_max_size: str | None = os.environ.get(self.MaxSizeEnvVar)
+        if env_max_size is None:
+            return self.DefaultMaxSize
+        try:
+            return int(env_max_size)
+        except ValueError as error:
+            raise UnsupportedError(
+                title=f"env var {self.MaxSizeEnvVar} value",
+                value=env_max_size,
+            ) from error
@@ -1,12 +1,13 @@
+from dataclasses import dataclass
 from pathlib import Path
 
-from clyjin.base.model import Model
 from clyjin.base.module import Module
 from clyjin.base.moduleargs import ModuleArgs
 from clyjin.base.plugin import Plugin
 
 
-class CLIArgs(Model):
+@dataclass(frozen=True, slots=True)
+class CLIArgs:
     """
     Args parsed by first core CLI layer.
 
@@ -20,8 +21,16 @@ class CLIArgs(Model):
         config_path(optional):
             Path to main configuration file. Defaults to None, i.e. hasn't been
             set.
-        verbosity_level(optional):
-            How verbose printed output should be. Defaults to 0.
+        verbosity_level:
+            How verbose printed output should be.
+        sysdir:
+            Sysdir set by input, or None.
+        output_format(optional):
+            Format of records written to Module's output. Defaults to
+            `text`.
+        output_path(optional):
+            File to write Module's output to. Defaults to None, i.e. stdout
+            is used.
     """
     ModuleClass: type[Module]
     PluginClass: type[Plugin]
@@ -29,6 +38,5 @@ class CLIArgs(Model):
     config_path: Path | None
     verbosity_level: int
     sysdir: Path | None
-
-    class Config:
-        arbitrary_types_allowed = True
+    output_format: str = "text"
+    output_path: Path | None = None
@@ -1,34 +1,163 @@
 import argparse
+import functools
 from argparse import _SubParsersAction as ArgparseSubParsersAction
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
-from antievil import TypeExpectError, UnsupportedError
+from clyjin.base.output import OutputWriter
+from clyjin.core.cli.schema import ModuleSpec, PluginSpec
+from clyjin.core.logsetup import LogSetup
 
-from clyjin.base.module import Module
-from clyjin.base.moduleargs import ModuleArg, ModuleArgs
-from clyjin.base.plugin import Plugin
+
+class LazyParsersMap(dict[str, argparse.ArgumentParser | None]):
+    """
+    Map of subparsers, which creates a subparser on first access to it.
+
+    Until the access, subparser's name is kept in the map with None value,
+    so the name is still listed in choices and in the help.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self._factories: dict[
+            str,
+            Callable[[], argparse.ArgumentParser],
+        ] = {}
+
+    def set_factory(
+        self,
+        name: str,
+        factory: Callable[[], argparse.ArgumentParser],
+    ) -> None:
+        self._factories[name] = factory
+        super().__setitem__(name, None)
+
+    def __getitem__(self, name: str) -> argparse.ArgumentParser:
+        parser: argparse.ArgumentParser | None = super().__getitem__(name)
+        if parser is None:
+            parser = self._factories.pop(name)()
+            super().__setitem__(name, parser)
+        return parser
+
+
+class LazySubParsersAction(ArgparseSubParsersAction):
+    """
+    Subparsers action, which adds arguments to a subparser only if the
+    subparser is selected by the input.
+
+    For other subparsers only lightweight help entries are created, so
+    parser construction cost doesn't grow with amount of registered modules
+    and their args.
+    """
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._name_parser_map: LazyParsersMap = LazyParsersMap()
+        self.choices = self._name_parser_map
+
+    def add_lazy_parser(
+        self,
+        name: str,
+        *,
+        help: str | None,
+        fill: Callable[[argparse.ArgumentParser], None],
+    ) -> None:
+        """
+        Registers subparser, which will be created and filled with arguments
+        by `fill` function only on access.
+        """
+        if name in self._name_parser_map:
+            raise argparse.ArgumentError(
+                self,
+                f"conflicting subparser: {name}",
+            )
+
+        self._choices_actions.append(
+            self._ChoicesPseudoAction(name, (), help),
+        )
+        self._name_parser_map.set_factory(
+            name,
+            functools.partial(self._create_parser, name, fill),
+        )
+
+    def _create_parser(
+        self,
+        name: str,
+        fill: Callable[[argparse.ArgumentParser], None],
+    ) -> argparse.ArgumentParser:
+        parser: argparse.ArgumentParser = self._parser_class(
+            prog=f"{self._prog_prefix} {name}",
+        )
+        fill(parser)
+        return parser
 
 
 class CLIGenerator:
     """
     Generates argument parser for registered modules.
+
+    Module parsers are registered lazily: only a module selected by the input
+    gets its arguments added.
     """
     def get_parser(
         self,
-        RegisteredPlugins: list[type[Plugin]],
+        plugin_specs: list[PluginSpec],
     ) -> argparse.ArgumentParser:
         parser: argparse.ArgumentParser = argparse.ArgumentParser(
             description="Clyjin",
         )
 
         self._add_common_args(parser)
-        self._module_subparser_hub: ArgparseSubParsersAction = \
+        self._module_subparser_hub: LazySubParsersAction = \
             self._add_module_subparser_hub(parser)
-        self._add_plugins_parsers(RegisteredPlugins)
+        self._add_plugins_parsers(plugin_specs)
 
         return parser
 
+    def get_completion_index(
+        self,
+        plugin_specs: list[PluginSpec],
+    ) -> dict[str, Any]:
+        """
+        Returns names, options and choices of common args and modules for
+        shell completion.
+        """
+        recorder: _ArgsRecorder = _ArgsRecorder()
+        self._add_common_args(recorder)  # type: ignore
+
+        modules: dict[str, Any] = {}
+        for plugin_spec in plugin_specs:
+            for module_spec in plugin_spec.modules:
+                module_args: list[tuple[tuple[str, ...], dict[str, Any]]] = [
+                    (arg_spec.names, arg_spec.argparse_kwargs)
+                    for arg_spec in module_spec.args
+                ]
+                modules[module_spec.namespaced_name] = {
+                    "options": [
+                        _HelpCompletionOption,
+                        *(
+                            _get_completion_option(names, kwargs)
+                            for names, kwargs in module_args
+                            if names[0].startswith("-")
+                        ),
+                    ],
+                    "positionals": [
+                        _get_completion_option(names, kwargs)
+                        for names, kwargs in module_args
+                        if not names[0].startswith("-")
+                    ],
+                }
+
+        return {
+            "common_options": [
+                _HelpCompletionOption,
+                *(
+                    _get_completion_option(names, kwargs)
+                    for names, kwargs in recorder.args
+                ),
+            ],
+            "modules": modules,
+        }
+
     def _add_common_args(self, parser: argparse.ArgumentParser) -> None:
         parser.add_argument(
             "-v",
@@ -56,116 +185,194 @@ class CLIGenerator:
                 " Defaults to `$HOME/.clyjin`",
             dest="sysdir",
         )
+        self._add_output_args(parser)
+        self._add_batch_args(parser)
+        self._add_profile_args(parser)
+        self._add_log_args(parser)
+        self._add_watch_args(parser)
+
+    def _add_output_args(self, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--output-format",
+            choices=OutputWriter.Formats,
+            default="text",
+            help="format of records written by the module. Defaults to text",
+            dest="output_format",
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            default=None,
+            help="write records of the module to the file instead of stdout",
+            dest="output_path",
+            metavar="FILE",
+        )
+
+    def _add_batch_args(self, parser: argparse.ArgumentParser) -> None:
+        # batch options are handled by the Boot before parsing, they're added
+        # here to be listed in the help
+        parser.add_argument(
+            "--batch",
+            default=None,
+            help=
+                "execute calls read line by line from the file, or from stdin"
+                " if `-` is given, instead of the module",
+            dest="batch",
+            metavar="FILE",
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=1,
+            help="how many batch calls to execute concurrently. Defaults to 1",
+            dest="batch_jobs",
+            metavar="N",
+        )
+        parser.add_argument(
+            "--as-completed",
+            action="store_true",
+            help=
+                "write output of batch calls as they complete instead of in"
+                " the input order",
+            dest="batch_is_as_completed",
+        )
+
+    def _add_profile_args(self, parser: argparse.ArgumentParser) -> None:
+        # handled by the Boot before parsing, as the batch options are
+        parser.add_argument(
+            "--profile-startup",
+            action="store_true",
+            help="print timings of startup phases to stderr",
+            dest="is_profile_startup",
+        )
+        parser.add_argument(
+            "--profile-json",
+            type=Path,
+            default=None,
+            help="write timings of startup phases as JSON to the file",
+            dest="profile_json",
+            metavar="FILE",
+        )
+
+    def _add_log_args(self, parser: argparse.ArgumentParser) -> None:
+        # handled by the Boot before parsing, as the batch options are
+        parser.add_argument(
+            "--log-format",
+            choices=LogSetup.Formats,
+            default="text",
+            help="format of log records written to stderr. Defaults to text",
+            dest="log_format",
+        )
+        parser.add_argument(
+            "--log-enqueue",
+            action="store_true",
+            help="write log records from a background thread",
+            dest="is_log_enqueued",
+        )
+
+    def _add_watch_args(self, parser: argparse.ArgumentParser) -> None:
+        # handled by the Boot before parsing, as the batch options are
+        parser.add_argument(
+            "--watch",
+            action="append",
+            type=Path,
+            default=None,
+            help=
+                "execute the module again on changes of files at the path,"
+                " can be given several times",
+            dest="watch",
+            metavar="PATH",
+        )
+        parser.add_argument(
+            "--watch-ignore",
+            action="append",
+            default=None,
+            help="ignore changes of watched files matching the glob pattern",
+            dest="watch_ignore",
+            metavar="GLOB",
+        )
 
     def _add_module_subparser_hub(
         self,
         parser: argparse.ArgumentParser,
-    ) -> ArgparseSubParsersAction:
+    ) -> LazySubParsersAction:
         return parser.add_subparsers(
             help="module to launch",
             dest="module",
+            required=True,
+            action=LazySubParsersAction,
         )
 
     def _add_plugins_parsers(
         self,
-        RegisteredPlugins: list[type[Plugin]],
+        plugin_specs: list[PluginSpec],
     ) -> None:
-        for PluginClass in RegisteredPlugins:
-            self._add_plugin_modules_parsers(
-                PluginClass,
-            )
-
-    def _add_plugin_modules_parsers(
-        self,
-        PluginClass: type[Plugin],
-    ) -> None:
-        for ModuleClass in PluginClass.get_module_classes():
-            self._add_plugin_module_parser(PluginClass, ModuleClass)
+        for plugin_spec in plugin_specs:
+            for module_spec in plugin_spec.modules:
+                self._add_plugin_module_parser(module_spec)
 
     def _add_plugin_module_parser(
         self,
-        PluginClass: type[Plugin],
-        ModuleClass: type[Module],
+        module_spec: ModuleSpec,
     ) -> None:
         # add main parser in any case
-        module_parser: argparse.ArgumentParser = \
-            self._module_subparser_hub.add_parser(
-                # prefix any module name with Plugin's namespace
-                PluginClass.get_namespaced_module_name(ModuleClass),
-                help=ModuleClass.Description,
-            )
-
-        module_args: ModuleArgs | None = ModuleClass.Args
-        if module_args is None:
-            # register modules without args only with initial keyword
-            return
-        self._parse_module_args(module_args, module_parser)
+        self._module_subparser_hub.add_lazy_parser(
+            module_spec.namespaced_name,
+            help=module_spec.description,
+            fill=functools.partial(self._fill_module_parser, module_spec),
+        )
 
-    def _parse_module_args(
+    def _fill_module_parser(
         self,
-        module_args: ModuleArgs,
+        module_spec: ModuleSpec,
         module_parser: argparse.ArgumentParser,
     ) -> None:
-        for arg_name, _module_arg in module_args.model_dump().items():
-            if not isinstance(arg_name, str):
-                raise TypeExpectError(
-                    obj=arg_name,
-                    ExpectedType=str,
-                    expected_inheritance="instance",
-                    ActualType=type(arg_name),
-                )
-
-            module_arg: ModuleArg = ModuleArg.parse_obj(_module_arg)
-
-            argparse_type: type | None  = \
-                module_arg.type \
-                if module_arg.argparse_type is None \
-                else module_arg.argparse_type
-
-            arg_add_optionals: dict[str, Any] = dict(
-                type=argparse_type,
-                action=module_arg.action,
-                nargs=module_arg.nargs,
-                const=module_arg.const,
-                default=module_arg.default,
-                choices=module_arg.choices,
-                required=module_arg.required,
-                help=module_arg.help,
-                metavar=module_arg.metavar,
-                **module_arg.argparse_kwargs
-                    if module_arg.argparse_kwargs else {},
+        if module_spec.error is not None:
+            raise module_spec.error
+
+        for arg_spec in module_spec.args:
+            module_parser.add_argument(
+                *arg_spec.names,
+                **arg_spec.argparse_kwargs,
             )
 
-            if arg_add_optionals["action"] == "store_true":
-                del arg_add_optionals["nargs"]
-                del arg_add_optionals["const"]
-                del arg_add_optionals["choices"]
-                del arg_add_optionals["metavar"]
-
-            if argparse_type is type:
-                del arg_add_optionals["type"]
-
-            # do not supply `dest` for positional arguments - argparse gives
-            # an error for that
-            if module_arg.is_optional():
-                module_parser.add_argument(
-                    *module_arg.names,
-                    dest=arg_name,
-                    **arg_add_optionals,
-                )
-            else:
-                # positional arguments are always required
-                if (
-                    arg_add_optionals["required"] is not None
-                    and arg_add_optionals["required"] is False
-                ):
-                    raise UnsupportedError(
-                        title="non-required positional with name",
-                        value=arg_name,
-                    )
-                del arg_add_optionals["required"]
-
-                module_parser.add_argument(
-                    *module_arg.names,
-                    **arg_add_optionals,
-                )
+
+class _ArgsRecorder:
+    """
+    Collects args added by the generator instead of a parser.
+    """
+    def __init__(self) -> None:
+        self.args: list[tuple[tuple[str, ...], dict[str, Any]]] = []
+
+    def add_argument(self, *names: str, **kwargs: Any) -> None:
+        self.args.append((names, kwargs))
+
+
+# actions taking no value
+_FlagActions: set[str] = {
+    "store_true",
+    "store_false",
+    "store_const",
+    "append_const",
+    "count",
+    "help",
+    "version",
+}
+_HelpCompletionOption: dict[str, Any] = {
+    "names": ["-h", "--help"],
+    "is_flag": True,
+    "choices": None,
+}
+
+
+def _get_completion_option(
+    names: tuple[str, ...],
+    kwargs: dict[str, Any],
+) -> dict[str, Any]:
+    choices: Any = kwargs.get("choices")
+    return {
+        "names": list(names),
+        "is_flag":
+            kwargs.get("action") in _FlagActions or kwargs.get("nargs") == 0,
+        "choices": None if choices is None else [str(c) for c in choices],
+    }
@@ -2,36 +2,45 @@ import argparse
 import typing
 from typing import Any
 
-from antievil import (
-    LogicError,
-    NotFoundError,
-    TypeExpectError,
-    UnsupportedError,
-)
+from antievil import LogicError, TypeExpectError
 
 from clyjin.base.module import Module
-from clyjin.base.moduleargs import ModuleArg, ModuleArgs
-from clyjin.base.plugin import Plugin
+from clyjin.base.moduleargs import ModuleArgs
 from clyjin.core.cli.cliargs import CLIArgs
 from clyjin.core.cli.generator import CLIGenerator
+from clyjin.core.cli.schema import CLISchema, PluginSpec
+from clyjin.core.registry import Registry
 
 if typing.TYPE_CHECKING:
     from pathlib import Path
 
+    from clyjin.base.plugin import Plugin
+
 
 class CLIParser:
     """
     Parser CLI args into application objects.
 
     Attributes:
-        RegisteredPlugins:
-            Plugin classes registered in the system to initialize parser
-            groups for.
+        registry:
+            Registry of plugins to resolve called modules with.
+        plugin_specs(optional):
+            Compiled CLI specs to generate the parser from. Defaults to specs
+            compiled from registered plugins.
     """
-    def __init__(self, RegisteredPlugins: list[type[Plugin]]) -> None:
-        self._RegisteredPlugins: list[type[Plugin]] = RegisteredPlugins
+    def __init__(
+        self,
+        registry: Registry,
+        plugin_specs: list[PluginSpec] | None = None,
+    ) -> None:
+        self._registry: Registry = registry
         self._parser: argparse.ArgumentParser = CLIGenerator().get_parser(
-            self._RegisteredPlugins,
+            [
+                CLISchema.compile_plugin_spec(PluginClass)
+                for PluginClass in self._registry.PluginClasses
+            ]
+            if plugin_specs is None
+            else plugin_specs,
         )
 
     def parse(
@@ -51,10 +60,7 @@ class CLIParser:
 
         PluginClass: type[Plugin]
         ModuleClass: type[Module]
-        PluginClass, ModuleClass = \
-            self._get_plugin_module_classses_from_input_name(
-                namespace.module,
-            )
+        PluginClass, ModuleClass = self._registry.get(namespace.module)
 
         populated_module_args: ModuleArgs | None = \
             self._populate_module_args_from_namespace(
@@ -72,38 +78,8 @@ class CLIParser:
             config_path=config_path,
             verbosity_level=verbosity_level,
             sysdir=sysdir,
-        )
-
-    def _get_plugin_module_classses_from_input_name(
-        self,
-        input_name: str,
-    ) -> tuple[type[Plugin], type[Module]]:
-        PluginClass: type[Plugin]
-        ModuleClass: type[Module]
-
-        plugin_name: str
-        module_name: str
-        input_name_dots_count: int = input_name.count(".")
-        if input_name_dots_count == 0:
-            plugin_name = input_name
-            module_name = "$root"
-        elif input_name_dots_count == 1:
-            plugin_name, module_name = input_name.split(".")
-        else:
-            raise UnsupportedError(
-                title="more than one separation dot in input module name",
-                value=input_name,
-            )
-
-        for PC in self._RegisteredPlugins:
-            if PC.get_name() == plugin_name:
-                PluginClass = PC
-                ModuleClass = PluginClass.get_module_class(module_name)
-                return PluginClass, ModuleClass
-
-        raise NotFoundError(
-            title="registered plugin for namespaced name",
-            value=input_name,
+            output_format=namespace.output_format,
+            output_path=namespace.output_path,
         )
 
     def _populate_module_args_from_namespace(
@@ -117,27 +93,14 @@ class CLIParser:
             # nothing to populate, left as it is
             return empty_module_args
 
-        empty_module_args = typing.cast(ModuleArgs, empty_module_args)
-        populated_module_args: ModuleArgs = empty_module_args.model_copy(
-            deep=True,
-        )
-
-        for arg_name, _module_arg in empty_module_args.model_dump().items():
-            if not isinstance(arg_name, str):
-                raise TypeExpectError(
-                    obj=arg_name,
-                    ExpectedType=str,
-                    expected_inheritance="instance",
-                    ActualType=type(arg_name),
-                )
-
-            module_arg: ModuleArg = ModuleArg.parse_obj(_module_arg)
-
+        namespace_values: dict[str, Any] = vars(namespace)
+        values: dict[str, Any] = {}
+        for arg_spec in CLISchema.get_arg_specs(ModuleClass):
             try:
-                arg_value: Any = vars(namespace)[arg_name]
+                arg_value: Any = namespace_values[arg_spec.dest]
             except KeyError as error:
                 error_message: str = \
-                    f"cannot find argument with name <{arg_name}>" \
+                    f"cannot find argument with name <{arg_spec.dest}>" \
                     " in generated namespace"
                 raise LogicError(error_message) from error
 
@@ -145,22 +108,15 @@ class CLIParser:
                 # arg value set to None if it is not defined, which should be
                 # handled at the called module
                 arg_value is not None
-                and not isinstance(arg_value, module_arg.type)
+                and not isinstance(arg_value, arg_spec.ValueType)
             ):
                 raise TypeExpectError(
                     obj=arg_value,
-                    ExpectedType=module_arg.type,
+                    ExpectedType=arg_spec.ValueType,
                     expected_inheritance="instance",
                     ActualType=type(arg_value),
                 )
 
-            try:
-                # finally set value for the module args object, i.e. populate
-                getattr(populated_module_args, arg_name).value = arg_value
-            except ValueError as error:  # arg_name not found
-                error_message: str = \
-                    f"cannot find argument with name <{arg_name}>" \
-                    f" in model args <{empty_module_args}>"
-                raise LogicError(error_message) from error
+            values[arg_spec.dest] = arg_value
 
-        return populated_module_args
+        return empty_module_args.with_values(values)
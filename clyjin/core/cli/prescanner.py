@@ -0,0 +1,192 @@
+from pathlib import Path
+
+
+class PrescannedArgs:
+    """
+    Args found by looking through the CLI input before any plugin is loaded.
+
+    Attributes:
+        module(optional):
+            Namespaced name of the called module. Defaults to None, i.e.
+            no module is called.
+        is_help(optional):
+            Whether the top-level help is requested. Defaults to False.
+        sysdir(optional):
+            Sysdir set by input. Defaults to None.
+        batch(optional):
+            Path to a file with batch calls, or `-` for stdin. Defaults to
+            None, i.e. a single call is made.
+        jobs(optional):
+            How many batch calls can be executed concurrently. Set to 0 if
+            the input value is not a positive integer. Defaults to 1.
+        is_as_completed(optional):
+            Whether output of batch calls is written in order of their
+            completion instead of the input order. Defaults to False.
+        is_profile_startup(optional):
+            Whether timings of startup phases should be reported. Defaults to
+            False.
+        profile_json(optional):
+            Path to write startup timings as JSON to. Defaults to None.
+        watch(optional):
+            Paths to watch for changes to execute the module again. Defaults
+            to empty list, i.e. the module is executed once.
+        watch_ignore(optional):
+            Glob patterns of watched paths to ignore. Defaults to empty list.
+        verbosity_level(optional):
+            How many times `-v` is given. Defaults to 0.
+        log_format(optional):
+            Format of log records. Defaults to `text`.
+        is_log_enqueued(optional):
+            Whether log records are written by a background thread. Defaults
+            to False.
+        common_args(optional):
+            Common args found before the module name, excluding the options
+            applied to the whole process, such as batch options. Defaults to
+            empty list.
+    """
+    # not a dataclass, since the prescanner is imported by the thin client,
+    # and importing dataclasses is several times slower than the prescan
+    __slots__ = (
+        "module",
+        "is_help",
+        "sysdir",
+        "batch",
+        "jobs",
+        "is_as_completed",
+        "is_profile_startup",
+        "profile_json",
+        "watch",
+        "watch_ignore",
+        "verbosity_level",
+        "log_format",
+        "is_log_enqueued",
+        "common_args",
+    )
+
+    def __init__(self) -> None:
+        self.module: str | None = None
+        self.is_help: bool = False
+        self.sysdir: Path | None = None
+        self.batch: str | None = None
+        self.jobs: int = 1
+        self.is_as_completed: bool = False
+        self.is_profile_startup: bool = False
+        self.profile_json: Path | None = None
+        self.watch: list[Path] = []
+        self.watch_ignore: list[str] = []
+        self.verbosity_level: int = 0
+        self.log_format: str = "text"
+        self.is_log_enqueued: bool = False
+        self.common_args: list[str] = []
+
+    @property
+    def plugin_name(self) -> str | None:
+        if self.module is None:
+            return None
+        return self.module.split(".", 1)[0].strip().lower()
+
+
+class CLIPrescanner:
+    """
+    Looks through CLI input to find out which module is called, without
+    building a full argument parser.
+
+    Only common args, defined by the CLIGenerator before the module name, are
+    inspected, so the options taking a value should be kept in sync with it.
+    """
+    ValueOptions: set[str] = {
+        "-c",
+        "--config",
+        "--sysdir",
+        "--output-format",
+        "--output",
+        "--batch",
+        "--jobs",
+        "--profile-json",
+        "--log-format",
+        "--watch",
+        "--watch-ignore",
+    }
+    ProcessOptions: set[str] = {
+        "--batch",
+        "--jobs",
+        "--as-completed",
+        "--profile-startup",
+        "--profile-json",
+        "--log-format",
+        "--log-enqueue",
+        "--watch",
+        "--watch-ignore",
+    }
+
+    def prescan(self, args: list[str]) -> PrescannedArgs:
+        result: PrescannedArgs = PrescannedArgs()
+
+        i: int = 0
+        while i < len(args):
+            arg: str = args[i]
+            i += 1
+
+            if arg == "--":
+                break
+            if not arg.startswith("-") or arg == "-":
+                result.module = arg
+                break
+
+            option_args: list[str] = [arg]
+            if arg in self.ValueOptions:
+                option_args = args[i - 1:i + 1]
+                i += 1
+            self._scan_option(result, option_args)
+
+        return result
+
+    def _scan_option(
+        self,
+        result: PrescannedArgs,
+        option_args: list[str],
+    ) -> None:
+        option: str = option_args[0]
+        value: str | None = option_args[1] if len(option_args) > 1 else None
+        if value is None and "=" in option:
+            option, value = option.split("=", 1)
+
+        if option in ("-h", "--help"):
+            result.is_help = True
+        elif option == "--as-completed":
+            result.is_as_completed = True
+        elif option == "--profile-startup":
+            result.is_profile_startup = True
+        elif option == "--log-enqueue":
+            result.is_log_enqueued = True
+        elif option == "--verbose":
+            result.verbosity_level += 1
+        elif option.startswith("-v") and option.strip("v") == "-":
+            # grouped flags, e.g. `-vv`
+            result.verbosity_level += len(option) - 1
+        elif value is not None:
+            self._set_option(result, option, value)
+
+        if option not in self.ProcessOptions:
+            result.common_args.extend(option_args)
+
+    def _set_option(
+        self,
+        result: PrescannedArgs,
+        option: str,
+        value: str,
+    ) -> None:
+        if option == "--sysdir":
+            result.sysdir = Path(value)
+        elif option == "--batch":
+            result.batch = value
+        elif option == "--jobs":
+            result.jobs = int(value) if value.isdigit() else 0
+        elif option == "--profile-json":
+            result.profile_json = Path(value)
+        elif option == "--log-format":
+            result.log_format = value
+        elif option == "--watch":
+            result.watch.append(Path(value))
+        elif option == "--watch-ignore":
+            result.watch_ignore.append(value)
@@ -0,0 +1,424 @@
+import json
+import os
+import pickle
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from antievil import TypeExpectError, UnsupportedError
+
+from clyjin.base.module import Module
+from clyjin.base.moduleargs import ModuleArg, ModuleArgs
+from clyjin.base.plugin import Plugin
+from clyjin.log import Log
+
+
+@dataclass(frozen=True, slots=True)
+class ArgSpec:
+    """
+    Compiled Module's argument ready to be added to an argument parser.
+
+    Attributes:
+        dest:
+            Name of the argument within Module's args.
+        names:
+            Names or flags of the argument.
+        argparse_kwargs:
+            Keyword arguments for `argparse.ArgumentParser.add_argument()`.
+        ValueType:
+            Type of the parsed value.
+        is_optional:
+            Whether the argument is an option rather than a positional.
+    """
+    dest: str
+    names: tuple[str, ...]
+    argparse_kwargs: dict[str, Any]
+    ValueType: type
+    is_optional: bool
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "dest": self.dest,
+            "names": list(self.names),
+            "value_type": _get_type_name(self.ValueType),
+            "is_optional": self.is_optional,
+            **{
+                k: _get_type_name(v) if isinstance(v, type) else v
+                for k, v in self.argparse_kwargs.items()
+                if k != "dest" and v is not None
+            },
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class ModuleSpec:
+    """
+    Compiled CLI interface of a Module.
+
+    Attributes:
+        name:
+            Module's name.
+        namespaced_name:
+            Module's name prefixed by the Plugin's name.
+        description:
+            Module's description.
+        args:
+            Compiled Module's args.
+        error(optional):
+            Error occurred on args compilation. It is raised only if the
+            Module is called. Defaults to None.
+    """
+    name: str
+    namespaced_name: str
+    description: str | None
+    args: tuple[ArgSpec, ...]
+    error: Exception | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "namespaced_name": self.namespaced_name,
+            "description": self.description,
+            "args": [arg.to_dict() for arg in self.args],
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class PluginSpec:
+    """
+    Compiled CLI interface of a Plugin.
+    """
+    name: str
+    version: str
+    modules: tuple[ModuleSpec, ...]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "version": self.version,
+            "modules": [module.to_dict() for module in self.modules],
+        }
+
+    def is_cacheable(self) -> bool:
+        return all(module.error is None for module in self.modules)
+
+
+class CLISchema:
+    """
+    Compiles CLI interface of Plugins and caches compiled specs in a file.
+
+    The cache is dropped as a whole on Clyjin's version change. Specs of a
+    Plugin are recompiled once the Plugin is imported with another version,
+    or if any source file defining the Plugin, its Modules or Module Args
+    has changed, which is checked without importing the Plugin.
+
+    Each Plugin's spec is pickled separately and unpickled only on request,
+    so types referenced by a Plugin's args are not imported until required.
+
+    Attributes:
+        path:
+            Path to the cache file.
+        clyjin_version:
+            Current Clyjin's version.
+    """
+    CacheVersion: int = 2
+    FileName: str = "schema.pickle"
+
+    # arg specs are compiled once per Module class for the process lifetime
+    _ArgSpecsByModuleClass: dict[type[Module], tuple[ArgSpec, ...]] = {}
+
+    def __init__(self, path: Path, clyjin_version: str) -> None:
+        self._path: Path = path
+        self._clyjin_version: str = clyjin_version
+        # source stamps and pickled plugin specs by the name of Python module
+        # providing the plugin
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._specs: dict[str, PluginSpec] = {}
+        self._is_changed: bool = False
+
+        self._load()
+
+    @classmethod
+    def from_sysdir(cls, sysdir: Path, clyjin_version: str) -> "CLISchema":
+        return cls(Path(sysdir, cls.FileName), clyjin_version)
+
+    def get_plugin_spec(
+        self,
+        PluginClass: type[Plugin],
+        python_module_name: str,
+    ) -> PluginSpec:
+        """
+        Returns spec of an imported Plugin, compiling it if the cached one is
+        missing or outdated.
+        """
+        spec: PluginSpec | None = self.get_cached_plugin_spec(
+            python_module_name,
+        )
+        if spec is not None and spec.version == PluginClass.get_version():
+            return spec
+
+        spec = self.compile_plugin_spec(PluginClass)
+        self._specs[python_module_name] = spec
+        self._entries.pop(python_module_name, None)
+        self._is_changed = True
+        if spec.is_cacheable():
+            try:
+                self._entries[python_module_name] = {
+                    "stamp": self._get_source_stamp(
+                        self._get_source_paths(PluginClass),
+                    ),
+                    "spec": pickle.dumps(spec),
+                }
+            except (pickle.PicklingError, TypeError, AttributeError) as error:
+                Log.warning(
+                    "[core] cannot cache schema of plugin <{}>: error=<{}>",
+                    spec.name,
+                    error,
+                )
+        return spec
+
+    def get_cached_plugin_spec(
+        self,
+        python_module_name: str,
+    ) -> PluginSpec | None:
+        spec: PluginSpec | None = self._specs.get(python_module_name)
+        if spec is not None:
+            return spec
+
+        entry: dict[str, Any] | None = self._entries.get(python_module_name)
+        if entry is None:
+            return None
+        if self._get_source_stamp(
+            [pathstr for pathstr, _ in entry["stamp"]],
+        ) != entry["stamp"]:
+            return None
+
+        try:
+            spec = pickle.loads(entry["spec"])  # noqa: S301
+        except Exception as error:  # noqa: BLE001
+            Log.warning(
+                "[core] cannot load cached schema of Python module <{}>:"
+                " error=<{}>",
+                python_module_name,
+                error,
+            )
+            del self._entries[python_module_name]
+            self._is_changed = True
+            return None
+
+        self._specs[python_module_name] = spec
+        return spec
+
+    def save(self) -> None:
+        if not self._is_changed:
+            return
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path: Path = self._path.with_name(
+            f"{self._path.name}.{os.getpid()}.tmp",
+        )
+        tmp_path.write_bytes(pickle.dumps({
+            "version": self.CacheVersion,
+            "clyjin_version": self._clyjin_version,
+            "entries": self._entries,
+        }))
+        tmp_path.replace(self._path)
+        self._is_changed = False
+
+    @classmethod
+    def compile_plugin_spec(cls, PluginClass: type[Plugin]) -> PluginSpec:
+        return PluginSpec(
+            name=PluginClass.get_name(),
+            version=PluginClass.get_version(),
+            modules=tuple(
+                cls.compile_module_spec(PluginClass, ModuleClass)
+                for ModuleClass in PluginClass.get_module_classes()
+            ),
+        )
+
+    @classmethod
+    def compile_module_spec(
+        cls,
+        PluginClass: type[Plugin],
+        ModuleClass: type[Module],
+    ) -> ModuleSpec:
+        args: tuple[ArgSpec, ...] = ()
+        error: Exception | None = None
+        try:
+            args = cls.get_arg_specs(ModuleClass)
+        except (TypeExpectError, UnsupportedError) as compile_error:
+            error = compile_error
+
+        return ModuleSpec(
+            name=ModuleClass.cls_get_name(),
+            # prefix any module name with Plugin's namespace
+            namespaced_name=PluginClass.get_namespaced_module_name(
+                ModuleClass,
+            ),
+            description=ModuleClass.Description,
+            args=args,
+            error=error,
+        )
+
+    @classmethod
+    def get_arg_specs(cls, ModuleClass: type[Module]) -> tuple[ArgSpec, ...]:
+        """
+        Returns arg specs of the Module, compiling them once per Module
+        class.
+        """
+        arg_specs: tuple[ArgSpec, ...] | None = \
+            cls._ArgSpecsByModuleClass.get(ModuleClass)
+        if arg_specs is None:
+            arg_specs = \
+                () \
+                if ModuleClass.Args is None \
+                else cls.compile_arg_specs(ModuleClass.Args)
+            cls._ArgSpecsByModuleClass[ModuleClass] = arg_specs
+        return arg_specs
+
+    @classmethod
+    def compile_arg_specs(
+        cls,
+        module_args: ModuleArgs,
+    ) -> tuple[ArgSpec, ...]:
+        arg_specs: list[ArgSpec] = []
+
+        # args are taken as they are, without dumping and validating them
+        # again
+        for arg_name in type(module_args).model_fields:
+            module_arg: Any = getattr(module_args, arg_name)
+            if not isinstance(module_arg, ModuleArg):
+                raise TypeExpectError(
+                    obj=module_arg,
+                    ExpectedType=ModuleArg,
+                    expected_inheritance="instance",
+                    ActualType=type(module_arg),
+                )
+
+            argparse_type: type | None  = \
+                module_arg.type \
+                if module_arg.argparse_type is None \
+                else module_arg.argparse_type
+
+            arg_add_optionals: dict[str, Any] = dict(
+                type=argparse_type,
+                action=module_arg.action,
+                nargs=module_arg.nargs,
+                const=module_arg.const,
+                default=module_arg.default,
+                choices=module_arg.choices,
+                required=module_arg.required,
+                help=module_arg.help,
+                metavar=module_arg.metavar,
+                **module_arg.argparse_kwargs
+                    if module_arg.argparse_kwargs else {},
+            )
+
+            if arg_add_optionals["action"] == "store_true":
+                del arg_add_optionals["nargs"]
+                del arg_add_optionals["const"]
+                del arg_add_optionals["choices"]
+                del arg_add_optionals["metavar"]
+
+            if argparse_type is type:
+                del arg_add_optionals["type"]
+
+            # do not supply `dest` for positional arguments - argparse gives
+            # an error for that
+            if module_arg.is_optional():
+                arg_add_optionals["dest"] = arg_name
+            else:
+                # positional arguments are always required
+                if (
+                    arg_add_optionals["required"] is not None
+                    and arg_add_optionals["required"] is False
+                ):
+                    raise UnsupportedError(
+                        title="non-required positional with name",
+                        value=arg_name,
+                    )
+                del arg_add_optionals["required"]
+
+            arg_specs.append(ArgSpec(
+                dest=arg_name,
+                names=tuple(module_arg.names),
+                argparse_kwargs=arg_add_optionals,
+                ValueType=module_arg.type,
+                is_optional=module_arg.is_optional(),
+            ))
+
+        return tuple(arg_specs)
+
+    @staticmethod
+    def dump_json(plugin_specs: list[PluginSpec], clyjin_version: str) -> str:
+        return json.dumps(
+            {
+                "clyjin_version": clyjin_version,
+                "plugins": [spec.to_dict() for spec in plugin_specs],
+            },
+            indent=2,
+            default=repr,
+        )
+
+    def _load(self) -> None:
+        try:
+            data: dict[str, Any] = pickle.loads(  # noqa: S301
+                self._path.read_bytes(),
+            )
+        except FileNotFoundError:
+            return
+        except Exception as error:  # noqa: BLE001
+            Log.warning(
+                "[core] cannot read schema cache <{}>: error=<{}>: rebuild",
+                self._path,
+                error,
+            )
+            self._is_changed = True
+            return
+
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != self.CacheVersion
+            or data.get("clyjin_version") != self._clyjin_version
+            or not isinstance(data.get("entries"), dict)
+        ):
+            self._is_changed = True
+            return
+
+        self._entries = data["entries"]
+
+    def _get_source_paths(self, PluginClass: type[Plugin]) -> list[str]:
+        Classes: list[type] = [PluginClass]
+        for ModuleClass in PluginClass.get_module_classes():
+            Classes.append(ModuleClass)
+            if ModuleClass.Args is not None:
+                Classes.append(type(ModuleClass.Args))
+
+        pathstrs: set[str] = set()
+        for Class in Classes:
+            # builtin or dynamically created modules have no file
+            pathstr: str | None = getattr(
+                sys.modules.get(Class.__module__),
+                "__file__",
+                None,
+            )
+            if pathstr is not None:
+                pathstrs.add(pathstr)
+        return sorted(pathstrs)
+
+    def _get_source_stamp(self, pathstrs: list[str]) -> list[list[Any]]:
+        stamp: list[list[Any]] = []
+        for pathstr in pathstrs:
+            try:
+                mtime: int | None = Path(pathstr).stat().st_mtime_ns
+            except OSError:
+                mtime = None
+            stamp.append([pathstr, mtime])
+        return stamp
+
+
+def _get_type_name(Type: type) -> str:
+    if Type.__module__ == "builtins":
+        return Type.__qualname__
+    return f"{Type.__module__}.{Type.__qualname__}"
@@ -0,0 +1,40 @@
+from typing import TYPE_CHECKING
+
+from clyjin.base import Config, Module, ModuleArg, ModuleArgs, Plugin
+from clyjin.core.cli.generator import CLIGenerator
+from clyjin.core.cli.schema import CLISchema
+
+if TYPE_CHECKING:
+    import argparse
+
+
+class BrokenArgs(ModuleArgs):
+    target: ModuleArg[str]
+
+
+class BrokenModule(Module[BrokenArgs, Config]):
+    Name = "broken"
+    Description = "module with unsupported args"
+    # non-required positionals are not supported by the generator
+    Args = BrokenArgs(
+        target=ModuleArg[str](names=["target"], type=str, required=False),
+    )
+
+
+class FineModule(Module[None, Config]):
+    Name = "fine"
+    Description = "module without args"
+
+
+class GeneratorPlugin(Plugin):
+    Name = "generator"
+    ModuleClasses = [BrokenModule, FineModule]
+
+
+def test_only_selected_module_args_added():
+    parser: argparse.ArgumentParser = CLIGenerator().get_parser(
+        [CLISchema.compile_plugin_spec(GeneratorPlugin)],
+    )
+
+    assert "generator.broken" in parser.format_help()
+    assert parser.parse_args(["generator.fine"]).module == "generator.fine"
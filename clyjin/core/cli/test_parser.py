@@ -0,0 +1,55 @@
+from typing import TYPE_CHECKING
+
+import pytest
+from antievil import UnsetValueError
+
+from clyjin.base import Config, Module, ModuleArg, ModuleArgs, Plugin
+from clyjin.core.cli.parser import CLIParser
+from clyjin.core.registry import Registry
+
+if TYPE_CHECKING:
+    from clyjin.core.cli.cliargs import CLIArgs
+
+
+class CopyArgs(ModuleArgs):
+    source: ModuleArg[str]
+    count: ModuleArg[int]
+    is_force: ModuleArg[bool]
+
+
+class CopyModule(Module[CopyArgs, Config]):
+    Name = "copy"
+    Args = CopyArgs(
+        source=ModuleArg[str](names=["source"], type=str),
+        count=ModuleArg[int](names=["--count"], type=int, default=1),
+        is_force=ModuleArg[bool](
+            names=["--force"],
+            action="store_true",
+            type=bool,
+            argparse_type=type,
+            default=False,
+        ),
+    )
+
+
+class FilesPlugin(Plugin):
+    Name = "files"
+    ModuleClasses = [CopyModule]
+
+
+def test_parse_populates_copy_of_args():
+    registry: Registry = Registry()
+    registry.register(FilesPlugin)
+
+    cli_args: CLIArgs = CLIParser(registry).parse(
+        ["files.copy", "a.txt", "--count", "3"],
+    )
+    populated_args: CopyArgs = cli_args.populated_module_args
+
+    assert populated_args.source.value == "a.txt"
+    assert populated_args.count.value == 3  # noqa: PLR2004
+    assert populated_args.is_force.value is False
+    assert populated_args.source.names == ["source"]
+    # args defined by the Module class are left untouched
+    with pytest.raises(UnsetValueError):
+        CopyModule.Args.source.value  # noqa: B018
@@ -0,0 +1,131 @@
+import io
+import json
+import os
+import socket
+import stat
+import sys
+from pathlib import Path
+
+
+class Client:
+    """
+    Thin client forwarding a Clyjin call to the resident server.
+
+    Only a few standard library modules are imported here, so forwarding a
+    call doesn't pay the cost of importing the core and plugins. Even
+    `typing` is avoided for the same reason.
+
+    Attributes:
+        socket_path:
+            Path to the Unix socket the server listens at.
+    """
+    SocketFileName: str = "server.sock"
+
+    def __init__(self, socket_path: Path) -> None:
+        self._socket_path: Path = socket_path
+
+    @classmethod
+    def from_sysdir(cls, sysdir: Path) -> "Client":
+        return cls(cls.get_socket_path(sysdir))
+
+    @classmethod
+    def get_socket_path(cls, sysdir: Path) -> Path:
+        return Path(sysdir, cls.SocketFileName)
+
+    def call(
+        self,
+        args: list[str],
+        *,
+        stdout: io.TextIOBase | None = None,
+        stderr: io.TextIOBase | None = None,
+    ) -> int | None:
+        """
+        Forwards the call to the server and writes the call's output to the
+        given streams.
+
+        Returns:
+            Exit code of the call, or None if no server is running.
+        """
+        stdout = sys.stdout if stdout is None else stdout
+        stderr = sys.stderr if stderr is None else stderr
+
+        AF_UNIX: int | None = getattr(socket, "AF_UNIX", None)
+        if AF_UNIX is None or not self._socket_path.exists():
+            return None
+
+        if not self._is_stdin_forwardable():
+            return None
+
+        sock: socket.socket = socket.socket(AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(self._socket_path))
+        except ConnectionRefusedError:
+            # nobody listens, the socket is left by a killed server
+            sock.close()
+            self._socket_path.unlink(missing_ok=True)
+            return None
+        except OSError:
+            sock.close()
+            return None
+
+        # stdin is read only once the call is surely forwarded, so it's left
+        # for the calling process otherwise
+        stdin: bytes = self._read_stdin()
+        with sock, sock.makefile("rwb") as stream:
+            # stdin follows the request line as is, so its size isn't
+            # limited by the server's line limit
+            stream.write((json.dumps({
+                "args": args,
+                "cwd": str(Path.cwd()),
+                "env": dict(os.environ),
+                "stdin_size": len(stdin),
+                "stdin_encoding": self._get_stdin_encoding(),
+            }) + "\n").encode())
+            stream.write(stdin)
+            stream.flush()
+
+            for line in stream:
+                message: dict = json.loads(line)
+                if "exit" in message:
+                    stdout.flush()
+                    stderr.flush()
+                    return message["exit"]
+                elif "stdout" in message:
+                    stdout.write(message["stdout"])
+                elif "stderr" in message:
+                    stderr.write(message["stderr"])
+
+        stderr.write("clyjin server closed the connection unexpectedly\n")
+        return 1
+
+    def _is_stdin_forwardable(self) -> bool:
+        """
+        Checks whether stdin can be forwarded to the server.
+
+        A pipe or a socket may be still written to while the call is
+        executed, which the server cannot wait for, so such calls are
+        executed within the calling process.
+        """
+        mode: int | None = self._get_stdin_mode()
+        return mode is None or not (stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode))
+
+    def _read_stdin(self) -> bytes:
+        """
+        Reads stdin to forward if it's a file, or returns empty data
+        otherwise.
+        """
+        mode: int | None = self._get_stdin_mode()
+        if mode is None or not stat.S_ISREG(mode):
+            return b""
+        return sys.stdin.buffer.read()
+
+    def _get_stdin_mode(self) -> int | None:
+        if sys.stdin is None or sys.stdin.isatty():
+            return None
+        try:
+            return os.fstat(sys.stdin.fileno()).st_mode
+        except (OSError, ValueError):
+            return None
+
+    def _get_stdin_encoding(self) -> str:
+        return getattr(sys.stdin, "encoding", None) or "utf-8"
@@ -0,0 +1,199 @@
+import json
+import os
+from pathlib import Path
+
+_BashScript: str = """\
+_clyjin_complete() {
+    local IFS=$'\\n'
+    COMPREPLY=($(clyjin --complete "${COMP_WORDS[@]:1:COMP_CWORD}"))
+}
+complete -o default -F _clyjin_complete clyjin
+"""
+
+_ZshScript: str = """\
+#compdef clyjin
+_clyjin() {
+    local -a candidates
+    candidates=("${(@f)$(clyjin --complete "${(@)words[2,CURRENT]}")}")
+    if [[ -n "${candidates[1]}" ]]; then
+        compadd -- "${candidates[@]}"
+    else
+        _files
+    fi
+}
+compdef _clyjin clyjin
+"""
+
+_FishScript: str = """\
+function __clyjin_complete
+    set -l tokens (commandline -opc)
+    set -l candidates (clyjin --complete $tokens[2..-1] (commandline -ct))
+    if test (count $candidates) -eq 0
+        __fish_complete_path (commandline -ct)
+    else
+        printf '%s\\n' $candidates
+    end
+end
+complete -c clyjin -f -a '(__clyjin_complete)'
+"""
+
+
+class Completer:
+    """
+    Answers shell completion requests from the completion index, a file in
+    the sysdir with names, options and choices of all installed modules.
+
+    The index is written by `core.completion` and `core.reindex` modules, so
+    a completion request neither imports plugins nor builds an argument
+    parser. As the thin client, this module imports only a few standard
+    library modules.
+
+    Words are args following the `clyjin` command, the last one being the
+    word under the cursor. Pipelines are completed as well, each call after
+    the `-- |` separator starting from the module name.
+
+    The index's first line holds common options, and each following line
+    holds a module name and its options encoded separately, so a request
+    decodes options of a single module only.
+
+    Attributes:
+        common_options:
+            Options given before the module name.
+        encoded_modules:
+            JSON-encoded options and positionals by namespaced module name.
+    """
+    IndexVersion: int = 1
+    IndexFileName: str = "completion.index"
+    Shells: list[str] = ["bash", "zsh", "fish"]
+
+    # the same separator as the Pipeline's, which is not imported here
+    _PipelineSeparator: list[str] = ["--", "|"]
+    _Scripts: dict[str, str] = {
+        "bash": _BashScript,
+        "zsh": _ZshScript,
+        "fish": _FishScript,
+    }
+
+    def __init__(
+        self,
+        common_options: list[dict],
+        encoded_modules: dict[str, str],
+    ) -> None:
+        self._common_options: list[dict] = common_options
+        self._encoded_modules: dict[str, str] = encoded_modules
+        self._modules: dict[str, dict] = {}
+
+    @classmethod
+    def from_sysdir(cls, sysdir: Path) -> "Completer":
+        """
+        Loads the index from the sysdir. A missing or outdated index gives a
+        completer without candidates.
+        """
+        try:
+            header, *lines = \
+                Path(sysdir, cls.IndexFileName).read_text().splitlines()
+            header_data: dict = json.loads(header)
+            encoded_modules: dict[str, str] = dict(
+                line.split("\t", 1) for line in lines
+            )
+        except (OSError, ValueError):
+            return cls([], {})
+        if (
+            not isinstance(header_data, dict)
+            or header_data.get("version") != cls.IndexVersion
+        ):
+            return cls([], {})
+
+        return cls(header_data["common_options"], encoded_modules)
+
+    @classmethod
+    def from_words(cls, words: list[str]) -> "Completer":
+        """
+        Loads the index from the sysdir given by words, or from the default
+        one.
+        """
+        sysdir: Path = Path(os.environ["HOME"], ".clyjin")
+        for i, word in enumerate(words[:-2]):
+            if word == "--sysdir":
+                sysdir = Path(words[i + 1])
+        return cls.from_sysdir(sysdir)
+
+    @classmethod
+    def write_index(cls, sysdir: Path, index: dict) -> None:
+        """
+        Writes the index given as a dict with `common_options` and `modules`
+        keys.
+        """
+        lines: list[str] = [json.dumps({
+            "version": cls.IndexVersion,
+            "common_options": index["common_options"],
+        })]
+        for name, module in index["modules"].items():
+            lines.append(f"{name}\t{json.dumps(module)}")
+
+        sysdir.mkdir(parents=True, exist_ok=True)
+        path: Path = Path(sysdir, cls.IndexFileName)
+        tmp_path: Path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text("\n".join(lines) + "\n")
+        tmp_path.replace(path)
+
+    @classmethod
+    def get_script(cls, shell: str) -> str:
+        return cls._Scripts[shell]
+
+    def complete(self, words: list[str]) -> list[str]:
+        """
+        Returns candidates for the last word. Empty list means that the shell
+        should complete file paths.
+        """
+        *previous_words, current_word = words or [""]
+
+        module_name: str | None = None
+        value_option: dict | None = None
+        positionals_count: int = 0
+        for i, word in enumerate(previous_words):
+            if value_option is not None:
+                value_option = None
+            elif previous_words[i - 1:i + 1] == self._PipelineSeparator:
+                module_name = None
+                positionals_count = 0
+            elif word.startswith("-") and word != "-":
+                option: dict | None = self._get_options(module_name).get(word)
+                if option is not None and not option["is_flag"]:
+                    value_option = option
+            elif module_name is None:
+                module_name = word
+            else:
+                positionals_count += 1
+
+        candidates: list[str]
+        if value_option is not None:
+            candidates = value_option["choices"] or []
+        elif current_word.startswith("-"):
+            candidates = list(self._get_options(module_name))
+        elif module_name is None:
+            candidates = list(self._encoded_modules)
+        else:
+            positionals: list[dict] = \
+                self._get_module(module_name).get("positionals", [])
+            candidates = \
+                positionals[positionals_count]["choices"] or [] \
+                if positionals_count < len(positionals) \
+                else []
+
+        return [c for c in candidates if c.startswith(current_word)]
+
+    def _get_options(self, module_name: str | None) -> dict[str, dict]:
+        options: list[dict] = \
+            self._common_options \
+            if module_name is None \
+            else self._get_module(module_name).get("options", [])
+        return {name: option for option in options for name in option["names"]}
+
+    def _get_module(self, name: str) -> dict:
+        module: dict | None = self._modules.get(name)
+        if module is None:
+            encoded: str | None = self._encoded_modules.get(name)
+            module = {} if encoded is None else json.loads(encoded)
+            self._modules[name] = module
+        return module
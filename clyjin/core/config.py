@@ -0,0 +1,194 @@
+import os
+import pickle
+from pathlib import Path
+from typing import Any
+
+from antievil import UnsupportedError
+
+from clyjin.base.config import Config
+from clyjin.base.module import Module
+from clyjin.base.plugin import Plugin
+from clyjin.core.profiler import StartupProfiler
+from clyjin.log import Log
+
+
+class ConfigLoader:
+    """
+    Reads Modules' configs from configuration files, AKA `clyjin.yml`, and
+    caches parsed files in a file.
+
+    A configuration file maps names of Plugins to their sections, and each
+    Plugin's section maps names of Modules to their configs, a root Module
+    is configured under `$root`:
+    ```yaml
+    someplugin:
+        $root:
+            value: 1
+        somemodule:
+            value: 2
+    ```
+
+    Only the called Module's config is validated. Each Plugin's section is
+    pickled separately and unpickled only on request, so a large file shared
+    by many Plugins is parsed once per its change, which is detected by the
+    file's mtime and size.
+
+    Attributes:
+        path:
+            Path to the cache file.
+    """
+    CacheVersion: int = 1
+    FileName: str = "configs.pickle"
+
+    def __init__(self, path: Path) -> None:
+        self._path: Path = path
+        # stamps and pickled plugin sections by resolved config file paths
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._is_loaded: bool = False
+        self._is_changed: bool = False
+
+    @classmethod
+    def from_sysdir(cls, sysdir: Path) -> "ConfigLoader":
+        return cls(Path(sysdir, cls.FileName))
+
+    def get_config(
+        self,
+        config_path: Path,
+        PluginClass: type[Plugin],
+        ModuleClass: type[Module],
+    ) -> Config | None:
+        """
+        Returns validated config of the Module, or None if the Module has no
+        Config class attached.
+
+        A Module missing in the file gets the default config.
+
+        Raises:
+            UnsupportedError:
+                The file or Plugin's section is not a mapping.
+            pydantic.ValidationError:
+                Module's section doesn't conform its Config class.
+        """
+        ConfigClass: type[Config] | None = ModuleClass.CONFIG_CLASS
+        if ConfigClass is None:
+            return None
+
+        section: dict[str, Any] = self.get_plugin_section(
+            config_path,
+            PluginClass.get_name(),
+        )
+        module_section: Any = section.get(ModuleClass.cls_get_name())
+        return ConfigClass.model_validate(
+            {} if module_section is None else module_section,
+        )
+
+    def get_plugin_section(
+        self,
+        config_path: Path,
+        plugin_name: str,
+    ) -> dict[str, Any]:
+        """
+        Returns raw section of the Plugin, which is empty if the file or the
+        section doesn't exist.
+        """
+        try:
+            stat: os.stat_result = config_path.stat()
+        except FileNotFoundError:
+            return {}
+        stamp: list[int] = [stat.st_mtime_ns, stat.st_size]
+        pathstr: str = str(config_path.resolve())
+
+        self._load()
+        entry: dict[str, Any] | None = self._entries.get(pathstr)
+        if entry is None or entry["stamp"] != stamp:
+            with StartupProfiler.measure(f"config <{config_path}> parsing"):
+                entry = {
+                    "stamp": stamp,
+                    "sections": {
+                        name: pickle.dumps(section)
+                        for name, section in self._parse(config_path).items()
+                    },
+                }
+            self._entries[pathstr] = entry
+            self._is_changed = True
+
+        pickled_section: bytes | None = entry["sections"].get(plugin_name)
+        if pickled_section is None:
+            return {}
+        return pickle.loads(pickled_section)  # noqa: S301
+
+    def save(self) -> None:
+        if not self._is_changed:
+            return
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path: Path = self._path.with_name(
+            f"{self._path.name}.{os.getpid()}.tmp",
+        )
+        tmp_path.write_bytes(pickle.dumps({
+            "version": self.CacheVersion,
+            "entries": self._entries,
+        }))
+        tmp_path.replace(self._path)
+        self._is_changed = False
+
+    def _parse(self, config_path: Path) -> dict[str, dict[str, Any]]:
+        # yaml is imported only if a file is not cached
+        import yaml
+        try:
+            Loader: type = yaml.CSafeLoader
+        except AttributeError:
+            # pyyaml is built without libyaml
+            Loader = yaml.SafeLoader
+
+        with config_path.open("r") as f:
+            data: Any = yaml.load(f, Loader=Loader)  # noqa: S506
+
+        if data is None:
+            return {}
+        if not isinstance(data, dict):
+            raise UnsupportedError(
+                title=f"non-mapping config file <{config_path}>",
+                value=data,
+            )
+        for plugin_name, section in data.items():
+            if section is not None and not isinstance(section, dict):
+                raise UnsupportedError(
+                    title=f"non-mapping section of plugin <{plugin_name}>",
+                    value=section,
+                )
+        return {
+            str(plugin_name): section
+            for plugin_name, section in data.items()
+            if section is not None
+        }
+
+    def _load(self) -> None:
+        if self._is_loaded:
+            return
+        self._is_loaded = True
+
+        try:
+            data: dict[str, Any] = pickle.loads(  # noqa: S301
+                self._path.read_bytes(),
+            )
+        except FileNotFoundError:
+            return
+        except Exception as error:  # noqa: BLE001
+            Log.warning(
+                "[core] cannot read config cache <{}>: error=<{}>: rebuild",
+                self._path,
+                error,
+            )
+            self._is_changed = True
+            return
+
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != self.CacheVersion
+            or not isinstance(data.get("entries"), dict)
+        ):
+            self._is_changed = True
+            return
+
+        self._entries = data["entries"]
@@ -0,0 +1,295 @@
+import json
+import os
+import pkgutil
+import sys
+from pathlib import Path
+from typing import Any
+
+from clyjin.log import Log
+
+PluginModulePrefix: str = "clyjin_"
+
+
+class PluginDiscovery:
+    """
+    Finds Python modules of installed plugins, i.e. modules which names start
+    with `clyjin_`.
+
+    Instead of scanning the whole `sys.path` on every run, results are kept in
+    a discovery index file. Each `sys.path` entry is stored along with a
+    cheap fingerprint (modification time and size of the entry), so only
+    entries which have changed since the last run are rescanned, e.g. after
+    a package was installed into one site-packages directory.
+
+    Allow and deny lists are stored within the same index and applied before
+    any plugin module is imported.
+
+    For each imported plugin module a manifest with plugin's name and module
+    names is recorded, so the next runs can find the Python module providing
+    a plugin without importing every installed plugin. Manifests are dropped
+    together with the `sys.path` entry they are found at once the entry's
+    fingerprint changes.
+
+    Entries of `sys.path` differ between runs, e.g. the current directory, so
+    the index keeps only the max entries used most recently.
+
+    Attributes:
+        index_path:
+            Path to the discovery index file.
+    """
+    IndexVersion: int = 1
+    IndexFileName: str = "discovery.json"
+    MaxEntries: int = 64
+
+    def __init__(self, index_path: Path) -> None:
+        self._index_path: Path = index_path
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._allow: list[str] | None = None
+        self._deny: list[str] = []
+        self._is_changed: bool = False
+        # stat of the index file as it was read or written by this object
+        self._index_stamp: list[int] | None = None
+
+        self._load()
+
+    @classmethod
+    def from_sysdir(cls, sysdir: Path) -> "PluginDiscovery":
+        return cls(Path(sysdir, cls.IndexFileName))
+
+    @property
+    def allow(self) -> list[str] | None:
+        return self._allow
+
+    @property
+    def deny(self) -> list[str]:
+        return self._deny
+
+    def set_filters(
+        self,
+        *,
+        allow: list[str] | None,
+        deny: list[str],
+    ) -> None:
+        """
+        Sets plugin module names which are allowed or denied to be loaded.
+
+        Names can be given either with or without `clyjin_` prefix. Allow list
+        set to None means that all not denied plugins are allowed.
+        """
+        self._allow = \
+            None if allow is None else [self._normalize(n) for n in allow]
+        self._deny = [self._normalize(n) for n in deny]
+        self._is_changed = True
+
+    def get_names(
+        self,
+        *,
+        is_rebuild: bool = False,
+    ) -> list[tuple[str, str]]:
+        """
+        Returns names of found plugin modules along with paths they were found
+        at.
+
+        Modules are returned in order of `sys.path` entries, if the same name
+        is found at several entries, only the first one is returned, as the
+        import system would do.
+
+        Args:
+            is_rebuild(optional):
+                Whether to drop stored index and rescan all entries. Defaults
+                to False.
+        """
+        if is_rebuild:
+            self._entries = {}
+            self._is_changed = True
+
+        result: list[tuple[str, str]] = []
+        seen_names: set[str] = set()
+
+        pathstrs: list[str] = self._get_syspath_entries()
+        for pathstr in pathstrs:
+            fingerprint: list[int] | None = self._get_fingerprint(pathstr)
+            entry: dict[str, Any] | None = self._entries.get(pathstr)
+
+            if entry is None or entry["fingerprint"] != fingerprint:
+                entry = {
+                    "fingerprint": fingerprint,
+                    "names": self._scan(pathstr, fingerprint),
+                }
+                self._entries[pathstr] = entry
+                self._is_changed = True
+
+            for name in entry["names"]:
+                if name in seen_names or not self._is_allowed(name):
+                    continue
+                seen_names.add(name)
+                result.append((name, pathstr))
+
+        if self._is_changed:
+            self._trim_entries(pathstrs)
+        self.save()
+        return result
+
+    def get_manifest_module_name(
+        self,
+        plugin_name: str,
+        names: list[tuple[str, str]],
+    ) -> str | None:
+        """
+        Returns name of the Python module which provides plugin with given
+        name according to the recorded manifests.
+
+        Args:
+            plugin_name:
+                Name of the plugin to search for.
+            names:
+                Found plugin modules, as returned by `get_names()`.
+        """
+        for name, pathstr in names:
+            manifest: dict[str, Any] | None = self.get_manifest(name, pathstr)
+            if manifest is not None and manifest["plugin"] == plugin_name:
+                return name
+        return None
+
+    def get_manifest(
+        self,
+        name: str,
+        pathstr: str,
+    ) -> dict[str, Any] | None:
+        return self._entries[pathstr].get("manifests", {}).get(name)
+
+    def set_manifest(
+        self,
+        *,
+        name: str,
+        pathstr: str,
+        plugin_name: str,
+        module_names: list[str],
+    ) -> None:
+        entry: dict[str, Any] | None = self._entries.get(pathstr)
+        if entry is None:
+            return
+
+        manifest: dict[str, Any] = {
+            "plugin": plugin_name,
+            "modules": module_names,
+        }
+        manifests: dict[str, Any] = entry.setdefault("manifests", {})
+        if manifests.get(name) != manifest:
+            manifests[name] = manifest
+            self._is_changed = True
+
+    def is_index_changed(self) -> bool:
+        """
+        Checks whether the index file is changed by another object since it
+        was read or written by this one, e.g. by `core.reindex` executed by
+        the same long-running process.
+        """
+        return self._get_index_stamp() != self._index_stamp
+
+    def save(self) -> None:
+        if not self._is_changed:
+            return
+
+        self._index_path.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first to not leave a broken index if
+        # several processes write it simultaneously
+        tmp_path: Path = self._index_path.with_name(
+            f"{self._index_path.name}.{os.getpid()}.tmp",
+        )
+        tmp_path.write_text(json.dumps({
+            "version": self.IndexVersion,
+            "allow": self._allow,
+            "deny": self._deny,
+            "entries": self._entries,
+        }))
+        tmp_path.replace(self._index_path)
+        self._is_changed = False
+        self._index_stamp = self._get_index_stamp()
+
+    def _load(self) -> None:
+        # taken before reading, so a change made in between is noticed
+        self._index_stamp = self._get_index_stamp()
+        try:
+            data: dict[str, Any] = json.loads(self._index_path.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as error:
+            Log.warning(
+                "[core] cannot read discovery index <{}>: error=<{}>: rebuild",
+                self._index_path,
+                error,
+            )
+            self._is_changed = True
+            return
+
+        if data.get("version") != self.IndexVersion:
+            self._is_changed = True
+            return
+
+        self._entries = data.get("entries", {})
+        self._allow = data.get("allow")
+        self._deny = data.get("deny", [])
+
+    def _get_index_stamp(self) -> list[int] | None:
+        try:
+            stat: os.stat_result = self._index_path.stat()
+        except OSError:
+            return None
+        # the index is replaced on writing, so the inode is changed as well
+        return [stat.st_ino, stat.st_mtime_ns, stat.st_size]
+
+    def _get_syspath_entries(self) -> list[str]:
+        entries: list[str] = []
+        for pathstr in sys.path:
+            if not isinstance(pathstr, str):
+                continue
+            abspathstr: str = str(Path(pathstr).absolute())
+            if abspathstr not in entries:
+                entries.append(abspathstr)
+        return entries
+
+    def _trim_entries(self, used_pathstrs: list[str]) -> None:
+        """
+        Moves used entries to the end and drops the first ones exceeding the
+        max entries.
+
+        Entries are reordered only if the index is written anyway, so runs
+        not changing the index don't write it just to update the order.
+        """
+        for pathstr in used_pathstrs:
+            self._entries[pathstr] = self._entries.pop(pathstr)
+        for pathstr in list(self._entries)[:-self.MaxEntries]:
+            del self._entries[pathstr]
+
+    def _get_fingerprint(self, pathstr: str) -> list[int] | None:
+        # directory's mtime is changed on every addition or removal of its
+        # children, so a newly installed distribution changes the fingerprint
+        # of the site-packages it was installed to
+        try:
+            stat: os.stat_result = Path(pathstr).stat()
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _scan(self, pathstr: str, fingerprint: list[int] | None) -> list[str]:
+        if fingerprint is None:
+            return []
+
+        Log.info("[core] scan path <{}> for plugins", pathstr)
+        return [
+            module_info.name
+            for module_info in pkgutil.iter_modules([pathstr])
+            if module_info.name.startswith(PluginModulePrefix)
+        ]
+
+    def _is_allowed(self, name: str) -> bool:
+        if name in self._deny:
+            return False
+        return self._allow is None or name in self._allow
+
+    def _normalize(self, name: str) -> str:
+        name = name.strip().lower()
+        if not name.startswith(PluginModulePrefix):
+            name = PluginModulePrefix + name
+        return name
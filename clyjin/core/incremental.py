@@ -0,0 +1,255 @@
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from antievil import UnsupportedError
+
+from clyjin.base.changeset import ChangeSet
+from clyjin.base.store import Store
+from clyjin.core.modulecall import ModuleCall
+
+if TYPE_CHECKING:
+    from clyjin.base.module import Module
+
+
+@dataclass(frozen=True, slots=True)
+class IncrementalState:
+    """
+    Changes detected for a Module call with the manifest to record once the
+    call succeeds.
+
+    Attributes:
+        changes:
+            Changes to pass to the Module.
+        fingerprint:
+            Hash of everything, besides inputs, the Module's results depend
+            on.
+        inputs:
+            Stamps and hashes of input files to record by their paths,
+            unchanged entries are omitted.
+        recorded_outputs:
+            Stamps of output files from the manifest by their paths.
+        stale_keys:
+            Manifest keys to delete on recording.
+    """
+    changes: ChangeSet
+    fingerprint: str
+    inputs: dict[str, list[Any]]
+    recorded_outputs: dict[str, list[Any]]
+    stale_keys: list[str]
+
+
+class IncrementalTracker:
+    """
+    Tracks inputs and outputs of an incremental Module in a manifest kept in
+    the Module's sysdir.
+
+    Files are compared by mtime and size, and only files with changed stamps
+    are hashed, so unchanged trees cost a stat call per file. The manifest
+    is updated only for changed entries.
+
+    Attributes:
+        path:
+            Path to the manifest store.
+    """
+    FileName: str = "incremental.sqlite3"
+    ManifestVersion: int = 1
+
+    def __init__(self, path: Path) -> None:
+        self._manifest: Store = Store(path)
+
+    @classmethod
+    def from_module_sysdir(cls, module_sysdir: Path) -> "IncrementalTracker":
+        return cls(Path(module_sysdir, cls.FileName))
+
+    async def detect(self, module_call: ModuleCall) -> IncrementalState:
+        """
+        Compares current inputs and outputs of the call's Module with the
+        recorded ones.
+        """
+        rootdir: Path = module_call.plugin_initialize_data.root_dir
+        fingerprint: str = self._get_fingerprint(module_call)
+        input_paths: list[Path] = await asyncio.to_thread(
+            self._expand,
+            rootdir,
+            module_call.module.get_input_patterns(),
+        )
+        output_paths: list[Path] = await asyncio.to_thread(
+            self._expand,
+            rootdir,
+            module_call.module.get_output_patterns(),
+        )
+
+        recorded_inputs: dict[str, list[Any]] = {
+            key.removeprefix("input."): value
+            for key, value in await self._manifest.scan("input.")
+        }
+        recorded_outputs: dict[str, list[Any]] = {
+            key.removeprefix("output."): value
+            for key, value in await self._manifest.scan("output.")
+        }
+        is_full: bool = \
+            await self._manifest.get("fingerprint") != fingerprint \
+            or recorded_outputs != await asyncio.to_thread(
+                self._get_stamps,
+                rootdir,
+                output_paths,
+            )
+
+        inputs: dict[str, list[Any]] = await asyncio.to_thread(
+            self._get_input_entries,
+            rootdir,
+            input_paths,
+            {} if is_full else recorded_inputs,
+        )
+
+        added: list[Path] = []
+        modified: list[Path] = []
+        for pathstr, entry in inputs.items():
+            recorded_entry: list[Any] | None = \
+                None if is_full else recorded_inputs.get(pathstr)
+            if recorded_entry is None:
+                added.append(Path(pathstr))
+            elif recorded_entry[2] != entry[2]:
+                modified.append(Path(pathstr))
+        removed: list[Path] = [
+            Path(pathstr)
+            for pathstr in recorded_inputs
+            if pathstr not in inputs
+        ]
+
+        return IncrementalState(
+            changes=ChangeSet(
+                added=added,
+                modified=modified,
+                removed=[] if is_full else removed,
+                is_full=is_full,
+            ),
+            fingerprint=fingerprint,
+            inputs={
+                pathstr: entry
+                for pathstr, entry in inputs.items()
+                if is_full or recorded_inputs.get(pathstr) != entry
+            },
+            recorded_outputs={} if is_full else recorded_outputs,
+            stale_keys=
+                [
+                    *(f"input.{pathstr}" for pathstr in recorded_inputs),
+                    *(f"output.{pathstr}" for pathstr in recorded_outputs),
+                ]
+                if is_full
+                else [f"input.{path}" for path in removed],
+        )
+
+    async def record(
+        self,
+        module_call: ModuleCall,
+        state: IncrementalState,
+    ) -> None:
+        """
+        Records the state once the call's Module is executed, with stamps of
+        outputs written by the Module.
+        """
+        rootdir: Path = module_call.plugin_initialize_data.root_dir
+        outputs: dict[str, list[Any]] = await asyncio.to_thread(
+            self._get_stamps,
+            rootdir,
+            await asyncio.to_thread(
+                self._expand,
+                rootdir,
+                module_call.module.get_output_patterns(),
+            ),
+        )
+
+        async with self._manifest.transaction() as transaction:
+            for key in state.stale_keys:
+                transaction.delete(key)
+            for pathstr in state.recorded_outputs.keys() - outputs.keys():
+                transaction.delete(f"output.{pathstr}")
+            transaction.set("fingerprint", state.fingerprint)
+            for pathstr, entry in state.inputs.items():
+                transaction.set(f"input.{pathstr}", entry)
+            for pathstr, stamp in outputs.items():
+                if state.recorded_outputs.get(pathstr) != stamp:
+                    transaction.set(f"output.{pathstr}", stamp)
+
+    def close(self) -> None:
+        self._manifest.close()
+
+    def _get_fingerprint(self, module_call: ModuleCall) -> str:
+        module: Module = module_call.module
+        data: dict[str, Any] = {
+            "version": self.ManifestVersion,
+            "plugin_version": module_call.PluginClass.get_version(),
+            "rootdir": str(module_call.plugin_initialize_data.root_dir),
+            "args":
+                module.args.get_values() if module.Args is not None else {},
+            "config":
+                module.config.model_dump(mode="json")
+                if module.CONFIG_CLASS is not None else None,
+            "inputs": module.get_input_patterns(),
+            "outputs": module.get_output_patterns(),
+        }
+        return hashlib.sha256(
+            json.dumps(data, sort_keys=True, default=repr).encode(),
+        ).hexdigest()
+
+    def _expand(self, rootdir: Path, patterns: list[str]) -> list[Path]:
+        """
+        Returns files matching glob patterns relative to the rootdir,
+        a matched directory is expanded to all files within it.
+        """
+        paths: set[Path] = set()
+        for pattern in patterns:
+            if Path(pattern).is_absolute():
+                raise UnsupportedError(
+                    title="absolute incremental path pattern",
+                    value=pattern,
+                )
+            for path in rootdir.glob(pattern):
+                if path.is_dir():
+                    paths.update(p for p in path.rglob("*") if p.is_file())
+                elif path.is_file():
+                    paths.add(path)
+        return sorted(paths)
+
+    def _get_stamps(
+        self,
+        rootdir: Path,
+        paths: list[Path],
+    ) -> dict[str, list[Any]]:
+        stamps: dict[str, list[Any]] = {}
+        for path in paths:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            stamps[str(path.relative_to(rootdir))] = \
+                [stat.st_mtime_ns, stat.st_size]
+        return stamps
+
+    def _get_input_entries(
+        self,
+        rootdir: Path,
+        paths: list[Path],
+        recorded_inputs: dict[str, list[Any]],
+    ) -> dict[str, list[Any]]:
+        """
+        Returns stamps with content hashes of input files. Hashes of files
+        with unchanged stamps are taken from recorded entries.
+        """
+        entries: dict[str, list[Any]] = {}
+        for pathstr, stamp in self._get_stamps(rootdir, paths).items():
+            recorded_entry: list[Any] | None = recorded_inputs.get(pathstr)
+            if recorded_entry is not None and recorded_entry[:2] == stamp:
+                entries[pathstr] = recorded_entry
+                continue
+            with Path(rootdir, pathstr).open("rb") as f:
+                entries[pathstr] = [
+                    *stamp,
+                    hashlib.file_digest(f, "sha256").hexdigest(),
+                ]
+        return entries
@@ -0,0 +1,130 @@
+import asyncio
+from collections.abc import Callable
+
+from antievil import UnsupportedError
+
+from clyjin.base.plugin import Plugin
+from clyjin.base.plugininitializedata import PluginInitializeData
+from clyjin.core.profiler import StartupProfiler
+from clyjin.log import Log
+
+
+class PluginInitializer:
+    """
+    Initializes Plugins with their dependencies, each Plugin only once.
+
+    A Plugin is initialized once all its dependencies are initialized, and
+    Plugins independent from each other are initialized concurrently, so a
+    call waits for the longest chain of dependencies instead of the sum of
+    all initializations.
+
+    Initialization tasks are shared by concurrent calls, e.g. by calls of
+    a batch, and a Plugin failed to initialize is initialized again by the
+    next call requiring it.
+    """
+    def __init__(self) -> None:
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+
+    @staticmethod
+    def resolve(
+        PluginClass: type[Plugin],
+        get_plugin_class: Callable[[str], type[Plugin]],
+    ) -> list[type[Plugin]]:
+        """
+        Returns the Plugin with all its direct and indirect dependencies in
+        topological order, i.e. each Plugin follows its dependencies.
+
+        Args:
+            PluginClass:
+                Plugin to resolve dependencies of.
+            get_plugin_class:
+                Function returning a Plugin class by its name.
+
+        Raises:
+            UnsupportedError:
+                Dependencies have a cycle.
+        """
+        ordered: dict[str, type[Plugin]] = {}
+        # names of plugins on the current path of the depth-first search
+        path: list[str] = []
+
+        def visit(Visited: type[Plugin]) -> None:
+            name: str = Visited.get_name()
+            if name in ordered:
+                return
+            if name in path:
+                raise UnsupportedError(
+                    title="cycle of plugin dependencies",
+                    value=" -> ".join([*path[path.index(name):], name]),
+                )
+
+            path.append(name)
+            for dependency_name in Visited.get_dependencies():
+                visit(get_plugin_class(dependency_name))
+            path.pop()
+            ordered[name] = Visited
+
+        visit(PluginClass)
+        return list(ordered.values())
+
+    async def initialize(
+        self,
+        PluginClasses: list[type[Plugin]],
+        data: PluginInitializeData,
+    ) -> None:
+        """
+        Initializes not yet initialized Plugins and waits until all given
+        Plugins are initialized.
+
+        Args:
+            PluginClasses:
+                Plugins in topological order, as returned by `resolve()`.
+            data:
+                Data of the call to initialize Plugins with.
+        """
+        # tasks are collected before any of them is started, so a task
+        # removed on failure is still awaited by its dependents
+        tasks: dict[str, asyncio.Task[None]] = {}
+        for PluginClass in PluginClasses:
+            name: str = PluginClass.get_name()
+            if name not in self._tasks:
+                # tasks are shared by concurrent calls, so they're not owned
+                # by a call, and a failure or a cancellation of one call
+                # doesn't cancel plugins awaited by others
+                self._tasks[name] = asyncio.create_task(
+                    self._initialize_plugin(PluginClass, data, tasks),
+                )
+            tasks[name] = self._tasks[name]
+
+        # raises the first error, while other plugins are still initialized
+        # for calls awaiting them
+        await asyncio.gather(*(asyncio.shield(t) for t in tasks.values()))
+
+    async def _initialize_plugin(
+        self,
+        PluginClass: type[Plugin],
+        data: PluginInitializeData,
+        tasks: dict[str, asyncio.Task[None]],
+    ) -> None:
+        name: str = PluginClass.get_name()
+        try:
+            await asyncio.gather(*(
+                asyncio.shield(tasks[dependency_name])
+                for dependency_name in PluginClass.get_dependencies()
+            ))
+
+            Log.opt(lazy=True).info(
+                "[core] initializing plugin <{}>",
+                PluginClass.get_str,
+            )
+            with StartupProfiler.measure(f"plugin <{name}> initialization"):
+                await PluginClass.initialize(data)
+            Log.opt(lazy=True).info(
+                "[core] initialized plugin <{}>",
+                PluginClass.get_str,
+            )
+        except BaseException:
+            # failed plugins are initialized again by the next call
+            if self._tasks.get(name) is asyncio.current_task():
+                del self._tasks[name]
+            raise
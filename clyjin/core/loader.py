@@ -0,0 +1,310 @@
+import importlib
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from antievil import (
+    DuplicateNameError,
+    NotFoundError,
+    PleaseDefineError,
+    TypeExpectError,
+    UnsupportedError,
+)
+
+import clyjin
+from clyjin.base.errors import DuplicateRootModulePluginError
+from clyjin.base.plugin import Plugin
+from clyjin.core.bundle import Bundler
+from clyjin.core.cli.prescanner import PrescannedArgs
+from clyjin.core.cli.schema import CLISchema, PluginSpec
+from clyjin.core.discovery import PluginDiscovery
+from clyjin.core.profiler import StartupProfiler
+from clyjin.core.registry import Registry
+from clyjin.log import Log
+
+if TYPE_CHECKING:
+    from types import ModuleType as PyModuleType
+
+# path reported for plugins of a bundle
+BundlePathstr: str = "<bundle>"
+
+
+class PluginLoader:
+    """
+    Imports plugins found by the discovery and provides their CLI specs.
+
+    Attributes:
+        sysdir:
+            System directory to keep discovery index and schema cache at.
+        BuiltinPlugins:
+            Plugins registered without discovery, e.g. Core Plugin.
+    """
+    def __init__(
+        self,
+        sysdir: Path,
+        BuiltinPlugins: list[type[Plugin]],
+    ) -> None:
+        self._BuiltinPlugins: list[type[Plugin]] = BuiltinPlugins
+        self._registry: Registry = Registry()
+        # Python module names of registered plugins by plugin names
+        self._python_module_names: dict[str, str] = {}
+        self._loaded_python_module_names: set[str] = set()
+        # specs of not imported plugins, which are used for the help
+        self._cached_plugin_specs: list[PluginSpec] = []
+
+        self._discovery: PluginDiscovery = PluginDiscovery.from_sysdir(sysdir)
+        self._schema: CLISchema = CLISchema.from_sysdir(
+            sysdir,
+            clyjin.__version__,
+        )
+        self._found_names: list[tuple[str, str]] | None = None
+        # plugins of a bundle are resolved on build, so the discovery isn't
+        # used
+        self._bundled_module_names: dict[str, str] | None = \
+            Bundler.get_bundled_module_names()
+
+        for PluginClass in self._BuiltinPlugins:
+            # builtin plugins are expected to be valid, so registration
+            # errors are not caught
+            self._register(PluginClass, PluginClass.__module__.split(".")[0])
+            Log.opt(lazy=True).info(
+                "[core] loaded builtin plugin <{}>",
+                PluginClass.get_str,
+            )
+
+    @property
+    def registry(self) -> Registry:
+        return self._registry
+
+    def get_plugin_specs(self) -> list[PluginSpec]:
+        """
+        Returns CLI specs of all registered plugins followed by specs of
+        plugins, which are found but not imported.
+        """
+        return [
+            *(
+                self._schema.get_plugin_spec(
+                    PluginClass,
+                    self._python_module_names[PluginClass.get_name()],
+                )
+                for PluginClass in self._registry.PluginClasses
+            ),
+            *(
+                spec
+                for spec in self._cached_plugin_specs
+                if not self.is_registered(spec.name)
+            ),
+        ]
+
+    def get_python_module_name(self, plugin_name: str) -> str:
+        """
+        Returns name of the Python module providing the registered Plugin.
+        """
+        return self._python_module_names[plugin_name]
+
+    def load(self, prescanned_args: PrescannedArgs) -> None:
+        """
+        Imports plugins required for the input.
+
+        If the called plugin is known from the discovery manifests, only
+        this plugin is imported. For the top-level help, specs of found
+        plugins are taken from the schema cache if every plugin has one.
+        Otherwise, e.g. for a plugin name not met before, all found plugins
+        are imported.
+        """
+        plugin_name: str | None = prescanned_args.plugin_name
+
+        if prescanned_args.is_help or plugin_name is None:
+            if self._load_cached_plugin_specs():
+                return
+        elif self._load_by_manifest(plugin_name):
+            return
+
+        self.load_all()
+
+    def require(self, plugin_name: str) -> type[Plugin]:
+        """
+        Returns registered Plugin class by the name, importing the Plugin if
+        it is not registered yet, e.g. for a dependency of another Plugin.
+
+        Raises:
+            NotFoundError:
+                No such plugin is found.
+        """
+        if not self._load_by_manifest(plugin_name):
+            self.load_all()
+        for PluginClass in self._registry.PluginClasses:
+            if PluginClass.get_name() == plugin_name:
+                return PluginClass
+        raise NotFoundError(
+            title="plugin with name",
+            value=plugin_name,
+        )
+
+    def load_all(self) -> None:
+        self._cached_plugin_specs = []
+        self._load_found_plugins(self._get_found_names())
+
+    def is_outdated(self) -> bool:
+        """
+        Checks whether found plugins or allow and deny lists may have changed
+        since plugins were found, e.g. a plugin is installed or the index is
+        rebuilt while the resident server runs, so a new loader should be
+        used.
+        """
+        if self._bundled_module_names is not None or self._found_names is None:
+            return False
+        if self._discovery.is_index_changed():
+            return True
+        return self._discovery.get_names() != self._found_names
+
+    def is_registered(self, plugin_name: str) -> bool:
+        return self._registry.has_plugin(plugin_name)
+
+    def save(self) -> None:
+        self._discovery.save()
+        self._schema.save()
+
+    def _load_by_manifest(self, plugin_name: str) -> bool:
+        """
+        Imports the plugin if it is known from the discovery manifests.
+
+        Returns:
+            Whether the plugin is registered.
+        """
+        if self.is_registered(plugin_name):
+            return True
+
+        name: str | None = \
+            self._discovery.get_manifest_module_name(
+                plugin_name,
+                self._get_found_names(),
+            ) \
+            if self._bundled_module_names is None \
+            else self._bundled_module_names.get(plugin_name)
+        if name is None:
+            return False
+
+        Log.info(
+            "[core] plugin <{}> is provided by Python module <{}> according"
+            " to manifest",
+            plugin_name,
+            name,
+        )
+        self._load_found_plugins(
+            [n for n in self._get_found_names() if n[0] == name],
+        )
+        if self.is_registered(plugin_name):
+            return True
+        Log.warning(
+            "[core] outdated manifest for plugin <{}>: load all plugins",
+            plugin_name,
+        )
+        return False
+
+    def _get_found_names(self) -> list[tuple[str, str]]:
+        if self._found_names is not None:
+            return self._found_names
+
+        if self._bundled_module_names is not None:
+            self._found_names = [
+                (name, BundlePathstr)
+                for name in self._bundled_module_names.values()
+            ]
+        else:
+            with StartupProfiler.measure("discovery"):
+                self._found_names = self._discovery.get_names()
+        return self._found_names
+
+    def _load_cached_plugin_specs(self) -> bool:
+        """
+        Fills specs of not imported plugins from the schema cache.
+
+        Cached specs are used only if all found plugins have a manifest,
+        i.e. no plugins have been installed or removed since they were
+        cached.
+        """
+        specs: list[PluginSpec] = []
+        for name, pathstr in self._get_found_names():
+            if name in self._loaded_python_module_names:
+                continue
+
+            spec: PluginSpec | None = \
+                None \
+                if (
+                    self._bundled_module_names is None
+                    and self._discovery.get_manifest(name, pathstr) is None
+                ) \
+                else self._schema.get_cached_plugin_spec(name)
+            if spec is None:
+                return False
+            specs.append(spec)
+
+        self._cached_plugin_specs = specs
+        return True
+
+    def _load_found_plugins(self, names: list[tuple[str, str]]) -> None:
+        for name, pathstr in names:
+            if name in self._loaded_python_module_names:
+                continue
+            self._loaded_python_module_names.add(name)
+
+            Log.info("[core] found Python module <{}> at <{}>", name, pathstr)
+
+            try:
+                with StartupProfiler.measure(f"import <{name}>"):
+                    LoadedPlugin: type[Plugin] = self._load_plugin(name)
+                self._register(LoadedPlugin, name)
+            except (
+                NotFoundError,
+                TypeExpectError,
+                PleaseDefineError,
+                DuplicateNameError,
+                DuplicateRootModulePluginError,
+                UnsupportedError,
+            ) as error:
+                Log.error(
+                    "[core] failed to load plugin <{}>: error=<{}>",
+                    name,
+                    error,
+                )
+                continue
+
+            self._discovery.set_manifest(
+                name=name,
+                pathstr=pathstr,
+                plugin_name=LoadedPlugin.get_name(),
+                module_names=[
+                    ModuleClass.cls_get_name()
+                    for ModuleClass in LoadedPlugin.get_module_classes()
+                ],
+            )
+            Log.opt(lazy=True).info(
+                "[core] loaded plugin <{}>",
+                LoadedPlugin.get_str,
+            )
+
+    def _register(self, PluginClass: type[Plugin], name: str) -> None:
+        self._registry.register(PluginClass)
+        self._python_module_names[PluginClass.get_name()] = name
+
+    def _load_plugin(self, name: str) -> type[Plugin]:
+        imported_module: PyModuleType = importlib.import_module(name)
+        try:
+            # MainPlugin variable is searched by default, maybe later it might
+            # be configurable
+            ImportedMainPlugin: type[Plugin] = imported_module.MainPlugin
+        except AttributeError as error:
+            raise NotFoundError(
+                title="MainPlugin attribute of imported module",
+                value=imported_module,
+            ) from error
+
+        if not issubclass(ImportedMainPlugin, Plugin):
+            raise TypeExpectError(
+                obj=ImportedMainPlugin,
+                ExpectedType=Plugin,
+                expected_inheritance="instance",
+                ActualType=type(ImportedMainPlugin),
+            )
+
+        return ImportedMainPlugin
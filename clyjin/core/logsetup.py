@@ -0,0 +1,85 @@
+import contextlib
+import sys
+
+from antievil import UnsupportedError
+
+from clyjin.log import Log
+
+
+class LogSetup:
+    """
+    Configures the Log's sink for a Clyjin process.
+
+    The level is chosen by the `-v` count: warnings and errors are written by
+    default, `-v` adds info messages and `-vv` adds debug ones. Since
+    messages are formatted only if they pass the level, the core logs values
+    as args instead of f-strings, e.g. `Log.info("[core] x <{}>", x)`.
+
+    Records are written to the current stderr, so output of batch calls is
+    routed as the rest of their stderr. An enqueued sink writes records from
+    a background thread instead, so a module logging much doesn't block the
+    event loop on stderr. The thread writes to the process' stderr, since
+    routing is bound to the context emitting a record, so the Boot doesn't
+    enqueue records of batches and of calls executed by the server.
+
+    Attributes:
+        verbosity_level(optional):
+            How many times `-v` is given. Defaults to 0.
+        format(optional):
+            `text` for human-readable records or `json` for a JSON object per
+            record. Defaults to `text`.
+        is_enqueued(optional):
+            Whether records are written by a background thread. Defaults to
+            False.
+    """
+    Formats: list[str] = ["text", "json"]
+    Levels: list[str] = ["WARNING", "INFO", "DEBUG"]
+
+    # the sink added by the last applied setup, replaced by the next one
+    _HandlerId: int | None = None
+
+    def __init__(
+        self,
+        verbosity_level: int = 0,
+        format: str = "text",
+        *,
+        is_enqueued: bool = False,
+    ) -> None:
+        if format not in self.Formats:
+            raise UnsupportedError(
+                title="log format",
+                value=format,
+            )
+        self._verbosity_level: int = verbosity_level
+        self._format: str = format
+        self._is_enqueued: bool = is_enqueued
+
+    @property
+    def level(self) -> str:
+        return self.Levels[min(self._verbosity_level, len(self.Levels) - 1)]
+
+    def apply(self) -> None:
+        """
+        Replaces sinks of the Log by the configured one.
+        """
+        if LogSetup._HandlerId is None:
+            # the default sink of loguru is removed on the first setup
+            Log.remove()
+        else:
+            # the sink could be already removed outside
+            with contextlib.suppress(ValueError):
+                Log.remove(LogSetup._HandlerId)
+
+        LogSetup._HandlerId = Log.add(
+            self._write,
+            level=self.level,
+            serialize=self._format == "json",
+            enqueue=self._is_enqueued,
+            colorize=self._format == "text" and sys.stderr.isatty(),
+        )
+
+    @staticmethod
+    def _write(message: str) -> None:
+        # stderr is resolved on each write, since it can be replaced after
+        # the setup
+        sys.stderr.write(message)
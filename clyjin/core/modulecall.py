@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+from clyjin.base.module import Module
+from clyjin.base.plugin import Plugin
+from clyjin.base.plugininitializedata import PluginInitializeData
+
+
+@dataclass(frozen=True, slots=True)
+class ModuleCallPaths:
+    """
+    Paths resolved by the Boot for a Module call.
+    """
+    sysdir: Path
+    config_path: Path
+    plugin_sysdir: Path
+    plugin_common_sysdir: Path
+    module_sysdir: Path
+
+
+@dataclass(frozen=True, slots=True)
+class ModuleCall:
+    """
+    Module prepared by the Boot for execution.
+
+    Attributes:
+        PluginClass:
+            Plugin Class of the called Module.
+        module:
+            Instance of the called Module.
+        plugin_initialize_data:
+            Data to initialize the Plugin with.
+        paths:
+            Paths resolved for the call.
+        RequiredPluginClasses:
+            Called Plugin with its dependencies in order of their
+            initialization.
+    """
+    PluginClass: type[Plugin]
+    module: Module
+    plugin_initialize_data: PluginInitializeData
+    paths: ModuleCallPaths
+    RequiredPluginClasses: list[type[Plugin]]
@@ -0,0 +1,157 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+from antievil import UnsupportedError
+
+from clyjin.core.modulecall import ModuleCall
+from clyjin.log import Log
+
+# marks the end of a stage's items within a queue
+_End: object = object()
+
+
+class Pipeline:
+    """
+    Module calls connected by streams of Python objects, executed within one
+    process.
+
+    Calls are separated by the `--` arg followed by the `|` arg, which should
+    be quoted for the shell, e.g. `clyjin a.x --value 1 -- '|' b.y`. The
+    `--` prefix keeps `|` usable as a usual value, e.g. `--sep '|'`. Common
+    args given before the first module name, such as `--sysdir`, apply to
+    all calls.
+
+    Each Module is a stage receiving items yielded by the previous stage's
+    `Module.stream()`. Stages are connected by bounded queues, so a fast
+    producer waits for a slow consumer. Items of the last stage are written
+    to the last Module's output.
+
+    Once a stage is finished, previous stages still running are cancelled,
+    and an error in any stage cancels the whole pipeline.
+
+    Attributes:
+        calls:
+            Calls of the pipeline in the input order.
+        queue_size(optional):
+            How many items can wait for a consumer between two stages.
+            Defaults to 64.
+    """
+    # args separating calls, in this order
+    Separator: list[str] = ["--", "|"]
+    DefaultQueueSize: int = 64
+
+    def __init__(
+        self,
+        calls: list[ModuleCall],
+        queue_size: int = DefaultQueueSize,
+    ) -> None:
+        if queue_size < 1:
+            raise UnsupportedError(
+                title="pipeline queue size",
+                value=queue_size,
+            )
+        self._calls: list[ModuleCall] = calls
+        self._queue_size: int = queue_size
+
+    @property
+    def calls(self) -> list[ModuleCall]:
+        return self._calls
+
+    @classmethod
+    def is_pipeline(cls, args: list[str]) -> bool:
+        return any(
+            args[i:i + len(cls.Separator)] == cls.Separator
+            for i in range(len(args))
+        )
+
+    @classmethod
+    def split(cls, args: list[str]) -> list[list[str]]:
+        """
+        Splits args of the whole pipeline to args of separate calls.
+
+        Raises:
+            UnsupportedError:
+                Some call has no args.
+        """
+        segments: list[list[str]] = [[]]
+        i: int = 0
+        while i < len(args):
+            if args[i:i + len(cls.Separator)] == cls.Separator:
+                segments.append([])
+                i += len(cls.Separator)
+            else:
+                segments[-1].append(args[i])
+                i += 1
+
+        for segment in segments:
+            if not segment:
+                raise UnsupportedError(
+                    title="empty pipeline call in args",
+                    value=args,
+                )
+        return segments
+
+    async def run(self) -> None:
+        queues: list[asyncio.Queue[Any]] = [
+            asyncio.Queue(maxsize=self._queue_size)
+            for _ in range(len(self._calls) - 1)
+        ]
+        tasks: list[asyncio.Task[None]] = [
+            asyncio.create_task(self._run_stage(
+                call,
+                queues[index - 1] if index > 0 else None,
+                queues[index] if index < len(queues) else None,
+            ))
+            for index, call in enumerate(self._calls)
+        ]
+
+        try:
+            pending: set[asyncio.Task[None]] = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    # raises an error of the stage
+                    task.result()
+                    # previous stages have nobody to consume their items
+                    for previous_task in tasks[:tasks.index(task)]:
+                        previous_task.cancel()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_stage(
+        self,
+        call: ModuleCall,
+        input_queue: asyncio.Queue[Any] | None,
+        output_queue: asyncio.Queue[Any] | None,
+    ) -> None:
+        Log.info("[core.pipeline] streaming module <{}>", call.module)
+        items: AsyncIterator[Any] = self._iterate(input_queue)
+        async for item in call.module.stream(items):
+            if output_queue is None:
+                call.module.output.write(item)
+            else:
+                await output_queue.put(item)
+
+        if output_queue is not None:
+            await output_queue.put(_End)
+        Log.info("[core.pipeline] streamed module <{}>", call.module)
+
+    async def _iterate(
+        self,
+        queue: asyncio.Queue[Any] | None,
+    ) -> AsyncIterator[Any]:
+        if queue is None:
+            return
+        while True:
+            item: Any = await queue.get()
+            if item is _End:
+                return
+            yield item
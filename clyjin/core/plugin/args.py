@@ -1,5 +1,36 @@
-from clyjin.base.moduleargs import ModuleArgs
+from pathlib import Path
+
+from clyjin.base.moduleargs import ModuleArg, ModuleArgs
+
+
+class BundleCoreArgs(ModuleArgs):
+    path: ModuleArg[Path]
+    plugins: ModuleArg[list]
+    interpreter: ModuleArg[str]
+
+
+class CacheCoreArgs(ModuleArgs):
+    action: ModuleArg[str]
+    max_size: ModuleArg[int]
+
+
+class CompletionCoreArgs(ModuleArgs):
+    shell: ModuleArg[str]
 
 
 class ConfiguratorCoreArgs(ModuleArgs):
     pass
+
+
+class ReindexCoreArgs(ModuleArgs):
+    allow: ModuleArg[list]
+    deny: ModuleArg[list]
+    reset_filters: ModuleArg[bool]
+
+
+class SchemaCoreArgs(ModuleArgs):
+    json: ModuleArg[bool]
+
+
+class ServeCoreArgs(ModuleArgs):
+    socket: ModuleArg[Path]
@@ -1,6 +1,30 @@
+from pathlib import Path
+
+from antievil import UnsetValueError
+
+import clyjin
 from clyjin.base.config import Config
 from clyjin.base.module import Module
-from clyjin.core.plugin.args import ConfiguratorCoreArgs
+from clyjin.base.moduleargs import ModuleArg
+from clyjin.base.plugin import Plugin
+from clyjin.core.bundle import Bundler
+from clyjin.core.cache import CacheStats, ExecutionCache
+from clyjin.core.cli.generator import CLIGenerator
+from clyjin.core.cli.schema import CLISchema, PluginSpec
+from clyjin.core.client import Client
+from clyjin.core.completion import Completer
+from clyjin.core.discovery import PluginDiscovery
+from clyjin.core.initializer import PluginInitializer
+from clyjin.core.loader import PluginLoader
+from clyjin.core.plugin.args import (
+    BundleCoreArgs,
+    CacheCoreArgs,
+    CompletionCoreArgs,
+    ConfiguratorCoreArgs,
+    ReindexCoreArgs,
+    SchemaCoreArgs,
+    ServeCoreArgs,
+)
 from clyjin.log import Log
 
 
@@ -12,3 +36,269 @@ class ConfiguratorModule(Module[ConfiguratorCoreArgs, Config]):
 
     async def execute(self) -> None:
         Log.info("[core.configurator] Hello!")
+
+
+class BundleModule(Module[BundleCoreArgs, Config]):
+    Name = "bundle"
+    Description = "build single-file bundle of clyjin and installed plugins"
+    Args = BundleCoreArgs(
+        path=ModuleArg[Path](
+            names=["path"],
+            type=Path,
+            help="file to write the bundle to, e.g. `clyjin.pyz`",
+        ),
+        plugins=ModuleArg[list](
+            names=["--plugins"],
+            type=list,
+            argparse_type=str,
+            nargs="+",
+            default=[],
+            help="names of plugins to bundle along with their dependencies."
+                " Defaults to all installed plugins",
+        ),
+        interpreter=ModuleArg[str](
+            names=["--interpreter"],
+            type=str,
+            default=Bundler.DefaultInterpreter,
+            help="interpreter for the bundle's shebang line. Defaults to"
+                f" `{Bundler.DefaultInterpreter}`",
+        ),
+    )
+
+    async def execute(self) -> None:
+        loader: PluginLoader = PluginLoader(
+            self._sysdir,
+            [self._ParentPlugin],
+        )
+        loader.load_all()
+        loader.save()
+
+        plugin_names: list[str] = \
+            [name.strip().lower() for name in self.args.plugins.value] \
+            or [P.get_name() for P in loader.registry.PluginClasses]
+        python_module_names: dict[str, str] = {}
+        for plugin_name in plugin_names:
+            for PluginClass in PluginInitializer.resolve(
+                loader.require(plugin_name),
+                loader.require,
+            ):
+                python_module_name: str = loader.get_python_module_name(
+                    PluginClass.get_name(),
+                )
+                # builtin plugins are bundled with clyjin itself
+                if python_module_name != "clyjin":
+                    python_module_names[PluginClass.get_name()] = \
+                        python_module_name
+
+        path: Path = Path(self._rootdir, self.args.path.value)
+        files_count: int = Bundler(
+            python_module_names,
+            self.args.interpreter.value,
+        ).build(path)
+        print(  # noqa: T201
+            f"bundled {files_count} files of plugins"
+            f" {sorted(python_module_names)} to {path}",
+        )
+
+
+class CacheModule(Module[CacheCoreArgs, Config]):
+    Name = "cache"
+    Description = "manage cached results of module executions"
+    Args = CacheCoreArgs(
+        action=ModuleArg[str](
+            names=["action"],
+            type=str,
+            choices=["stats", "prune", "clear"],
+            help="show cache stats, evict least recently used results or"
+                " delete all results",
+        ),
+        max_size=ModuleArg[int](
+            names=["--max-size"],
+            type=int,
+            help="size in bytes to prune the cache to. Defaults to the"
+                " cache's max size",
+        ),
+    )
+
+    async def execute(self) -> None:
+        cache: ExecutionCache = ExecutionCache.from_sysdir(self._sysdir)
+        try:
+            if self.args.action.value == "prune":
+                try:
+                    max_size: int | None = self.args.max_size.value
+                except UnsetValueError:
+                    max_size = None
+                print(  # noqa: T201
+                    f"evicted {await cache.prune(max_size)} entries",
+                )
+            elif self.args.action.value == "clear":
+                print(f"deleted {await cache.clear()} entries")  # noqa: T201
+
+            stats: CacheStats = await cache.get_stats()
+            print(  # noqa: T201
+                f"entries {stats.entries}\n"
+                f"size {stats.size}\n"
+                f"max_size {stats.max_size}",
+            )
+        finally:
+            cache.close()
+
+
+class CompletionModule(Module[CompletionCoreArgs, Config]):
+    Name = "completion"
+    Description = "print shell completion script"
+    Args = CompletionCoreArgs(
+        shell=ModuleArg[str](
+            names=["shell"],
+            type=str,
+            choices=Completer.Shells,
+            help="shell to print the script for",
+        ),
+    )
+
+    async def execute(self) -> None:
+        _update_completion_index(self._sysdir, self._ParentPlugin)
+        print(  # noqa: T201
+            Completer.get_script(self.args.shell.value),
+            end="",
+        )
+
+
+class ReindexModule(Module[ReindexCoreArgs, Config]):
+    Name = "reindex"
+    Description = "rebuild index of installed plugins"
+    Args = ReindexCoreArgs(
+        allow=ModuleArg[list](
+            names=["--allow"],
+            type=list,
+            argparse_type=str,
+            nargs="+",
+            default=[],
+            help="load only plugins with given names",
+        ),
+        deny=ModuleArg[list](
+            names=["--deny"],
+            type=list,
+            argparse_type=str,
+            nargs="+",
+            default=[],
+            help="never load plugins with given names",
+        ),
+        reset_filters=ModuleArg[bool](
+            names=["--reset-filters"],
+            action="store_true",
+            type=bool,
+            argparse_type=type,
+            default=False,
+            help="clear allow and deny lists",
+        ),
+    )
+
+    async def execute(self) -> None:
+        discovery: PluginDiscovery = PluginDiscovery.from_sysdir(
+            self._sysdir,
+        )
+
+        if self.args.reset_filters.value:
+            discovery.set_filters(allow=None, deny=[])
+        if self.args.allow.value or self.args.deny.value:
+            discovery.set_filters(
+                allow=self.args.allow.value or discovery.allow,
+                deny=self.args.deny.value or discovery.deny,
+            )
+
+        names: list[tuple[str, str]] = discovery.get_names(is_rebuild=True)
+        for name, pathstr in names:
+            print(f"{name} {pathstr}")  # noqa: T201
+        Log.info(
+            "[core.reindex] indexed <{}> plugin modules, allow=<{}>,"
+            " deny=<{}>",
+            len(names),
+            discovery.allow,
+            discovery.deny,
+        )
+
+        # installed plugins could change, so completion is updated as well
+        _update_completion_index(self._sysdir, self._ParentPlugin)
+
+
+class SchemaModule(Module[SchemaCoreArgs, Config]):
+    Name = "schema"
+    Description = "show CLI schema of installed plugins"
+    Args = SchemaCoreArgs(
+        json=ModuleArg[bool](
+            names=["--json"],
+            action="store_true",
+            type=bool,
+            argparse_type=type,
+            default=False,
+            help="print schema in JSON format",
+        ),
+    )
+
+    async def execute(self) -> None:
+        loader: PluginLoader = PluginLoader(
+            self._sysdir,
+            [self._ParentPlugin],
+        )
+        loader.load_all()
+        plugin_specs: list[PluginSpec] = loader.get_plugin_specs()
+        loader.save()
+
+        if self.args.json.value:
+            print(CLISchema.dump_json(  # noqa: T201
+                plugin_specs,
+                clyjin.__version__,
+            ))
+            return
+
+        for plugin_spec in plugin_specs:
+            print(f"{plugin_spec.name} {plugin_spec.version}")  # noqa: T201
+            for module_spec in plugin_spec.modules:
+                arg_names: str = " ".join(
+                    "/".join(arg_spec.names) for arg_spec in module_spec.args
+                )
+                print(  # noqa: T201
+                    f"  {module_spec.namespaced_name} {arg_names}".rstrip(),
+                )
+
+
+class ServeModule(Module[ServeCoreArgs, Config]):
+    Name = "serve"
+    Description = "run resident server executing calls of clyjin clients"
+    Args = ServeCoreArgs(
+        socket=ModuleArg[Path](
+            names=["--socket"],
+            type=Path,
+            help="path to Unix socket to listen at."
+                " Defaults to `server.sock` in the sysdir",
+        ),
+    )
+
+    async def execute(self) -> None:
+        # the server is imported here since it depends on the boot, which
+        # imports the core plugin with this module
+        from clyjin.core.server import Server
+
+        try:
+            socket_path: Path = self.args.socket.value
+        except UnsetValueError:
+            socket_path = Client.get_socket_path(self._sysdir)
+
+        await Server(socket_path).serve()
+
+
+def _update_completion_index(sysdir: Path, CorePlugin: type[Plugin]) -> None:
+    loader: PluginLoader = PluginLoader(sysdir, [CorePlugin])
+    loader.load_all()
+    plugin_specs: list[PluginSpec] = loader.get_plugin_specs()
+    loader.save()
+
+    Completer.write_index(
+        sysdir,
+        CLIGenerator().get_completion_index(plugin_specs),
+    )
+    Log.info(
+        "[core] updated completion index for <{}> plugins",
+        len(plugin_specs),
+    )
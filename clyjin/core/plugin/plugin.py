@@ -1,18 +1,31 @@
-import importlib.metadata
-
 import clyjin
 from clyjin.base.plugin import Plugin
-from clyjin.core.plugin.modules import ConfiguratorModule
+from clyjin.core.plugin.modules import (
+    BundleModule,
+    CacheModule,
+    CompletionModule,
+    ConfiguratorModule,
+    ReindexModule,
+    SchemaModule,
+    ServeModule,
+)
 
 
 class CorePlugin(Plugin):
     Name = "core"
     ModuleClasses = [
+        BundleModule,
+        CacheModule,
+        CompletionModule,
         ConfiguratorModule,
+        ReindexModule,
+        SchemaModule,
+        ServeModule,
     ]
-    Version = importlib.metadata.version("clyjin")
 
     @classmethod
     def get_version(cls) -> str | None:
-        cls.Version = clyjin.__version__
+        # resolved on demand, since the version lookup is costly at import
+        if cls.Version is None:
+            cls.Version = clyjin.__version__
         return super().get_version()
@@ -0,0 +1,142 @@
+import contextlib
+import json
+import sys
+import time
+from collections.abc import Iterator
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TextIO
+
+
+@dataclass(frozen=True, slots=True)
+class ProfilePhase:
+    """
+    Measured phase of a Clyjin call.
+
+    Attributes:
+        name:
+            Name of the phase, e.g. `import <clyjin_templates>`.
+        path:
+            Names of enclosing phases and of this phase joined by ` / `.
+        start_ms:
+            When the phase has started, relatively to the profiler's start.
+        duration_ms:
+            How long the phase has taken.
+    """
+    name: str
+    path: str
+    start_ms: float
+    duration_ms: float
+
+
+_CurrentProfiler: ContextVar["StartupProfiler | None"] = ContextVar(
+    "clyjin_profiler",
+    default=None,
+)
+# names of phases enclosing the current one, kept per context, so phases of
+# concurrent batch calls don't mix up
+_CurrentPhasePath: ContextVar[tuple[str, ...]] = ContextVar(
+    "clyjin_profiler_phase_path",
+    default=(),
+)
+
+
+class StartupProfiler:
+    """
+    Records monotonic timings of startup phases.
+
+    Phases are measured with `StartupProfiler.measure()` anywhere in the
+    core, which does nothing unless a profiler is activated for the current
+    context.
+    """
+    EnvVar: str = "CLYJIN_PROFILE_STARTUP"
+    JsonEnvVar: str = "CLYJIN_PROFILE_STARTUP_JSON"
+
+    def __init__(self) -> None:
+        self._started_ns: int = time.perf_counter_ns()
+        self._phases: list[ProfilePhase] = []
+
+    @property
+    def phases(self) -> list[ProfilePhase]:
+        """
+        Finished phases in order of their start.
+        """
+        return sorted(self._phases, key=lambda p: p.start_ms)
+
+    @property
+    def total_ms(self) -> float:
+        return self._get_ms(time.perf_counter_ns() - self._started_ns)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def measure(name: str) -> Iterator[None]:
+        """
+        Measures the phase with the profiler of the current context, if any.
+        """
+        profiler: StartupProfiler | None = _CurrentProfiler.get()
+        if profiler is None:
+            yield
+            return
+        with profiler.phase(name):
+            yield
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator[None]:
+        token = _CurrentProfiler.set(self)
+        try:
+            yield
+        finally:
+            _CurrentProfiler.reset(token)
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        names: tuple[str, ...] = (*_CurrentPhasePath.get(), name)
+        token = _CurrentPhasePath.set(names)
+        started_ns: int = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            finished_ns: int = time.perf_counter_ns()
+            _CurrentPhasePath.reset(token)
+            self._phases.append(ProfilePhase(
+                name=name,
+                path=" / ".join(names),
+                start_ms=self._get_ms(started_ns - self._started_ns),
+                duration_ms=self._get_ms(finished_ns - started_ns),
+            ))
+
+    def write_summary(self, stream: TextIO | None = None) -> None:
+        """
+        Writes phases sorted by duration, stderr is used by default.
+        """
+        stream = sys.stderr if stream is None else stream
+        total_ms: float = self.total_ms
+
+        lines: list[str] = [f"startup profile: total {total_ms:.1f} ms"]
+        for phase in sorted(
+            self._phases,
+            key=lambda p: p.duration_ms,
+            reverse=True,
+        ):
+            percent: float = \
+                phase.duration_ms / total_ms * 100 if total_ms else 0
+            lines.append(
+                f"{phase.duration_ms:10.1f} ms {percent:5.1f}%  {phase.path}",
+            )
+        stream.write("\n".join(lines) + "\n")
+
+    def dump_json(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as f:
+            json.dump(
+                {
+                    "total_ms": self.total_ms,
+                    "phases": [asdict(phase) for phase in self.phases],
+                },
+                f,
+                indent=2,
+            )
+
+    def _get_ms(self, ns: int) -> float:
+        return round(ns / 1_000_000, 3)
@@ -0,0 +1,109 @@
+from antievil import DuplicateNameError, NotFoundError, UnsupportedError
+
+from clyjin.base.errors import DuplicateRootModulePluginError
+from clyjin.base.module import Module
+from clyjin.base.plugin import Plugin
+
+RootModuleName: str = "$root"
+
+
+class Registry:
+    """
+    Registered Plugins with their Modules available by namespaced names.
+
+    Names are validated once a Plugin is registered, so lookups are plain
+    dictionary accesses. A Module is available as `plugin.module`, a root
+    Module is available as `plugin` and `plugin.$root`.
+    """
+    def __init__(self) -> None:
+        self._PluginClasses: dict[str, type[Plugin]] = {}
+        self._ModuleClasses: dict[
+            str,
+            tuple[type[Plugin], type[Module]],
+        ] = {}
+
+    @property
+    def PluginClasses(self) -> list[type[Plugin]]:
+        """
+        Registered Plugin classes in order of their registration.
+        """
+        return list(self._PluginClasses.values())
+
+    def register(self, PluginClass: type[Plugin]) -> None:
+        """
+        Validates the Plugin and adds it with its Modules.
+
+        Nothing is added if the validation fails.
+
+        Raises:
+            DuplicateNameError:
+                Plugin's name is already registered, or the Plugin has
+                Modules with the same name.
+            DuplicateRootModulePluginError:
+                Plugin has several root Modules.
+            UnsupportedError:
+                Plugin's or Module's name contains a dot.
+        """
+        plugin_name: str = PluginClass.get_name()
+        if plugin_name in self._PluginClasses:
+            raise DuplicateNameError(title="plugin", name=plugin_name)
+        self._check_name_has_no_dots("plugin name", plugin_name)
+
+        entries: dict[str, tuple[type[Plugin], type[Module]]] = {}
+        RootModuleClass: type[Module] | None = None
+        for ModuleClass in PluginClass.get_module_classes():
+            module_name: str = ModuleClass.cls_get_name()
+            self._check_name_has_no_dots("module name", module_name)
+
+            if module_name == RootModuleName:
+                if RootModuleClass is not None:
+                    raise DuplicateRootModulePluginError(
+                        PluginClass=PluginClass,
+                        ModuleClass=ModuleClass,
+                    )
+                RootModuleClass = ModuleClass
+                entries[plugin_name] = (PluginClass, ModuleClass)
+
+            namespaced_name: str = f"{plugin_name}.{module_name}"
+            if namespaced_name in entries:
+                raise DuplicateNameError(
+                    title=f"module of plugin <{plugin_name}>",
+                    name=module_name,
+                )
+            entries[namespaced_name] = (PluginClass, ModuleClass)
+
+        self._PluginClasses[plugin_name] = PluginClass
+        self._ModuleClasses.update(entries)
+
+    def has_plugin(self, plugin_name: str) -> bool:
+        return plugin_name in self._PluginClasses
+
+    def get(self, namespaced_name: str) -> tuple[type[Plugin], type[Module]]:
+        """
+        Returns Plugin and Module classes by Module's namespaced name.
+
+        Raises:
+            NotFoundError:
+                No Module is registered under the name.
+            UnsupportedError:
+                The name has more than one separation dot.
+        """
+        try:
+            return self._ModuleClasses[namespaced_name]
+        except KeyError as error:
+            if namespaced_name.count(".") > 1:
+                raise UnsupportedError(
+                    title="more than one separation dot in input module name",
+                    value=namespaced_name,
+                ) from error
+            raise NotFoundError(
+                title="registered module for namespaced name",
+                value=namespaced_name,
+            ) from error
+
+    def _check_name_has_no_dots(self, title: str, name: str) -> None:
+        if "." in name:
+            raise UnsupportedError(
+                title=f"dot in {title}",
+                value=name,
+            )
@@ -0,0 +1,198 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from antievil import AlreadyEventError
+
+from clyjin.core.boot import Boot
+from clyjin.core.cli.prescanner import CLIPrescanner
+from clyjin.core.stdio import Stdio, StdioRouter
+from clyjin.log import Log
+
+
+class SocketStream(io.TextIOBase):
+    """
+    Text stream sending everything written to it to the client.
+
+    Attributes:
+        name:
+            Name of the stream the client should write the data to.
+        writer:
+            Writer of the client connection.
+    """
+    def __init__(self, name: str, writer: asyncio.StreamWriter) -> None:
+        super().__init__()
+        self._name: str = name
+        self._writer: asyncio.StreamWriter = writer
+        self._loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        self._loop_thread_id: int = threading.get_ident()
+
+    def write(self, s: str) -> int:
+        if not s:
+            return 0
+        # the client has gone, e.g. its stdout is piped to an exited
+        # process, so the rest of the output is dropped
+        if self._writer.is_closing():
+            return len(s)
+
+        message: bytes = (json.dumps({self._name: s}) + "\n").encode()
+        if threading.get_ident() == self._loop_thread_id:
+            self._writer.write(message)
+        else:
+            self._loop.call_soon_threadsafe(self._writer.write, message)
+        return len(s)
+
+    def isatty(self) -> bool:
+        return False
+
+    def writable(self) -> bool:
+        return True
+
+
+class Server:
+    """
+    Resident server executing Clyjin calls received from clients via a Unix
+    socket.
+
+    All calls are executed by the same Boot, so plugins are imported and
+    initialized only once for the server's lifetime. Calls are executed one
+    by one, since the current directory and environment variables set for a
+    call are process-wide.
+
+    Protocol is a line-delimited JSON: a client sends one request line with
+    `args`, `cwd`, `env`, `stdin_size` and `stdin_encoding` fields followed
+    by `stdin_size` bytes of stdin, and the server replies with lines of
+    `stdout` or `stderr` data, finished by a line with `exit` code.
+
+    Attributes:
+        socket_path:
+            Path to the Unix socket to listen at.
+    """
+    # the request line holds args and environment variables, which are
+    # bounded by the OS's limit of a process' args, about 2 MiB on Linux
+    RequestLineLimit: int = 16 * 1024 * 1024
+    StopSignals: list[signal.Signals] = [signal.SIGTERM, signal.SIGINT]
+
+    def __init__(self, socket_path: Path) -> None:
+        self._socket_path: Path = socket_path
+        self._boot: Boot = Boot()
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    async def serve(self) -> None:
+        """
+        Serves calls until SIGTERM or SIGINT is received, or until the
+        serving is cancelled.
+        """
+        self._check_socket_free()
+        self._socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # the Log's sink resolves stderr on each write, so logs of each call
+        # are written to the call's routed stderr
+        StdioRouter.install()
+
+        # the socket is removed on a plain `kill` as well, otherwise clients
+        # would try to connect to it
+        stopped: asyncio.Event = asyncio.Event()
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        for signum in self.StopSignals:
+            loop.add_signal_handler(signum, stopped.set)
+        try:
+            server: asyncio.Server = await asyncio.start_unix_server(
+                self._handle,
+                path=str(self._socket_path),
+                limit=self.RequestLineLimit,
+            )
+            Log.info("[core.server] listening at <{}>", self._socket_path)
+            async with server:
+                await stopped.wait()
+        finally:
+            for signum in self.StopSignals:
+                loop.remove_signal_handler(signum)
+            self._boot.close()
+            self._socket_path.unlink(missing_ok=True)
+            Log.info("[core.server] stopped at <{}>", self._socket_path)
+
+    async def _handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        try:
+            request: dict[str, Any] = json.loads(await reader.readline())
+            stdin: bytes = await reader.readexactly(request["stdin_size"])
+            async with self._lock:
+                exit_code: int = await self._execute(request, stdin, writer)
+            writer.write((json.dumps({"exit": exit_code}) + "\n").encode())
+            await writer.drain()
+        except (ValueError, KeyError, EOFError, ConnectionError) as error:
+            Log.error("[core.server] failed to handle call: error=<{}>", error)
+        finally:
+            writer.close()
+
+    async def _execute(
+        self,
+        request: dict[str, Any],
+        stdin: bytes,
+        writer: asyncio.StreamWriter,
+    ) -> int:
+        cwd: Path = Path(request["cwd"])
+        stdio: Stdio = Stdio(
+            stdout=SocketStream("stdout", writer),
+            stderr=SocketStream("stderr", writer),
+            stdin=io.TextIOWrapper(
+                io.BytesIO(stdin),
+                encoding=request["stdin_encoding"],
+            ),
+        )
+
+        if CLIPrescanner().prescan(request["args"]).watch:
+            # calls of other clients would wait for the endless watching
+            stdio.stderr.write(
+                "watch mode is not supported by the clyjin server,"
+                " set CLYJIN_NO_SERVER=1 to watch\n",
+            )
+            return 1
+
+        with self._environment(request["env"], cwd), StdioRouter.route(stdio):
+            return await self._boot.call(request["args"], rootdir=cwd)
+
+    @contextlib.contextmanager
+    def _environment(self, env: dict[str, str], cwd: Path) -> Iterator[None]:
+        initial_env: dict[str, str] = dict(os.environ)
+        initial_cwd: Path = Path.cwd()
+
+        os.environ.clear()
+        os.environ.update(env)
+        os.chdir(cwd)
+        try:
+            yield
+        finally:
+            os.environ.clear()
+            os.environ.update(initial_env)
+            os.chdir(initial_cwd)
+
+    def _check_socket_free(self) -> None:
+        if not self._socket_path.exists():
+            return
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(str(self._socket_path))
+            except OSError:
+                # nobody listens, the socket is left by a stopped server
+                self._socket_path.unlink(missing_ok=True)
+                return
+
+        raise AlreadyEventError(
+            title="clyjin server at socket",
+            value=self._socket_path,
+            event="running",
+        )
@@ -0,0 +1,148 @@
+import contextlib
+import io
+import sys
+from collections.abc import Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, TextIO
+
+
+@dataclass(frozen=True, slots=True)
+class Stdio:
+    """
+    Set of standard streams used by a Module call.
+    """
+    stdout: TextIO
+    stderr: TextIO
+    stdin: TextIO
+
+
+_CurrentStdio: ContextVar[Stdio | None] = ContextVar(
+    "clyjin_stdio",
+    default=None,
+)
+
+
+class RoutedStream(io.TextIOBase):
+    """
+    Standard stream proxy, which writes to the stream of the current context
+    set by `StdioRouter.route()`, or to the original stream otherwise.
+
+    Attributes:
+        name:
+            Name of the stream within Stdio, e.g. `stdout`.
+        original_stream:
+            Stream to use if no routing is set for the current context.
+    """
+    def __init__(self, name: str, original_stream: TextIO) -> None:
+        super().__init__()
+        self._name: str = name
+        self._original_stream: TextIO = original_stream
+
+    @property
+    def original_stream(self) -> TextIO:
+        return self._original_stream
+
+    def get_target(self) -> TextIO:
+        stdio: Stdio | None = _CurrentStdio.get()
+        if stdio is None:
+            return self._original_stream
+        return getattr(stdio, self._name)
+
+    def write(self, s: str) -> int:
+        return self.get_target().write(s)
+
+    def writelines(self, lines: Any) -> None:
+        self.get_target().writelines(lines)
+
+    def flush(self) -> None:
+        self.get_target().flush()
+
+    def read(self, size: int | None = -1) -> str:
+        return self.get_target().read(size)
+
+    def readline(self, size: int | None = -1) -> str:  # type: ignore
+        return self.get_target().readline(size)
+
+    def isatty(self) -> bool:
+        return self.get_target().isatty()
+
+    def fileno(self) -> int:
+        return self.get_target().fileno()
+
+    def readable(self) -> bool:
+        return self.get_target().readable()
+
+    def writable(self) -> bool:
+        return self.get_target().writable()
+
+    @property
+    def encoding(self) -> str:  # type: ignore
+        return getattr(self.get_target(), "encoding", "utf-8")
+
+
+class TeeStream(io.TextIOBase):
+    """
+    Output stream writing to several streams at once, e.g. to show output
+    while capturing it.
+
+    Attributes:
+        streams:
+            Streams to write to, the first one is used as the main stream
+            to report stream's properties.
+    """
+    def __init__(self, *streams: TextIO) -> None:
+        super().__init__()
+        self._streams: tuple[TextIO, ...] = streams
+
+    def write(self, s: str) -> int:
+        for stream in self._streams:
+            stream.write(s)
+        return len(s)
+
+    def flush(self) -> None:
+        for stream in self._streams:
+            stream.flush()
+
+    def isatty(self) -> bool:
+        return self._streams[0].isatty()
+
+    def writable(self) -> bool:
+        return True
+
+    @property
+    def encoding(self) -> str:  # type: ignore
+        return getattr(self._streams[0], "encoding", "utf-8")
+
+
+class StdioRouter:
+    """
+    Routes standard streams of concurrently running Module calls to separate
+    targets, e.g. to capture output of each call.
+
+    Routing is bound to the current context, so it's inherited by tasks
+    created within the routed block, but not by threads started with
+    `loop.run_in_executor()`.
+    """
+    @staticmethod
+    def install() -> None:
+        """
+        Replaces `sys` standard streams with routed proxies. Safe to be
+        called several times.
+        """
+        if not isinstance(sys.stdout, RoutedStream):
+            sys.stdout = RoutedStream("stdout", sys.stdout)
+        if not isinstance(sys.stderr, RoutedStream):
+            sys.stderr = RoutedStream("stderr", sys.stderr)
+        if not isinstance(sys.stdin, RoutedStream):
+            sys.stdin = RoutedStream("stdin", sys.stdin)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def route(stdio: Stdio) -> Iterator[None]:
+        StdioRouter.install()
+        token = _CurrentStdio.set(stdio)
+        try:
+            yield
+        finally:
+            _CurrentStdio.reset(token)
@@ -1,13 +1,154 @@
+import json
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
 import pytest
 
 from clyjin.core.boot import Boot
 
+ArgparseErrorCode: int = 2
+
+PluginSource: str = """
+from clyjin.base import Config, Module, ModuleArg, ModuleArgs, Plugin
+
+Executed = []
+
+
+class RootArgs(ModuleArgs):
+    value: ModuleArg[str]
+
+
+class RootModule(Module[RootArgs, Config]):
+    Name = "$root"
+    Args = RootArgs(
+        value=ModuleArg[str](names=["--value"], type=str, default="none"),
+    )
+
+    async def execute(self) -> None:
+        Executed.append(self.args.value.value)
+
+
+class MainPlugin(Plugin):
+    Name = "{name}"
+    ModuleClasses = [RootModule]
+"""
+
+
+@pytest.fixture()
+def plugins(make_plugin: Callable[[str, str], str]) -> list[str]:
+    return [
+        make_plugin(name, PluginSource.format(name=name))
+        for name in ["alpha", "beta"]
+    ]
+
 
 @pytest.mark.asyncio
-async def test_start():
+async def test_start(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # the default sysdir is written on start, so it's kept out of the real
+    # home directory
+    monkeypatch.setenv("HOME", str(tmp_path))
     try:
         await Boot().start(["-h"])
     except SystemExit:
         pass
     else:
         raise AssertionError
+
+
+@pytest.mark.asyncio
+async def test_start_imports_only_called_plugin(
+    tmp_path: Path,
+    plugins: list[str],
+):
+    sysdir_args: list[str] = ["--sysdir", str(Path(tmp_path, "sysdir"))]
+
+    # no manifests are recorded yet, so all plugins are imported
+    await Boot().start([*sysdir_args, "alpha", "--value", "first"])
+    assert sys.modules["clyjin_alpha"].Executed == ["first"]
+    assert "clyjin_beta" in sys.modules
+
+    for name in plugins:
+        del sys.modules[f"clyjin_{name}"]
+
+    await Boot().start([*sysdir_args, "alpha", "--value", "second"])
+    assert sys.modules["clyjin_alpha"].Executed == ["second"]
+    assert "clyjin_beta" not in sys.modules
+
+
+@pytest.mark.asyncio
+async def test_help_served_from_schema_cache(
+    tmp_path: Path,
+    plugins: list[str],
+    capsys: pytest.CaptureFixture,
+):
+    sysdir_args: list[str] = ["--sysdir", str(Path(tmp_path, "sysdir"))]
+    await Boot().start([*sysdir_args, "beta"])
+
+    for name in plugins:
+        del sys.modules[f"clyjin_{name}"]
+    capsys.readouterr()
+
+    with pytest.raises(SystemExit):
+        await Boot().start([*sysdir_args, "-h"])
+    assert "alpha" in capsys.readouterr().out
+    for name in plugins:
+        assert f"clyjin_{name}" not in sys.modules
+
+
+@pytest.mark.asyncio
+async def test_batch(
+    tmp_path: Path,
+    plugins: list[str],
+    capsys: pytest.CaptureFixture,
+):
+    batch_path: Path = Path(tmp_path, "batch.txt")
+    batch_path.write_text(
+        "# calls of both plugins\n"
+        "alpha --value first\n"
+        "\n"
+        "beta --value 'second one'\n"
+        "alpha --value third\n"
+        "--watch src beta --value watched\n"
+        "gamma\n",
+    )
+
+    with pytest.raises(SystemExit) as error:
+        await Boot().start([
+            "--sysdir",
+            str(Path(tmp_path, "sysdir")),
+            "--batch",
+            str(batch_path),
+            "--jobs",
+            "2",
+        ])
+
+    # argparse exit code for the unknown module is the highest one
+    assert error.value.code == ArgparseErrorCode
+    err: str = capsys.readouterr().err
+    assert "invalid choice: 'gamma'" in err
+    assert "batch calls cannot be watched" in err
+    assert sys.modules["clyjin_alpha"].Executed == ["first", "third"]
+    assert sys.modules["clyjin_beta"].Executed == ["second one"]
+
+
+@pytest.mark.asyncio
+async def test_profile_startup(tmp_path: Path, plugins: list[str]):
+    profile_path: Path = Path(tmp_path, "profile.json")
+    await Boot().start([
+        "--sysdir",
+        str(Path(tmp_path, "sysdir")),
+        "--profile-json",
+        str(profile_path),
+        "alpha",
+    ])
+
+    profile: dict = json.loads(profile_path.read_text())
+    paths: list[str] = [phase["path"] for phase in profile["phases"]]
+    assert "preparation / plugins loading / import <clyjin_alpha>" in paths
+    assert "module <$root> execution" in paths
+    assert profile["total_ms"] >= sum(
+        phase["duration_ms"]
+        for phase in profile["phases"]
+        if " / " not in phase["path"]
+    )
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+import zipfile
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from clyjin.core.boot import Boot
+
+PluginSource: str = """
+from clyjin.base import Config, Module, Plugin
+
+
+class GreetModule(Module[None, Config]):
+    Name = "$root"
+
+    async def execute(self) -> None:
+        print(f"hello from {__file__}")
+
+
+class MainPlugin(Plugin):
+    Name = "greet"
+    ModuleClasses = [GreetModule]
+"""
+
+
+@pytest.mark.asyncio
+async def test_bundle(tmp_path: Path, make_plugin: Callable[[str, str], str]):
+    plugin: str = make_plugin("greet", PluginSource)
+    bundle_path: Path = Path(tmp_path, "dist", "clyjin.pyz")
+    assert await Boot().call([
+        "--sysdir",
+        str(Path(tmp_path, "sysdir")),
+        "core.bundle",
+        str(bundle_path),
+        "--plugins",
+        plugin,
+    ]) == 0
+
+    with zipfile.ZipFile(bundle_path) as archive:
+        arcnames: set[str] = set(archive.namelist())
+    assert {
+        "__main__.py",
+        "_clyjin_bundle.py",
+        "clyjin/core/boot.pyc",
+        "clyjin_greet/__init__.py",
+        "clyjin_greet/__init__.pyc",
+    } <= arcnames
+    assert "clyjin/core/test_bundle.py" not in arcnames
+
+    # the plugin is imported from the bundle without the discovery
+    bundle_sysdir: Path = Path(tmp_path, "bundle_sysdir")
+    process: asyncio.subprocess.Process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        str(bundle_path),
+        "--sysdir",
+        str(bundle_sysdir),
+        plugin,
+        stdout=asyncio.subprocess.PIPE,
+        cwd=tmp_path,
+        env={**os.environ, "CLYJIN_NO_SERVER": "1"},
+    )
+    stdout, _ = await process.communicate()
+    assert process.returncode == 0
+    # the precompiled bytecode is imported
+    assert stdout.decode() == \
+        f"hello from {Path(bundle_path, 'clyjin_greet', '__init__.pyc')}\n"
+    assert not Path(bundle_sysdir, "discovery.json").exists()
@@ -0,0 +1,116 @@
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from clyjin.core.boot import Boot
+from clyjin.core.cache import CacheStats, ExecutionCache
+
+PluginSource: str = """
+from pathlib import Path
+
+from clyjin.base import Config, Module, ModuleArg, ModuleArgs, Plugin
+
+Executed = []
+
+
+class UpperArgs(ModuleArgs):
+    source: ModuleArg[str]
+
+
+class UpperModule(Module[UpperArgs, Config]):
+    Name = "$root"
+    UseCache = True
+    Args = UpperArgs(
+        source=ModuleArg[str](names=["source"], type=str),
+    )
+
+    def get_cache_input_paths(self) -> list[Path]:
+        return [Path(self.args.source.value)]
+
+    def get_cache_output_paths(self) -> list[Path]:
+        return [Path("upper.txt")]
+
+    async def execute(self) -> None:
+        Executed.append(self.args.source.value)
+        text = Path(self._rootdir, self.args.source.value).read_text()
+        Path(self._rootdir, "upper.txt").write_text(text.upper())
+        print("converted")
+
+
+class MainPlugin(Plugin):
+    Name = "upper"
+    ModuleClasses = [UpperModule]
+"""
+
+
+@pytest.mark.asyncio
+async def test_cached_execution(
+    tmp_path: Path,
+    make_plugin: Callable[[str, str], str],
+    capsys: pytest.CaptureFixture,
+):
+    plugin: str = make_plugin("upper", PluginSource)
+    sysdir: Path = Path(tmp_path, "sysdir")
+    source_path: Path = Path(tmp_path, "source.txt")
+    output_path: Path = Path(tmp_path, "upper.txt")
+    source_path.write_text("hello")
+    args: list[str] = ["--sysdir", str(sysdir), plugin, "source.txt"]
+
+    boot: Boot = Boot(rootdir=tmp_path)
+    try:
+        assert await boot.call(args) == 0
+        output_path.unlink()
+        assert await boot.call(args) == 0
+        assert sys.modules["clyjin_upper"].Executed == ["source.txt"]
+        assert output_path.read_text() == "HELLO"
+        assert capsys.readouterr().out == "converted\nconverted\n"
+
+        source_path.write_text("changed")
+        assert await boot.call(args) == 0
+        assert len(sys.modules["clyjin_upper"].Executed) == 2  # noqa: PLR2004
+        assert output_path.read_text() == "CHANGED"
+    finally:
+        boot.close()
+
+    cache: ExecutionCache = ExecutionCache.from_sysdir(sysdir)
+    try:
+        stats: CacheStats = await cache.get_stats()
+        assert stats.entries == 2  # noqa: PLR2004
+        assert await cache.prune(max_size=stats.size - 1) == 1
+        assert await cache.clear() == 1
+    finally:
+        cache.close()
+
+
+@pytest.mark.asyncio
+async def test_prune_deletes_unused_hashes(
+    tmp_path: Path,
+    make_plugin: Callable[[str, str], str],
+):
+    plugin: str = make_plugin("upper", PluginSource)
+    sysdir: Path = Path(tmp_path, "sysdir")
+    Path(tmp_path, "first.txt").write_text("first")
+    Path(tmp_path, "second.txt").write_text("second")
+
+    boot: Boot = Boot(rootdir=tmp_path)
+    try:
+        for source in ["first.txt", "second.txt"]:
+            assert await boot.call(
+                ["--sysdir", str(sysdir), plugin, source],
+            ) == 0
+    finally:
+        boot.close()
+
+    cache: ExecutionCache = ExecutionCache.from_sysdir(sysdir)
+    try:
+        stats: CacheStats = await cache.get_stats()
+        assert await cache.prune(max_size=stats.size - 1) == 1
+        hashes: list[tuple[str, dict]] = \
+            await cache._index.scan("hash.")  # noqa: SLF001
+        assert [key for key, _ in hashes] == [
+            f"hash.{Path(tmp_path, 'second.txt')}",
+        ]
+    finally:
+        cache.close()
@@ -0,0 +1,92 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from clyjin.core.cli.generator import CLIGenerator
+from clyjin.core.cli.schema import ArgSpec, CLISchema, ModuleSpec, PluginSpec
+from clyjin.core.completion import Completer
+from clyjin.core.plugin.plugin import CorePlugin
+
+
+def _get_plugin_farm_specs(size: int) -> list[PluginSpec]:
+    return [
+        PluginSpec(
+            name=f"plugin{i}",
+            version="0.1.0",
+            modules=tuple(
+                ModuleSpec(
+                    name=f"module{j}",
+                    namespaced_name=f"plugin{i}.module{j}",
+                    description=None,
+                    args=tuple(
+                        ArgSpec(
+                            dest=f"option{k}",
+                            names=(f"--option{k}",),
+                            argparse_kwargs={"choices": ["a", "b"]},
+                            ValueType=str,
+                            is_optional=True,
+                        )
+                        for k in range(10)
+                    ),
+                )
+                for j in range(10)
+            ),
+        )
+        for i in range(size)
+    ]
+
+
+def test_complete(tmp_path: Path):
+    Completer.write_index(
+        tmp_path,
+        CLIGenerator().get_completion_index([
+            CLISchema.compile_plugin_spec(CorePlugin),
+            *_get_plugin_farm_specs(200),
+        ]),
+    )
+
+    completer: Completer = Completer.from_words(
+        ["--sysdir", str(tmp_path), "core.ca"],
+    )
+    assert completer.complete(["--sysdir", str(tmp_path), "core.ca"]) == [
+        "core.cache",
+    ]
+    assert completer.complete(["core.cache", "p"]) == ["prune"]
+    assert completer.complete(["core.cache", "stats", "--m"]) == [
+        "--max-size",
+    ]
+    assert completer.complete(["--output-format", ""]) == [
+        "text",
+        "ndjson",
+        "csv",
+    ]
+    assert completer.complete(["plugin1.module1", "--option1", "a", "--"]) \
+        == ["--help", *(f"--option{k}" for k in range(10))]
+    assert completer.complete(
+        ["core.cache", "stats", "--", "|", "core.s"],
+    ) == ["core.schema", "core.serve"]
+    # paths are completed by the shell
+    assert completer.complete(["--sysdir", ""]) == []
+
+
+def test_complete_without_plugins(tmp_path: Path):
+    # the completion backend imports neither plugins nor the core
+    result: subprocess.CompletedProcess = subprocess.run(
+        [  # noqa: S603
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "from clyjin.__main__ import main\n"
+            "main()\n"
+            "print('clyjin.core.boot' in sys.modules, 'pydantic' in"
+            " sys.modules)",
+            "--complete",
+            "--sysdir",
+            str(tmp_path),
+            "",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout == "False False\n"
@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import pytest
+
+from clyjin.base import Config, Module, ModuleArgs, Plugin
+from clyjin.core.config import ConfigLoader
+
+
+class BuildConfig(Config):
+    target: str = "debug"
+    jobs: int = 1
+
+
+class BuildModule(Module[ModuleArgs, BuildConfig]):
+    Name = "build"
+    CONFIG_CLASS = BuildConfig
+
+
+class CleanModule(Module[ModuleArgs, Config]):
+    Name = "clean"
+
+
+class MakePlugin(Plugin):
+    Name = "make"
+    ModuleClasses = [BuildModule, CleanModule]
+
+
+def _raise_on_parse(*args, **kwargs):
+    raise AssertionError
+
+
+def test_get_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    config_path: Path = Path(tmp_path, "clyjin.yml")
+    config_path.write_text(
+        "make:\n"
+        "  build:\n"
+        "    target: release\n"
+        "other:\n"
+        "  $root:\n"
+        "    value: 1\n",
+    )
+    loader: ConfigLoader = ConfigLoader.from_sysdir(Path(tmp_path, "sysdir"))
+
+    config: BuildConfig = loader.get_config(
+        config_path,
+        MakePlugin,
+        BuildModule,
+    )
+    assert config.target == "release"
+    assert config.jobs == 1
+    assert loader.get_config(config_path, MakePlugin, CleanModule) is None
+    loader.save()
+
+    # unchanged file is read from the cache by a new loader
+    monkeypatch.setattr(ConfigLoader, "_parse", _raise_on_parse)
+    cached_loader: ConfigLoader = ConfigLoader.from_sysdir(
+        Path(tmp_path, "sysdir"),
+    )
+    assert cached_loader.get_config(
+        config_path,
+        MakePlugin,
+        BuildModule,
+    ).target == "release"
+    monkeypatch.undo()
+
+    config_path.write_text("make:\n  build:\n    jobs: 4\n")
+    config = cached_loader.get_config(config_path, MakePlugin, BuildModule)
+    assert config.target == "debug"
+    assert config.jobs == 4  # noqa: PLR2004
+
+
+def test_get_config_missing_file(tmp_path: Path):
+    config: BuildConfig = ConfigLoader.from_sysdir(tmp_path).get_config(
+        Path(tmp_path, "clyjin.yml"),
+        MakePlugin,
+        BuildModule,
+    )
+    assert config == BuildConfig()
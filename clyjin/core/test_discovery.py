@@ -0,0 +1,80 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from clyjin.core.discovery import PluginDiscovery
+
+
+@pytest.fixture()
+def plugins_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    plugins_dir: Path = Path(tmp_path, "site")
+    Path(plugins_dir, "clyjin_first").mkdir(parents=True)
+    Path(plugins_dir, "clyjin_first", "__init__.py").touch()
+    Path(plugins_dir, "other").mkdir()
+    Path(plugins_dir, "other", "__init__.py").touch()
+    monkeypatch.setattr(sys, "path", [str(plugins_dir)])
+    return plugins_dir
+
+
+def test_index_reused_and_updated(
+    tmp_path: Path,
+    plugins_dir: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    index_path: Path = Path(tmp_path, "sysdir", "discovery.json")
+    assert PluginDiscovery(index_path).get_names() == [
+        ("clyjin_first", str(plugins_dir)),
+    ]
+    assert index_path.exists()
+
+    with monkeypatch.context() as m:
+        # unchanged entries should not be rescanned
+        m.setattr(PluginDiscovery, "_scan", None)
+        assert [n for n, _ in PluginDiscovery(index_path).get_names()] == [
+            "clyjin_first",
+        ]
+
+    Path(plugins_dir, "clyjin_second.py").touch()
+    assert sorted(n for n, _ in PluginDiscovery(index_path).get_names()) == [
+        "clyjin_first",
+        "clyjin_second",
+    ]
+
+
+def test_index_size_bounded(
+    tmp_path: Path,
+    plugins_dir: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(PluginDiscovery, "MaxEntries", 3)
+    monkeypatch.setattr(sys, "path", ["", str(plugins_dir)])
+    index_path: Path = Path(tmp_path, "discovery.json")
+
+    for i in range(5):
+        Path(tmp_path, f"cwd{i}").mkdir()
+        monkeypatch.chdir(Path(tmp_path, f"cwd{i}"))
+        PluginDiscovery(index_path).get_names()
+
+    # entries of the current dirs of the last runs are kept
+    assert list(json.loads(index_path.read_text())["entries"]) == [
+        str(Path(tmp_path, "cwd3")),
+        str(Path(tmp_path, "cwd4")),
+        str(plugins_dir),
+    ]
+
+
+def test_filters(tmp_path: Path, plugins_dir: Path):
+    Path(plugins_dir, "clyjin_second.py").touch()
+    index_path: Path = Path(tmp_path, "discovery.json")
+
+    discovery: PluginDiscovery = PluginDiscovery(index_path)
+    discovery.set_filters(allow=None, deny=["first"])
+    assert [n for n, _ in discovery.get_names()] == ["clyjin_second"]
+
+    # filters are persisted within the index
+    discovery = PluginDiscovery(index_path)
+    assert discovery.deny == ["clyjin_first"]
+    discovery.set_filters(allow=["clyjin_first"], deny=[])
+    assert [n for n, _ in discovery.get_names()] == ["clyjin_first"]
@@ -0,0 +1,81 @@
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from clyjin.core.boot import Boot
+
+PluginSource: str = """
+from pathlib import Path
+
+from clyjin.base import Config, Module, Plugin
+
+Changes = []
+
+
+class CopyModule(Module[None, Config]):
+    Name = "$root"
+    UseIncremental = True
+
+    def get_input_patterns(self) -> list[str]:
+        return ["src/**/*.txt"]
+
+    def get_output_patterns(self) -> list[str]:
+        return ["dist"]
+
+    async def execute(self) -> None:
+        Changes.append(self.changes)
+        for path in self.changes.changed:
+            target = Path(self._rootdir, "dist", path.name)
+            target.parent.mkdir(exist_ok=True)
+            target.write_text(Path(self._rootdir, path).read_text())
+        for path in self.changes.removed:
+            Path(self._rootdir, "dist", path.name).unlink()
+
+
+class MainPlugin(Plugin):
+    Name = "copy"
+    ModuleClasses = [CopyModule]
+"""
+
+
+@pytest.mark.asyncio
+async def test_incremental_execution(
+    tmp_path: Path,
+    make_plugin: Callable[[str, str], str],
+):
+    plugin: str = make_plugin("copy", PluginSource)
+    Path(tmp_path, "src", "nested").mkdir(parents=True)
+    Path(tmp_path, "src", "a.txt").write_text("a")
+    Path(tmp_path, "src", "nested", "b.txt").write_text("b")
+    args: list[str] = ["--sysdir", str(Path(tmp_path, "sysdir")), plugin]
+
+    boot: Boot = Boot(rootdir=tmp_path)
+    try:
+        assert await boot.call(args) == 0
+        assert await boot.call(args) == 0
+        changes: list = sys.modules["clyjin_copy"].Changes
+        assert len(changes) == 1
+        assert changes[0].is_full
+        assert changes[0].added == [
+            Path("src/a.txt"),
+            Path("src/nested/b.txt"),
+        ]
+
+        Path(tmp_path, "src", "a.txt").write_text("changed")
+        Path(tmp_path, "src", "nested", "b.txt").unlink()
+        Path(tmp_path, "src", "c.txt").write_text("c")
+        assert await boot.call(args) == 0
+        assert not changes[-1].is_full
+        assert changes[-1].added == [Path("src/c.txt")]
+        assert changes[-1].modified == [Path("src/a.txt")]
+        assert changes[-1].removed == [Path("src/nested/b.txt")]
+
+        # outputs changed outside of the module cause a full execution
+        Path(tmp_path, "dist", "c.txt").unlink()
+        assert await boot.call(args) == 0
+        assert changes[-1].is_full
+        assert Path(tmp_path, "dist", "c.txt").read_text() == "c"
+    finally:
+        boot.close()
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from antievil import UnsupportedError
+
+from clyjin.base.plugin import Plugin
+from clyjin.core.initializer import PluginInitializer
+
+Events: list[str] = []
+
+
+class _SlowPlugin(Plugin):
+    @classmethod
+    async def initialize(cls, data) -> None:
+        Events.append(f"start {cls.get_name()}")
+        await asyncio.sleep(0.01)
+        Events.append(f"end {cls.get_name()}")
+
+
+class BasePlugin(_SlowPlugin):
+    Name = "base"
+
+
+class APlugin(_SlowPlugin):
+    Name = "a"
+    Dependencies = ["base"]
+
+
+class BPlugin(_SlowPlugin):
+    Name = "b"
+    Dependencies = ["base"]
+
+
+class MainPlugin(_SlowPlugin):
+    Name = "main"
+    Dependencies = ["a", "b"]
+
+
+class BadPlugin(Plugin):
+    Name = "bad"
+    Fails: bool = True
+
+    @classmethod
+    async def initialize(cls, data) -> None:
+        if cls.Fails:
+            raise ValueError(cls.get_name())
+
+
+PluginClasses: dict[str, type[Plugin]] = {
+    P.get_name(): P for P in [BasePlugin, APlugin, BPlugin, MainPlugin]
+}
+
+
+def test_resolve():
+    assert PluginInitializer.resolve(
+        MainPlugin,
+        PluginClasses.__getitem__,
+    ) == [BasePlugin, APlugin, BPlugin, MainPlugin]
+
+
+def test_resolve_cycle(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(BasePlugin, "Dependencies", ["main"])
+
+    with pytest.raises(UnsupportedError):
+        PluginInitializer.resolve(MainPlugin, PluginClasses.__getitem__)
+
+
+@pytest.mark.asyncio
+async def test_initialize():
+    Events.clear()
+    initializer: PluginInitializer = PluginInitializer()
+    ordered: list[type[Plugin]] = PluginInitializer.resolve(
+        MainPlugin,
+        PluginClasses.__getitem__,
+    )
+
+    # concurrent calls share initialization of the same plugins
+    await asyncio.gather(
+        initializer.initialize(ordered, None),
+        initializer.initialize(ordered[:2], None),
+    )
+    await initializer.initialize(ordered, None)
+
+    assert Events[:2] == ["start base", "end base"]
+    # independent plugins are initialized concurrently
+    assert set(Events[2:4]) == {"start a", "start b"}
+    assert set(Events[4:6]) == {"end a", "end b"}
+    assert Events[6:] == ["start main", "end main"]
+
+
+@pytest.mark.asyncio
+async def test_initialize_failure_not_shared(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    initializer: PluginInitializer = PluginInitializer()
+
+    # the failed call doesn't cancel the shared initialization awaited by the
+    # concurrent call
+    failed, initialized = await asyncio.gather(
+        initializer.initialize([BasePlugin, BadPlugin], None),
+        initializer.initialize([BasePlugin], None),
+        return_exceptions=True,
+    )
+    assert isinstance(failed, ValueError)
+    assert initialized is None
+
+    # the failed plugin is initialized again by the next call
+    monkeypatch.setattr(BadPlugin, "Fails", False)
+    await initializer.initialize([BasePlugin, BadPlugin], None)
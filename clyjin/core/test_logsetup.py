@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from clyjin.core.cli.prescanner import CLIPrescanner, PrescannedArgs
+from clyjin.core.logsetup import LogSetup
+from clyjin.log import Log
+
+
+def test_prescan():
+    args: PrescannedArgs = CLIPrescanner().prescan(
+        ["-vv", "--verbose", "--log-format", "json", "--log-enqueue", "a.b"],
+    )
+    assert args.verbosity_level == 3  # noqa: PLR2004
+    assert args.log_format == "json"
+    assert args.is_log_enqueued
+    # the verbosity is parsed for each call as well
+    assert args.common_args == ["-vv", "--verbose"]
+
+
+def test_levels(capsys: pytest.CaptureFixture):
+    calls: list[int] = []
+
+    def get_value() -> int:
+        calls.append(1)
+        return 1
+
+    LogSetup().apply()
+    Log.opt(lazy=True).info("hidden <{}>", get_value)
+    Log.warning("shown")
+    # messages below the level are not formatted
+    assert calls == []
+
+    LogSetup(verbosity_level=1).apply()
+    Log.opt(lazy=True).info("shown <{}>", get_value)
+    Log.debug("hidden")
+    assert calls == [1]
+
+    err: str = capsys.readouterr().err
+    assert "shown\n" in err
+    assert "shown <1>\n" in err
+    assert "hidden" not in err
+
+
+def test_json_enqueued(capsys: pytest.CaptureFixture):
+    LogSetup(format="json", is_enqueued=True).apply()
+    try:
+        Log.warning("record <{}>", 1)
+        Log.complete()
+
+        record: dict = json.loads(capsys.readouterr().err)
+        assert record["record"]["message"] == "record <1>"
+        assert record["record"]["level"]["name"] == "WARNING"
+    finally:
+        LogSetup().apply()
@@ -0,0 +1,119 @@
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from antievil import UnsupportedError
+
+from clyjin.core.boot import Boot
+from clyjin.core.pipeline import Pipeline
+
+PluginSource: str = """
+from clyjin.base import Config, Module, ModuleArg, ModuleArgs, Plugin
+
+Produced = []
+
+
+class CountArgs(ModuleArgs):
+    limit: ModuleArg[int]
+
+
+class CountModule(Module[CountArgs, Config]):
+    Name = "count"
+    Args = CountArgs(
+        limit=ModuleArg[int](names=["--limit"], type=int, default=3),
+    )
+
+    async def stream(self, items):
+        for i in range(self.args.limit.value):
+            Produced.append(i)
+            yield i
+
+
+class DoubleModule(Module[None, Config]):
+    Name = "double"
+
+    async def stream(self, items):
+        async for item in items:
+            yield item * 2
+
+
+class HeadModule(Module[None, Config]):
+    Name = "head"
+
+    async def stream(self, items):
+        async for item in items:
+            yield item
+            if item >= 4:
+                return
+
+
+class MainPlugin(Plugin):
+    Name = "numbers"
+    ModuleClasses = [CountModule, DoubleModule, HeadModule]
+"""
+
+
+def test_split():
+    assert Pipeline.split(["--sysdir", "x", "a.b", "--", "|", "c.d"]) == [
+        ["--sysdir", "x", "a.b"],
+        ["c.d"],
+    ]
+    with pytest.raises(UnsupportedError):
+        Pipeline.split(["a.b", "--", "|"])
+
+
+def test_separator_as_value():
+    args: list[str] = ["csv.split", "--sep", "|", "--", "a|b"]
+    assert not Pipeline.is_pipeline(args)
+    assert Pipeline.split(args) == [args]
+    assert Pipeline.is_pipeline(["a.b", "--sep", "|", "--", "|", "c.d"])
+
+
+@pytest.mark.asyncio
+async def test_call_with_separator_as_value(tmp_path: Path):
+    assert await Boot().call([
+        "--sysdir",
+        str(Path(tmp_path, "sysdir")),
+        "core.reindex",
+        "--deny",
+        "|",
+    ]) == 0
+
+
+@pytest.mark.asyncio
+async def test_pipeline(
+    tmp_path: Path,
+    make_plugin: Callable[[str, str], str],
+    capsys: pytest.CaptureFixture,
+):
+    plugin: str = make_plugin("numbers", PluginSource)
+    sysdir_args: list[str] = ["--sysdir", str(Path(tmp_path, "sysdir"))]
+
+    assert await Boot().call([
+        *sysdir_args,
+        f"{plugin}.count",
+        "--limit",
+        "3",
+        "--",
+        "|",
+        f"{plugin}.double",
+    ]) == 0
+    assert capsys.readouterr().out == "0\n2\n4\n"
+
+    # the producer is cancelled once the last stage is finished, instead of
+    # producing all items
+    assert await Boot().call([
+        *sysdir_args,
+        f"{plugin}.count",
+        "--limit",
+        "100000",
+        "--",
+        "|",
+        f"{plugin}.double",
+        "--",
+        "|",
+        f"{plugin}.head",
+    ]) == 0
+    assert capsys.readouterr().out == "0\n2\n4\n"
+    assert len(sys.modules["clyjin_numbers"].Produced) < 1000  # noqa: PLR2004
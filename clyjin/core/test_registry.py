@@ -0,0 +1,59 @@
+import pytest
+from antievil import DuplicateNameError, NotFoundError
+
+from clyjin.base import Config, Module, Plugin
+from clyjin.base.errors import DuplicateRootModulePluginError
+from clyjin.core.registry import Registry
+
+
+class RootModule(Module[None, Config]):
+    Name = "$root"
+
+
+class BuildModule(Module[None, Config]):
+    Name = "build"
+
+
+class AnotherRootModule(Module[None, Config]):
+    Name = "$root"
+
+
+class MakePlugin(Plugin):
+    Name = "make"
+    ModuleClasses = [RootModule, BuildModule]
+
+
+class DuplicateMakePlugin(Plugin):
+    Name = "Make"
+    ModuleClasses = [BuildModule]
+
+
+class TwoRootsPlugin(Plugin):
+    Name = "roots"
+    ModuleClasses = [BuildModule, RootModule, AnotherRootModule]
+
+
+def test_get():
+    registry: Registry = Registry()
+    registry.register(MakePlugin)
+
+    assert registry.get("make") == (MakePlugin, RootModule)
+    assert registry.get("make.$root") == (MakePlugin, RootModule)
+    assert registry.get("make.build") == (MakePlugin, BuildModule)
+    with pytest.raises(NotFoundError):
+        registry.get("make.test")
+
+
+def test_register_validates_names():
+    registry: Registry = Registry()
+    registry.register(MakePlugin)
+
+    with pytest.raises(DuplicateNameError):
+        registry.register(DuplicateMakePlugin)
+    with pytest.raises(DuplicateRootModulePluginError):
+        registry.register(TwoRootsPlugin)
+
+    # failed registration leaves nothing behind
+    assert registry.PluginClasses == [MakePlugin]
+    with pytest.raises(NotFoundError):
+        registry.get("roots.build")
@@ -0,0 +1,220 @@
+import asyncio
+import io
+import os
+import socket
+import sys
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+from clyjin.__main__ import _call_server
+from clyjin.core.client import Client
+from clyjin.core.server import Server
+
+PluginSource: str = """
+from clyjin.base import Config, Module, Plugin
+
+
+class RootModule(Module[None, Config]):
+    Name = "$root"
+
+    async def execute(self) -> None:
+        print("{name}")
+
+
+class MainPlugin(Plugin):
+    Name = "{name}"
+    ModuleClasses = [RootModule]
+"""
+
+
+@pytest_asyncio.fixture
+async def socket_path(tmp_path: Path) -> AsyncIterator[Path]:
+    path: Path = Path(tmp_path, "server.sock")
+    server_task: asyncio.Task = asyncio.create_task(Server(path).serve())
+    while not path.exists():
+        await asyncio.sleep(0.01)
+
+    yield path
+
+    server_task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await server_task
+    assert not path.exists()
+
+
+@pytest.mark.asyncio
+async def test_call_executed_by_server(socket_path: Path, tmp_path: Path):
+    stdout: io.StringIO = io.StringIO()
+    exit_code: int | None = await asyncio.to_thread(
+        Client(socket_path).call,
+        ["--sysdir", str(Path(tmp_path, "sysdir")), "core.schema"],
+        stdout=stdout,
+        stderr=io.StringIO(),
+    )
+
+    assert exit_code == 0
+    assert "core.schema" in stdout.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_large_request(
+    socket_path: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # both exceed the default limit of a stream's line
+    monkeypatch.setenv("CLYJIN_TEST_LARGE", "x" * 70_000)
+    batch_path: Path = Path(tmp_path, "batch.txt")
+    batch_path.write_text("# comment\n" * 10_000 + "core.schema\n")
+
+    stdout: io.StringIO = io.StringIO()
+    with batch_path.open() as stdin:
+        monkeypatch.setattr(sys, "stdin", stdin)
+        exit_code: int | None = await asyncio.to_thread(
+            Client(socket_path).call,
+            ["--sysdir", str(Path(tmp_path, "sysdir")), "--batch", "-"],
+            stdout=stdout,
+            stderr=io.StringIO(),
+        )
+
+    assert exit_code == 0
+    assert "core.schema" in stdout.getvalue()
+
+
+def test_piped_call_not_forwarded(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    socket_path: Path = Path(tmp_path, "server.sock")
+    socket_path.touch()
+    read_fd, write_fd = os.pipe()
+    os.close(write_fd)
+
+    with os.fdopen(read_fd) as stdin:
+        monkeypatch.setattr(sys, "stdin", stdin)
+        assert Client(socket_path).call(["core.schema"]) is None
+
+
+def test_call_without_server(tmp_path: Path):
+    assert Client(Path(tmp_path, "server.sock")).call(["-h"]) is None
+
+
+@pytest.mark.asyncio
+async def test_watch_call_rejected(socket_path: Path, tmp_path: Path):
+    stderr: io.StringIO = io.StringIO()
+    exit_code: int | None = await asyncio.to_thread(
+        Client(socket_path).call,
+        [
+            "--sysdir", str(Path(tmp_path, "sysdir")),
+            "--watch", str(tmp_path),
+            "core.schema",
+        ],
+        stdout=io.StringIO(),
+        stderr=stderr,
+    )
+
+    assert exit_code == 1
+    assert "watch mode is not supported" in stderr.getvalue()
+
+
+def test_watch_call_not_forwarded(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("CLYJIN_NO_SERVER", raising=False)
+    assert _call_server(["--watch", "src", "core.schema"]) is None
+
+
+def test_stale_socket_keeps_stdin(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # a socket file left by a killed server, which nobody listens at
+    socket_path: Path = Path(tmp_path, "server.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(str(socket_path))
+    stdin_path: Path = Path(tmp_path, "stdin.txt")
+    stdin_path.write_text("core.schema\n")
+
+    with stdin_path.open() as stdin:
+        monkeypatch.setattr(sys, "stdin", stdin)
+        assert Client(socket_path).call(["--batch", "-"]) is None
+        # stdin is left for the in-process execution
+        assert stdin.read() == "core.schema\n"
+    assert not socket_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_killed_server_removes_socket(tmp_path: Path):
+    sysdir: Path = Path(tmp_path, "sysdir")
+    socket_path: Path = Path(sysdir, Client.SocketFileName)
+    process: asyncio.subprocess.Process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "clyjin",
+        "--sysdir",
+        str(sysdir),
+        "core.serve",
+        env={**os.environ, "CLYJIN_NO_SERVER": "1"},
+    )
+    try:
+        while not socket_path.exists():
+            assert process.returncode is None
+            await asyncio.sleep(0.01)
+    finally:
+        process.terminate()
+        await process.wait()
+
+    assert process.returncode == 0
+    assert not socket_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_server_finds_changed_plugins(
+    socket_path: Path,
+    tmp_path: Path,
+    make_plugin: Callable[[str, str], str],
+):
+    async def call(*args: str) -> tuple[int | None, str]:
+        stdout: io.StringIO = io.StringIO()
+        exit_code: int | None = await asyncio.to_thread(
+            Client(socket_path).call,
+            ["--sysdir", str(Path(tmp_path, "sysdir")), *args],
+            stdout=stdout,
+            stderr=io.StringIO(),
+        )
+        return exit_code, stdout.getvalue()
+
+    make_plugin("hello", PluginSource.format(name="hello"))
+    assert await call("hello") == (0, "hello\n")
+
+    # installed while the server runs
+    make_plugin("bye", PluginSource.format(name="bye"))
+    assert await call("bye") == (0, "bye\n")
+
+    # denied by the reindex executed by the server itself
+    assert (await call("core.reindex", "--deny", "hello"))[0] == 0
+    assert (await call("hello"))[0] != 0
+    assert await call("bye") == (0, "bye\n")
+
+
+@pytest.mark.asyncio
+async def test_enqueued_log_routed_to_client(
+    socket_path: Path,
+    tmp_path: Path,
+):
+    stderr: io.StringIO = io.StringIO()
+    exit_code: int | None = await asyncio.to_thread(
+        Client(socket_path).call,
+        [
+            "--sysdir", str(Path(tmp_path, "sysdir")),
+            "-v",
+            "--log-enqueue",
+            "core.schema",
+        ],
+        stdout=io.StringIO(),
+        stderr=stderr,
+    )
+
+    assert exit_code == 0
+    assert "[core] executed module" in stderr.getvalue()
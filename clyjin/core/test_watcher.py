@@ -0,0 +1,157 @@
+import asyncio
+import contextlib
+import shutil
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from clyjin.base.changeset import ChangeSet
+from clyjin.core.boot import Boot
+from clyjin.core.watcher import FileWatcher
+
+PluginSource: str = """
+from clyjin.base import Config, Module, Plugin
+
+Executions = []
+
+
+class BuildModule(Module[None, Config]):
+    Name = "$root"
+
+    async def execute(self) -> None:
+        Executions.append(self._changes)
+
+
+class MainPlugin(Plugin):
+    Name = "build"
+    ModuleClasses = [BuildModule]
+"""
+
+
+@pytest.fixture(autouse=True)
+def _fast_watcher(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(FileWatcher, "Debounce", 0.05)
+    monkeypatch.setattr(FileWatcher, "PollInterval", 0.05)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_polling", [False, True])
+async def test_wait(tmp_path: Path, use_polling: bool):
+    Path(tmp_path, "src", "nested").mkdir(parents=True)
+    Path(tmp_path, "src", "a.txt").write_text("a")
+    Path(tmp_path, "src", "b.txt").write_text("b")
+    Path(tmp_path, "other.txt").write_text("other")
+
+    watcher: FileWatcher = FileWatcher(
+        tmp_path,
+        [Path("src")],
+        ignore=["*.pyc"],
+        use_polling=use_polling,
+    )
+    watcher.start()
+    try:
+        # polling compares modification times, which could be coarse
+        await asyncio.sleep(0.1)
+        Path(tmp_path, "src", "a.txt").write_text("changed")
+        Path(tmp_path, "src", "b.txt").unlink()
+        Path(tmp_path, "src", "nested", "c.txt").write_text("c")
+        Path(tmp_path, "src", "nested", "c.pyc").write_text("c")
+        Path(tmp_path, "other.txt").write_text("changed")
+
+        changes: ChangeSet = await asyncio.wait_for(watcher.wait(), 5)
+    finally:
+        watcher.close()
+
+    assert changes == ChangeSet(
+        added=[Path("src/nested/c.txt")],
+        modified=[Path("src/a.txt")],
+        removed=[Path("src/b.txt")],
+        is_full=False,
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_polling", [False, True])
+async def test_wait_removed_dirs(tmp_path: Path, use_polling: bool):
+    Path(tmp_path, "src", "moved", "nested").mkdir(parents=True)
+    Path(tmp_path, "src", "deleted").mkdir()
+    Path(tmp_path, "lib").mkdir()
+    Path(tmp_path, "src", "a.txt").write_text("a")
+    Path(tmp_path, "src", "moved", "b.txt").write_text("b")
+    Path(tmp_path, "src", "moved", "nested", "c.txt").write_text("c")
+    Path(tmp_path, "src", "deleted", "d.txt").write_text("d")
+    Path(tmp_path, "lib", "e.txt").write_text("e")
+
+    watcher: FileWatcher = FileWatcher(
+        tmp_path,
+        [Path("src"), Path("lib")],
+        use_polling=use_polling,
+    )
+    watcher.start()
+    try:
+        await asyncio.sleep(0.1)
+        Path(tmp_path, "src", "moved").rename(Path(tmp_path, "moved"))
+        shutil.rmtree(Path(tmp_path, "src", "deleted"))
+        # a directory given to watch is moved out as well
+        Path(tmp_path, "lib").rename(Path(tmp_path, "old_lib"))
+        # files of moved out directories aren't watched anymore
+        Path(tmp_path, "moved", "nested", "c.txt").write_text("changed")
+        Path(tmp_path, "old_lib", "e.txt").write_text("changed")
+
+        changes: ChangeSet = await asyncio.wait_for(watcher.wait(), 5)
+    finally:
+        watcher.close()
+
+    assert changes == ChangeSet(
+        added=[],
+        modified=[],
+        removed=[
+            Path("lib/e.txt"),
+            Path("src/deleted/d.txt"),
+            Path("src/moved/b.txt"),
+            Path("src/moved/nested/c.txt"),
+        ],
+        is_full=False,
+    )
+
+
+@pytest.mark.asyncio
+async def test_watch_mode(
+    tmp_path: Path,
+    make_plugin: Callable[[str, str], str],
+):
+    plugin: str = make_plugin("build", PluginSource)
+    Path(tmp_path, "src").mkdir()
+    executions: list = []
+
+    boot: Boot = Boot(rootdir=tmp_path)
+    task: asyncio.Task = asyncio.create_task(boot.call([
+        "--sysdir",
+        str(Path(tmp_path, "sysdir")),
+        "--watch",
+        "src",
+        plugin,
+    ]))
+    try:
+        while not executions:
+            await asyncio.sleep(0.01)
+            executions = getattr(
+                sys.modules.get("clyjin_build"),
+                "Executions",
+                [],
+            )
+        assert executions == [None]
+
+        Path(tmp_path, "src", "a.txt").write_text("a")
+        async with asyncio.timeout(5):
+            while len(executions) < 2:  # noqa: PLR2004
+                await asyncio.sleep(0.01)
+        # the same module instance gets changed files
+        assert executions[1].added == [Path("src/a.txt")]
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        boot.close()
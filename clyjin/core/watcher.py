@@ -0,0 +1,365 @@
+import asyncio
+import contextlib
+import ctypes
+import fnmatch
+import os
+import struct
+import sys
+import typing
+from pathlib import Path
+
+from clyjin.base.changeset import ChangeSet
+from clyjin.log import Log
+
+# inotify constants from `sys/inotify.h`
+_InModify: int = 0x2
+_InAttrib: int = 0x4
+_InCloseWrite: int = 0x8
+_InMovedFrom: int = 0x40
+_InMovedTo: int = 0x80
+_InCreate: int = 0x100
+_InDelete: int = 0x200
+_InDeleteSelf: int = 0x400
+_InMoveSelf: int = 0x800
+_InQueueOverflow: int = 0x4000
+_InIgnored: int = 0x8000
+_InIsDir: int = 0x40000000
+_InNonBlock: int = 0o4000
+_InCloseOnExec: int = 0o2000000
+_InWatchMask: int = \
+    _InModify | _InAttrib | _InCloseWrite | _InMovedFrom | _InMovedTo \
+    | _InCreate | _InDelete | _InDeleteSelf | _InMoveSelf
+_InEventHeader: struct.Struct = struct.Struct("iIII")
+
+
+class FileWatcher:
+    """
+    Watches files and directories for changes and reports them as change
+    sets once the changes settle down.
+
+    On Linux, changes are received from inotify, other platforms poll
+    modification times and sizes of watched files.
+
+    Changes are accumulated from the start of the watching, so changes made
+    while a Module is executed are reported by the next `wait()`. A file
+    created and then modified is reported as added, a file created and then
+    removed is not reported at all. Files of a removed or moved out directory
+    are reported as removed.
+
+    Attributes:
+        rootdir:
+            Directory reported paths are relative to.
+        paths:
+            Files and directories to watch, directories are watched
+            recursively.
+        ignore(optional):
+            Glob patterns of paths to ignore, matched against the relative
+            path and against each of its parts. Defaults to VCS directories,
+            bytecode and editor's temporary files.
+        use_polling(optional):
+            Whether polling is used even if inotify is available. Defaults to
+            False.
+    """
+    DefaultIgnore: list[str] = [".git", "__pycache__", "*.pyc", "*.swp", "*~"]
+    # how many seconds should pass without changes before they're reported
+    Debounce: float = 0.1
+    # how often files are polled, in seconds, if inotify is not used
+    PollInterval: float = 0.5
+
+    def __init__(
+        self,
+        rootdir: Path,
+        paths: list[Path],
+        *,
+        ignore: list[str] | None = None,
+        use_polling: bool = False,
+    ) -> None:
+        self._rootdir: Path = rootdir
+        self._paths: list[Path] = [Path(rootdir, p) for p in paths]
+        self._ignore: list[str] = \
+            self.DefaultIgnore if ignore is None else ignore
+        self._use_polling: bool = use_polling
+
+        # kinds of changes by relative paths
+        self._changes: dict[Path, str] = {}
+        self._is_overflowed: bool = False
+        self._changed: asyncio.Event = asyncio.Event()
+
+        self._libc: ctypes.CDLL | None = None
+        self._inotify_fd: int | None = None
+        # watched directories by inotify watch descriptors
+        self._watched_dirs: dict[int, Path] = {}
+        # existing files, since inotify doesn't report files of a removed
+        # directory one by one if the directory is moved out
+        self._known_files: set[Path] = set()
+        self._poll_task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """
+        Starts watching. Should be called within a running event loop.
+        """
+        if not self._use_polling:
+            self._inotify_fd = self._init_inotify()
+        if self._inotify_fd is None:
+            Log.info("[core.watcher] polling <{}>", self._paths)
+            self._poll_task = asyncio.create_task(self._poll())
+            return
+
+        Log.info("[core.watcher] watching <{}> with inotify", self._paths)
+        for path in self._paths:
+            self._add_inotify_watches(
+                path if path.is_dir() else path.parent,
+                is_recursive=path.is_dir(),
+            )
+            self._known_files.update(self._get_files(path))
+        asyncio.get_running_loop().add_reader(
+            self._inotify_fd,
+            self._read_inotify_events,
+        )
+
+    async def wait(self) -> ChangeSet:
+        """
+        Waits until some watched files are changed and returns the changes
+        once no new changes are made for the debounce time.
+        """
+        while True:
+            await self._changed.wait()
+            while True:
+                self._changed.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._changed.wait(),
+                        self.Debounce,
+                    )
+                except TimeoutError:
+                    break
+
+            if self._changes or self._is_overflowed:
+                return self._pop_changes()
+
+    def close(self) -> None:
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+        if self._inotify_fd is not None:
+            asyncio.get_running_loop().remove_reader(self._inotify_fd)
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+
+    def _pop_changes(self) -> ChangeSet:
+        changes: dict[Path, str] = self._changes
+        self._changes = {}
+        is_full: bool = self._is_overflowed
+        self._is_overflowed = False
+
+        return ChangeSet(
+            added=sorted(p for p, k in changes.items() if k == "added"),
+            modified=sorted(p for p, k in changes.items() if k == "modified"),
+            removed=sorted(p for p, k in changes.items() if k == "removed"),
+            is_full=is_full,
+        )
+
+    def _add_change(self, path: Path, kind: str) -> None:
+        if not self._is_watched(path) or self._is_ignored(path):
+            return
+
+        relative_path: Path = self._get_relative_path(path)
+        previous_kind: str | None = self._changes.get(relative_path)
+        if previous_kind == "added" and kind == "removed":
+            # the file has never existed for the module
+            del self._changes[relative_path]
+        elif previous_kind == "added":
+            pass
+        elif previous_kind == "removed" and kind == "added":
+            self._changes[relative_path] = "modified"
+        else:
+            self._changes[relative_path] = kind
+        self._changed.set()
+
+    def _is_watched(self, path: Path) -> bool:
+        return any(
+            path == watched_path or watched_path in path.parents
+            for watched_path in self._paths
+        )
+
+    def _is_ignored(self, path: Path) -> bool:
+        relative_path: Path = self._get_relative_path(path)
+        return any(
+            fnmatch.fnmatch(relative_path.as_posix(), pattern)
+            or any(
+                fnmatch.fnmatch(part, pattern)
+                for part in relative_path.parts
+            )
+            for pattern in self._ignore
+        )
+
+    def _get_relative_path(self, path: Path) -> Path:
+        try:
+            return path.relative_to(self._rootdir)
+        except ValueError:
+            return path
+
+    def _init_inotify(self) -> int | None:
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc: ctypes.CDLL = ctypes.CDLL(None, use_errno=True)
+            fd: int = libc.inotify_init1(_InNonBlock | _InCloseOnExec)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            Log.warning(
+                "[core.watcher] cannot init inotify: errno=<{}>: use polling",
+                ctypes.get_errno(),
+            )
+            return None
+
+        self._libc = libc
+        return fd
+
+    def _add_inotify_watches(
+        self,
+        directory: Path,
+        *,
+        is_recursive: bool,
+    ) -> None:
+        libc: ctypes.CDLL = typing.cast(ctypes.CDLL, self._libc)
+        for dirpath, dirnames, _ in os.walk(directory):
+            dirnames[:] = [
+                d for d in dirnames if not self._is_ignored(Path(dirpath, d))
+            ]
+            wd: int = libc.inotify_add_watch(
+                self._inotify_fd,
+                os.fsencode(dirpath),
+                _InWatchMask,
+            )
+            if wd < 0:
+                Log.warning(
+                    "[core.watcher] cannot watch <{}>: errno=<{}>",
+                    dirpath,
+                    ctypes.get_errno(),
+                )
+            else:
+                self._watched_dirs[wd] = Path(dirpath)
+            if not is_recursive:
+                return
+
+    def _read_inotify_events(self) -> None:
+        try:
+            buffer: bytes = os.read(
+                typing.cast(int, self._inotify_fd),
+                64 * 1024,
+            )
+        except BlockingIOError:
+            return
+
+        offset: int = 0
+        while offset < len(buffer):
+            wd, mask, _, name_size = _InEventHeader.unpack_from(buffer, offset)
+            offset += _InEventHeader.size
+            name: str = os.fsdecode(
+                buffer[offset:offset + name_size].rstrip(b"\0"),
+            )
+            offset += name_size
+
+            if mask & _InQueueOverflow:
+                self._is_overflowed = True
+                self._changed.set()
+                continue
+            if mask & _InIgnored:
+                # the watch is removed by the kernel
+                self._watched_dirs.pop(wd, None)
+                continue
+            directory: Path | None = self._watched_dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & (_InDeleteSelf | _InMoveSelf):
+                # reported only by the directory itself if its parent isn't
+                # watched, e.g. for a directory given to watch
+                self._remove_directory(directory)
+                continue
+            if not name:
+                continue
+            self._handle_inotify_event(Path(directory, name), mask)
+
+    def _handle_inotify_event(self, path: Path, mask: int) -> None:
+        if mask & _InIsDir:
+            if mask & (_InCreate | _InMovedTo) and not self._is_ignored(path):
+                self._add_inotify_watches(path, is_recursive=True)
+                # files could be created before the watch was added
+                for file_path in self._get_files(path):
+                    self._known_files.add(file_path)
+                    self._add_change(file_path, "added")
+            elif mask & (_InDelete | _InMovedFrom):
+                self._remove_directory(path)
+            return
+
+        if mask & (_InCreate | _InMovedTo):
+            self._known_files.add(path)
+            self._add_change(path, "added")
+        elif mask & (_InDelete | _InMovedFrom):
+            self._known_files.discard(path)
+            self._add_change(path, "removed")
+        else:
+            self._add_change(path, "modified")
+
+    def _remove_directory(self, directory: Path) -> None:
+        """
+        Reports known files of the directory as removed and drops watches of
+        the directory and its subdirectories, so events of a directory moved
+        out aren't reported under its old path.
+        """
+        removed_files: list[Path] = [
+            p for p in self._known_files if directory in p.parents
+        ]
+        for file_path in removed_files:
+            self._known_files.discard(file_path)
+            self._add_change(file_path, "removed")
+
+        libc: ctypes.CDLL = typing.cast(ctypes.CDLL, self._libc)
+        for wd, path in list(self._watched_dirs.items()):
+            if path == directory or directory in path.parents:
+                del self._watched_dirs[wd]
+                # watches of deleted directories are already removed by the
+                # kernel, so the failure is ignored
+                libc.inotify_rm_watch(self._inotify_fd, wd)
+
+    async def _poll(self) -> None:
+        snapshot: dict[Path, tuple[int, int]] = self._get_snapshot()
+        while True:
+            await asyncio.sleep(self.PollInterval)
+            new_snapshot: dict[Path, tuple[int, int]] = self._get_snapshot()
+            for path, stamp in new_snapshot.items():
+                previous_stamp: tuple[int, int] | None = snapshot.get(path)
+                if previous_stamp is None:
+                    self._add_change(path, "added")
+                elif previous_stamp != stamp:
+                    self._add_change(path, "modified")
+            for path in snapshot.keys() - new_snapshot.keys():
+                self._add_change(path, "removed")
+            snapshot = new_snapshot
+
+    def _get_snapshot(self) -> dict[Path, tuple[int, int]]:
+        snapshot: dict[Path, tuple[int, int]] = {}
+        for path in self._paths:
+            for file_path in self._get_files(path):
+                with contextlib.suppress(OSError):
+                    stat: os.stat_result = file_path.stat()
+                    snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _get_files(self, path: Path) -> list[Path]:
+        if not path.is_dir():
+            return [path] if path.exists() else []
+
+        files: list[Path] = []
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = [
+                d for d in dirnames if not self._is_ignored(Path(dirpath, d))
+            ]
+            files.extend(
+                Path(dirpath, filename)
+                for filename in filenames
+                if not self._is_ignored(Path(dirpath, filename))
+            )
+        return files
@@ -0,0 +1,64 @@
+import subprocess
+import sys
+
+# cumulative import time of the entry point, which only forwards a call to
+# a server, in microseconds
+EntryImportBudgetUs: int = 50_000
+
+# modules, which should be imported only if a call is executed in-process
+HeavyModules: set[str] = {
+    "asyncio",
+    "dataclasses",
+    "importlib.metadata",
+    "inspect",
+    "loguru",
+    "pydantic",
+    "typing",
+    "clyjin.base",
+    "clyjin.core.boot",
+    "clyjin.log",
+}
+
+
+def _get_import_times() -> dict[str, int]:
+    """
+    Imports the entry point in a fresh interpreter and returns cumulative
+    import times of modules in microseconds.
+    """
+    args: list[str] = [
+        sys.executable,
+        "-X",
+        "importtime",
+        "-c",
+        "import clyjin.__main__",
+    ]
+    process: subprocess.CompletedProcess = subprocess.run(
+        args,  # noqa: S603
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    import_times: dict[str, int] = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        import_times[name.strip()] = int(cumulative)
+    return import_times
+
+
+def test_entry_imports_no_heavy_modules():
+    import_times: dict[str, int] = _get_import_times()
+
+    assert "clyjin.__main__" in import_times
+    assert HeavyModules.isdisjoint(import_times)
+
+
+def test_entry_import_time_budget():
+    # the best of several runs is taken to tolerate noise
+    entry_import_us: int = min(
+        _get_import_times()["clyjin.__main__"] for _ in range(3)
+    )
+
+    assert entry_import_us < EntryImportBudgetUs
@@ -0,0 +1,32 @@
+import sys
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture()
+def make_plugin(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> Iterator[Callable[[str, str], str]]:
+    """
+    Gives a function installing a plugin, i.e. writing the source as package
+    `clyjin_<name>` to a directory prepended to `sys.path`, and returning
+    the name. Installed plugins are unimported after the test.
+    """
+    site: Path = Path(tmp_path, "site")
+    site.mkdir()
+    monkeypatch.syspath_prepend(str(site))
+    names: list[str] = []
+
+    def make(name: str, source: str) -> str:
+        Path(site, f"clyjin_{name}").mkdir()
+        Path(site, f"clyjin_{name}", "__init__.py").write_text(source)
+        names.append(name)
+        return name
+
+    yield make
+
+    for name in names:
+        sys.modules.pop(f"clyjin_{name}", None)